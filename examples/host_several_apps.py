@@ -0,0 +1,13 @@
+from hotconsole.host import Host
+
+# Хост запускает сразу несколько приложений hotconsole в одном процессе
+# Каждая папка - это обычное приложение со своим main.py, data.json и командами
+# Их Runner().run(...) не блокирует хост, а передает ему горячие клавиши
+# В результате у всех приложений общий хук клавиатуры, общий пул потоков и одно отслеживание блокировки экрана
+
+FOLDERS = [
+    r"C:\scripts\tills",
+    r"C:\scripts\databases",
+]
+
+Host(FOLDERS, title="Все мои скрипты", workers=4).run()
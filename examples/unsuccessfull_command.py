@@ -1,7 +1,8 @@
 from hotconsole.hotconsole import Command, Hotkey, Runner
 
 # В этом примере при вызове команды возникает ошибка
-# В результате выводится traceback и сообщение об ошибке
+# В результате выводится суть ошибки и сообщение о ней, а полный traceback - в журнал logs/hotconsole.log
+# Посмотреть журнал можно в консольном режиме командой log
 command = Command("greet", "Приветствовать мир", lambda: print("Hello, World!"))
 hotkey = Hotkey("alt+shift+5", command, None)
 Runner().run([hotkey])
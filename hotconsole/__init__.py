@@ -15,6 +15,8 @@ python -m pip install hotconsole
 При запуске любого скрипта при помощи библиотеки - в папке со скриптом появляется батник для установки hotconsole.
 Батник пригодится, чтобы не обновлять библиотеку вручную. А еще, чтобы ваши пользователи могли легко установить библиотеку, а также подтянуть все зависимости, которые вы добавите сами и выгрузите в файл requirements.txt.
 
+Если положить рядом со скриптами папку wheelhouse с заранее скачанными пакетами (DependencyManager(папка).fill_wheelhouse() из hotconsole.deps), батник и DependencyManager будут ставить зависимости из нее без сети. DependencyManager.ensure() запоминает хэш requirements.txt и установленные версии и не запускает pip, если ничего не изменилось.
+
 ## Запуск команд
 
 Рассмотрим простой пример пользовательского main.py - с командой для остановки службы
@@ -72,12 +74,101 @@ TurnService = Command("turn", "Изменить состояние службы"
 
 Также можно передать в команду option_message - вопрос, который будет уточнять у пользователя номер опции. По умолчанию это фраза "Введите номер варианта"
 
+Если опций много и их дорого получать (например, список касс или баз с сервера), вместо списка можно передать функцию или OptionsProvider из hotconsole.options:
+
+```
+TillsProvider = OptionsProvider(get_tills, ttl=300)
+ChooseTill = Command("till", "Выбрать кассу", choose_till, TillsProvider)
+```
+
+Тогда опции получатся только при открытии вопроса, а потом будут браться из кэша и обновляться в фоне. Длинные списки выводятся постранично: можно ввести номер, текст для поиска, Enter - следующая страница. Выбранную опцию команда получает через TillsProvider.option(option_number)
+
+Если команду нужно выполнить сразу для нескольких опций (например, перезапустить службу на N кассах), создайте ее с multi_options=True. Пользователь ответит, например, 1 3 5 - и команда выполнится для каждой опции параллельно, не больше parallelism штук одновременно (по умолчанию 4). Вывод каждой опции собирается отдельно и печатается в общей сводке. В консольном режиме то же самое можно сделать для любой команды: turn 1,3,5
+
+## Ленивое объявление команд
+
+Если команд много и они тянут тяжелые библиотеки, их можно не импортировать в main.py, а объявить в commands.json рядом с ним:
+
+```json
+[
+    {
+        "name": "turn",
+        "description": "Изменить состояние службы",
+        "execute": "commands.services:turn_service",
+        "options": ["Включить", "Выключить", "Перезапустить"],
+        "hotkeys": {"alt+t": null, "alt+1": 1}
+    }
+]
+```
+
+```python
+from hotconsole.hotconsole import Runner
+from hotconsole.registry import CommandRegistry
+
+if __name__ == "__main__":
+    registry = CommandRegistry().load_manifest()
+    Runner().run(registry.hotkeys)
+```
+
+Модуль commands.services импортируется только при первом выполнении команды, а потом функция берется из памяти. Списки горячих клавиш и команд выводятся без импорта. В options можно указать адрес функции, которая вернет опции, - тогда она тоже вызовется только при вопросе. Остальные поля (timeout, isolated, multi_options) задаются так же, как в Command. Команды из установленных пакетов можно подключить через точки входа группы hotconsole.commands: registry.load_entry_points().
+
+## Перезагрузка команд на лету
+
+Чтобы не перезапускать приложение после каждой правки команды, создайте Runner с watch=True. Тогда измененные модули из папки со скриптами перезагружаются примерно за полсекунды, а команды подменяются по названию - горячие клавиши и консольный режим сразу выполняют новую версию. Нажатия во время перезагрузки не теряются: они выполняют старую версию команды. Если в модуле ошибка, она выводится в консоль, а команды остаются прежними. Изменения в самом main.py (например, новые горячие клавиши) по-прежнему требуют перезапуска.
+
+## Ограничение времени команд
+
+Чтобы зависший запрос или заблокированная база не держали горячую клавишу бесконечно, команде можно задать timeout в секундах, а всем командам сразу - поле commandTimeout в data.json. 
+
+По истечении времени команда получает сигнал отмены: долгие команды проверяют его через CommandHelpers.check_cancelled() или ждут через CommandHelpers.sleep(). Если команду создать с isolated=True, она выполняется в отдельном процессе и по таймауту завершается принудительно (функцию такой команды надо объявить в отдельном модуле, а не в main.py). Превышение времени выводится и записывается в журнал отдельно от остальных ошибок.
+
+Для isolated-команд при запуске заранее поднимаются процессы (по умолчанию 2, задается в Runner.isolated_workers), в которых уже импортированы модули команд, поэтому запуск почти не медленнее обычного. Процесс заменяется новым после 100 команд, при превышении 300 МБ памяти или после принудительной остановки.
+
+## Асинхронные команды
+
+Функцию команды можно объявить через async def - тогда она выполняется на одном общем цикле событий, который Runner запускает при старте, и может ждать сразу несколько запросов. Общие ресурсы для этого есть в AsyncHelper из hotconsole.aio: get_json и post_json работают через одну сессию requests, query - через DBHelper, service_statuses - через общий монитор служб, а run выполняет любой другой блокирующий вызов. Ошибки, timeout и журнал работают так же, как у обычных команд, а по истечении timeout задача отменяется на ближайшем await:
+
+```
+async def check_cashbox(option_number: int | None):
+    shift, statuses = await asyncio.gather(
+        AsyncHelper.get_json("https://cashbox.local/api/shift"), AsyncHelper.service_statuses(["KonturMarket"])
+    )
+```
+
+Вопрос пользователю из асинхронной команды задается без блокировки цикла: await asyncio.wrap_future(CommandHelpers.ask_async("Введите ИНН")).
+
+## Вопросы пользователю
+
+Все вопросы (выбор опции, ввод значения для конфига, ввод консольной команды) проходят через общую очередь hotconsole.prompts.PromptBroker. Если две команды спрашивают одновременно, вторая ждет, пока ответят первой, и ответы не перемешиваются. Выбор опции со списком и постраничным выводом занимает консоль целиком, пока не закончится.
+
+Вопросу можно задать timeout и ответ по умолчанию: CommandHelpers.ask_option_number_from_one(options, timeout=60, default=1) или CommandHelpers.ask("Номер кассы?", timeout=30, default="1"). Время считается с момента, когда вопрос появился в консоли. Для всех вопросов сразу - поле promptTimeout в data.json. Если ответа нет и нет ответа по умолчанию, команда завершается с превышением времени - поток горячей клавиши не висит вечно. Ответ, набранный после истечения времени, достанется следующему вопросу, который уже выведен в консоль.
+
+Если ответ нужен не сразу, вопрос можно задать заранее: future = CommandHelpers.ask_async("Комментарий к заявке?"), выполнить остальную работу и взять ответ через future.result().
+
+## Прогрев команд
+
+Если первое нажатие долгое из-за импорта библиотек, подключения к БД или входа в API, эту работу можно вынести в warmup команды: Command("report", "Собрать отчет", report, warmup=login, warmup_priority=1). Прогревы выполняются в фоне после "Горячие клавиши готовы!" и снова сразу после освобождения памяти в простое, чтобы первая команда после простоя не выполнялась с холодным кэшем, по приоритету - больший раньше - и не больше чем в Runner.warmup_workers потоках. Пока выполняется команда, новые прогревы не начинаются, а пока идет прогрев, память в простое не освобождается. Прогрев выполняется от имени команды, поэтому значение, сохраненное в нем через CommandHelpers.cached, команда получит из кэша. Команды с isolated=True не прогреваются: они выполняются в отдельном процессе, куда прогрев из основного процесса не доходит. Итоги прогрева - в консольной команде warm, а warm run прогревает команды заново.
+
+## Команды по расписанию
+
+Служебные команды (обновление кэшей, проверка служб, чистка логов) можно выполнять по расписанию прямо в запущенном приложении - без планировщика Windows и холодного запуска питона:
+
+```
+runner = Runner()
+runner.every(600, RefreshCache)
+runner.cron("0 3 * * *", CleanLogs)
+runner.once(30, CheckService, 1)
+runner.run(hotkeys)
+```
+
+Все задачи обслуживает один поток-таймер, а выполняются они через Executor в фоне: без отпускания клавиш и без вывода в консоль, чтобы не мешать команде, с которой сейчас работает пользователь. Результат и ошибки задачи пишутся в журнал команд. Если прошлый запуск задачи еще не закончился, следующий пропускается. Для команды с опциями номер опции обязателен. Время последних запусков хранится в .hotconsole-jobs.json, поэтому после перезапуска интервалы продолжаются, а однократные задачи не повторяются. В хосте время хранится отдельно для каждого приложения, поэтому одноименные задачи разных приложений не мешают друг другу. В консольном режиме команда jobs показывает расписание, прошлый и следующий запуск и результат.
+
 ## Возможности конфигурации
 
 При первом запуске main.py - создается конфиг data.json с версией = 1. 
 
 Конфиг полезен:
-1) Для кэширования. Если в процессе выполнения команды нужно сохранить значение переменной, то можно в этот файл
+1) Для хранения настроек пользователя, которые он может поправить руками. Временные значения лучше хранить не здесь, а в кэше (см. ниже): запись в data.json переписывает весь файл
 2) Для кастомизации. Например, по умолчанию в конфиге есть поле console_mode. Пользователь может выставить его в True и перейти в консольный режим без горячих клавиш. 
 3) Для обновления. Если версия конфига пользователя неактуальна (расходится с версией в файле main.py), в конфиг автоматически добавляются новые поля. Также можно вставить в процесс инициализации миграцию.
 
@@ -99,6 +190,36 @@ def migration_to_22():
 
 Также может возникнуть потребность перед запуском каждой команды выполнять определенные действия и актуализировать данные пользователя. Для этого при создании Runner в него можно передать метод для актуализации. 
 
+## Кэш значений
+
+Если команде нужно сохранить значение между запусками (токен, список касс, ответ сервера), используйте CommandHelpers.cached:
+
+```
+tills = CommandHelpers.cached("tills", 3600, load_tills)
+```
+
+Значение берется из кэша, а если его нет или прошел час - вызывается load_tills и результат сохраняется. У каждой команды свое пространство имен. Кэш хранится в .hotconsole-cache.db в папке со скриптами: запись не трогает data.json, а при переполнении удаляются давно не используемые значения. Для прямой работы есть CommandHelpers.cache() с методами get, set, delete и clear.
+
+Ответы справочных API тоже можно кэшировать: RequestsHelper.do_get_request(session, url, CommandHelpers.http_cache()). Пока не истек Cache-Control: max-age из ответа, запрос не отправляется вовсе. Потом отправляется условный запрос с ETag или Last-Modified: если данные не изменились, сервер отвечает 304 без тела, и JSON берется с диска. Статистику попаданий показывает CommandHelpers.http_cache().stats().
+
+Повторяющиеся SELECT к базе кассы можно не выполнять, пока база не изменилась: DBHelper.connect_and_execute_query(db_path, query, params, use_cache=True). Изменение определяется по времени и размеру файла базы и ее -wal, а результаты хранятся в памяти с ограничением по объему. Статистика - в DBHelper.result_cache.stats().
+
+Перед опасными командами базу кассы лучше не копировать как файл: DBHelper.snapshot(db_path) делает согласованную копию через backup API SQLite, даже пока касса пишет в базу. Копирование идет пачками страниц с паузами, поэтому база не блокируется надолго, а прогресс можно выводить через progress. Копии лежат в папке snapshots рядом с базой, хранятся последние keep (по умолчанию 5), а вернуть базу можно через DBHelper.restore_snapshot(snapshot_path, db_path). На копии удобно запускать тяжелые запросы для анализа.
+
+Состояние служб OSHelper берет из общего монитора hotconsole.services.ServiceMonitor: один вызов sc queryex возвращает все службы сразу, результат хранится в памяти, а фоновый поток обновляет его - часто, пока команда ждет запуска или остановки службы, и все реже в простое. try_stop_service и try_start_service просыпаются сразу после того, как монитор увидел нужное состояние. Состояние нескольких служб можно получить за один опрос: OSHelper.get_service_statuses(["KonturMarket", "Spooler"]).
+
+## Журнал команд
+
+Каждый запуск команды записывается в журнал logs/hotconsole.log в папке со скриптами: команда, опция, длительность, результат и полный traceback при ошибке. Запись идет через фоновый поток, файл ротируется по размеру и не теряется при перезапуске приложения. В консоли при ошибке остается только ее суть.
+
+Посмотреть журнал можно в консольном режиме: log - последние записи, log 50 - последние 50 записей, log turn - поиск по тексту.
+
+## Память
+
+Приложение весь день висит в автозагрузке, поэтому память на тонких клиентах стоит беречь. Консольная команда mem показывает память процесса и сколько памяти добавила каждая команда. mem trace включает разбивку Python-объектов по подсистемам (модули hotconsole, скрипты, библиотеки) через tracemalloc - она замедляет работу, поэтому выключена по умолчанию и выключается той же командой.
+
+Если задать Runner.idle_after (например, 900 - 15 минут), то после стольких секунд без команд приложение закрывает кэши, забывает опции от поставщиков и результаты запросов к базе, останавливает пул процессов для isolated-команд и возвращает освободившуюся память системе. По умолчанию (None) память в простое не освобождается. Перед следующей командой пул запускается снова, а кэши открываются при первом обращении. Нажатие не ждет, пока идет освобождение: оно прерывается, а уже освобожденное возвращается. Освободить память сразу можно командой mem free. Тяжелые библиотеки, которые нужны редким командам, лучше импортировать в модулях isolated-команд: тогда в простое они выгружаются вместе с пулом.
+
 ## Hotstrings
 
 Hotstring - это как горячая клавиша, но только для строк. 
@@ -116,6 +237,32 @@ Hotstring - это как горячая клавиша, но только дл
 - RequestsHelper - для создания запросов к внешнему API.
 - InnGenerator - генератор ИНН
 
+Для больших папок в OSHelper есть delete_folder и sync_folder. Первый удаляет файлы параллельно и повторяет попытки только для заблокированных (а с background=True сразу освобождает адрес и удаляет папку в фоне). Второй обновляет папку по свежей сборке: копирует только изменившиеся файлы, удаляет лишние и выводит, что изменилось.
+
+Для нагрузочных тестов в hotconsole.testdata есть DataGenerator - он генерирует пачками ИНН, КПП, ОГРН, ОГРНИП и СНИЛС с правильными контрольными числами, а также случайные строки. С одинаковым seed данные повторяются. DataWriter пишет записи потоково в CSV, JSONL или таблицу SQLite:
+
+```
+generator = DataGenerator(seed=1)
+records = generator.records(1_000_000, {"inn": generator.inn_ul, "kpp": generator.kpp, "snils": generator.snils})
+DataWriter.to_sqlite("C:/data/test.db", "clients", records)
+```
+
+## Задержки горячих клавиш
+
+Каждое нажатие горячей клавиши трассируется от события клавиатуры до конца команды: hook (ожидание в потоке перехвата), host_queue (ожидание свободного потока в хосте), stash_state, config (чтение data.json), options (вопрос пользователю), switch_to_script_window, switch_to_window (вместе с паузой в полсекунды) и command. Консольная команда trace выводит p50/p95/p99/max каждой стадии и key_to_command - сколько нажатие ждет до старта команды, а все стадии сохраняет в logs/trace-*.json. Файл открывается в chrome://tracing или ui.perfetto.dev. trace 300 покажет только последние 5 минут. Из кода то же самое доступно через Tracer из hotconsole.tracing: Tracer.format_summary(last=300) и Tracer.export_chrome(path, last=300).
+
+## Нагрузочный прогон
+
+Все обращения к Windows (перехват клавиатуры, окна, процессы, службы) собраны в Platform из hotconsole.platform. По умолчанию работает WindowsPlatform, а FakePlatform держит горячие клавиши, службы и процессы в памяти, поэтому команды с OSHelper можно проверять и на линуксе: Platform.use(FakePlatform(services={"KonturMarket": ("RUNNING", 4120)})).
+
+LoadGenerator из hotconsole.loadgen запускает настоящий Runner с синтетическими командами на FakePlatform и нажимает горячие клавиши и строки - пачкой или в заданном темпе. Нажатия обрабатываются по очереди в одном потоке, как в перехвате клавиатуры Windows, поэтому отчет показывает, сколько нажатий в секунду выдерживает приложение и сколько нажатие ждет до старта команды:
+
+```
+report = LoadGenerator(commands=8, hotstrings=4, work=0.001, seed=1).run(events=1000, rate=200)
+for line in report.format():
+    print(line)
+```
+
 ## Известные ограничения
 
 Hotconsole работает только на Windows, на линуксе и маке не запустится.
@@ -124,6 +271,10 @@ Hotconsole работает только на Windows, на линуксе и м
 
 Запуск нескольких приложений с hotconsole одновременно - работает успешно. Но если у вас возникнет такая потребность, надо будет следить, чтобы не пересекались горячие клавиши в разных приложениях (иначе будут срабатывать сразу обе).
 
+Чтобы несколько приложений не держали каждое свой интерпретатор, хук клавиатуры и проверку блокировки экрана, их можно запустить в одном процессе через Host из hotconsole.host: Host([папка1, папка2]).run(). В каждой папке остаются свои main.py, data.json, заголовок и команды, а пересекающиеся горячие клавиши хост покажет при запуске. Чтобы команда работала и в хосте, берите адрес конфига через get_config_path(), а не через CONFIG_PATH.
+
+После блокировки экрана и по команде exit в консольном режиме приложение не перезапускается целиком: перехват клавиатуры переустанавливается в том же процессе, поэтому кэши, процессы команд и состояние сохраняются. Полный перезапуск из-под админа остается запасным вариантом, если переустановить перехват не удалось.
+
 Приложение будет автоматически перезапускаться из-под админа, если указать if __name__ == "__main__": OSHelper.rerun_as_admin()
 
 Но если у вас включен UAC, он будет доставать вас вопросами, запустить ли приложение. Для удобства можно выключить его в разделе "Изменение параметров контроля учетных записей".
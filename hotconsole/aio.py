@@ -0,0 +1,203 @@
+"""
+Модуль с асинхронными командами: общий цикл событий и общие ресурсы для HTTP, БД и служб
+
+Classes
+-------
+CommandLoop
+    Долгоживущий цикл событий в отдельном потоке, на котором выполняются асинхронные команды
+AsyncHelper
+    Асинхронные обертки над RequestsHelper, DBHelper и опросом служб с общей сессией requests
+
+Functions
+---------
+is_coroutine_function
+    Асинхронная ли функция команды (в том числе ленивая функция из реестра)
+"""
+
+import asyncio
+import concurrent.futures
+import contextvars
+import functools
+import inspect
+import threading
+from typing import Any, Callable, Coroutine
+
+import requests
+
+from hotconsole.cache import HttpCache
+from hotconsole.cancellation import CommandTimeoutError
+from hotconsole.helpers import DBHelper, OSHelper, RequestsHelper
+from hotconsole.services import ServiceStatus
+
+
+def is_coroutine_function(function: Callable, resolve: bool = True) -> bool:
+    """Объявлена ли функция через async def. Ленивая функция из реестра для проверки импортируется,
+    а если resolve=False - считается обычной"""
+    from hotconsole.registry import LazyCallable
+
+    if isinstance(function, LazyCallable):
+        if not resolve:
+            return False
+        function = function.resolve()
+    return inspect.iscoroutinefunction(function)
+
+
+class CommandLoop:
+    """Один цикл событий на все приложение. Он работает в отдельном потоке, поэтому команды, которые ждут его
+    из потока перехвата клавиатуры или из параллельных опций, не мешают друг другу: пока одна корутина ждет ответа
+    сервера, выполняются другие. Блокирующие вызовы из AsyncHelper идут в пул потоков цикла
+
+    Parameters
+    ----------
+    io_workers: int
+        Сколько потоков для блокирующих вызовов (asyncio.to_thread) - столько запросов и выполняется одновременно
+    """
+
+    def __init__(self, io_workers: int = 8):
+        self.io_workers = io_workers
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> "CommandLoop":
+        with self._lock:
+            if not self.is_running:
+                self._ready.clear()
+                self._thread = threading.Thread(target=self._run_forever, daemon=True, name="hotconsole-loop")
+                self._thread.start()
+                self._ready.wait()
+        return self
+
+    def stop(self):
+        """Останавливает цикл. Незавершенные задачи отменяются"""
+        with self._lock:
+            if not self.is_running:
+                return
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join()
+            self._thread = None
+            self.loop = None
+
+    def run(self, coroutine: Coroutine, timeout: float | None = None, grace: float = 5) -> Any:
+        """Выполняет корутину на цикле и ждет результата из текущего потока. Корутина выполняется в копии
+        текущего контекста, поэтому видит папку со скриптами и название команды. По истечении timeout задача
+        отменяется - CancelledError прерывает ее на ближайшем await. Если она не завершилась за grace секунд,
+        Executor идет дальше, а задача дорабатывает в фоне
+
+        Parameters
+        ----------
+        coroutine: Coroutine
+            Корутина команды
+        timeout: float | None
+            Сколько секунд ждать. None - без ограничения
+        grace: float
+            Сколько секунд ждать завершения после отмены
+        """
+        self.start()
+        loop = self.loop
+        done: concurrent.futures.Future = concurrent.futures.Future()
+        tasks: list[asyncio.Task] = []
+
+        def create_task():
+            task = loop.create_task(coroutine)
+            task.add_done_callback(functools.partial(self._copy_outcome, done))
+            tasks.append(task)
+
+        loop.call_soon_threadsafe(contextvars.copy_context().run, create_task)
+        try:
+            return done.result(timeout)
+        except concurrent.futures.TimeoutError:
+            if done.done():
+                raise
+        loop.call_soon_threadsafe(lambda: tasks[0].cancel())
+        try:
+            done.result(grace)
+        except concurrent.futures.CancelledError:
+            raise CommandTimeoutError(timeout)
+        except concurrent.futures.TimeoutError:
+            if not done.done():
+                raise CommandTimeoutError(timeout, stopped=False)
+        raise CommandTimeoutError(timeout)
+
+    def _run_forever(self):
+        loop = asyncio.new_event_loop()
+        loop.set_default_executor(
+            concurrent.futures.ThreadPoolExecutor(self.io_workers, thread_name_prefix="hotconsole-io")
+        )
+        asyncio.set_event_loop(loop)
+        self.loop = loop
+        self._ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            for task in asyncio.all_tasks(loop):
+                task.cancel()
+            loop.run_until_complete(loop.shutdown_default_executor())
+            loop.close()
+
+    @staticmethod
+    def _copy_outcome(done: concurrent.futures.Future, task: asyncio.Task):
+        if task.cancelled():
+            done.cancel()
+        elif task.exception() is not None:
+            done.set_exception(task.exception())
+        else:
+            done.set_result(task.result())
+
+
+class AsyncHelper:
+    """Общие ресурсы асинхронных команд. requests и sqlite блокирующие, поэтому вызовы уходят в пул потоков
+    общего цикла, а команда в это время ждет через await. Так несколько запросов, обращений к БД и проверок служб
+    выполняются одновременно без своих потоков и циклов в каждой команде:
+
+        async def check_cashbox(option_number: int | None):
+            shift, statuses = await asyncio.gather(
+                AsyncHelper.get_json(f"{API}/shift"), AsyncHelper.service_statuses(["KonturMarket"])
+            )
+    """
+
+    _session: requests.Session | None = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def session(cls) -> requests.Session:
+        """Общая сессия requests: соединения с серверами переиспользуются между командами"""
+        with cls._lock:
+            if cls._session is None:
+                cls._session = requests.Session()
+            return cls._session
+
+    @classmethod
+    def close(cls):
+        """Закрывает общую сессию. Следующий запрос откроет новую"""
+        with cls._lock:
+            session, cls._session = cls._session, None
+        if session is not None:
+            session.close()
+
+    @classmethod
+    async def get_json(cls, url: str, cache: HttpCache | None = None) -> dict:
+        return await asyncio.to_thread(RequestsHelper.do_get_request, cls.session(), url, cache)
+
+    @classmethod
+    async def post_json(cls, url: str, body: str) -> dict | None:
+        return await asyncio.to_thread(RequestsHelper.do_post_request, cls.session(), url, body)
+
+    @classmethod
+    async def query(cls, db_path: str, query: str, params: tuple = (), use_cache: bool = False):
+        """Запрос к БД SQLite через DBHelper.connect_and_execute_query"""
+        return await asyncio.to_thread(DBHelper.connect_and_execute_query, db_path, query, params, use_cache)
+
+    @classmethod
+    async def service_statuses(cls, services: list[str]) -> dict[str, ServiceStatus | None]:
+        return await asyncio.to_thread(OSHelper.get_service_statuses, services)
+
+    @classmethod
+    async def run(cls, function: Callable, *args, **kwargs) -> Any:
+        """Любой другой блокирующий вызов"""
+        return await asyncio.to_thread(function, *args, **kwargs)
@@ -0,0 +1,346 @@
+"""
+Модуль с кэшами: постоянный "ключ - значение" в SQLite (отдельно от data.json), ответов API и запросов к БД
+
+Classes
+-------
+KeyValueCache
+    Кэш в файле SQLite в папке со скриптами: пространства имен, время жизни и вытеснение давно не используемых записей
+HttpCache
+    Кэш ответов GET-запросов с условными запросами по ETag и Last-Modified и учетом Cache-Control
+QueryCache
+    Кэш результатов SELECT в памяти, который сбрасывается при изменении файла базы
+"""
+
+import collections
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from typing import Any, Callable
+
+_MISSING = object()
+
+
+class KeyValueCache:
+    """Кэш для значений, которые команды сохраняют между запусками. В отличие от data.json, запись одного значения
+    не переписывает весь файл и не проходит валидацию конфига. Значения хранятся в JSON.
+    Когда записей или байт становится больше лимита, удаляются те, к которым дольше всего не обращались
+
+    Parameters
+    ----------
+    path: str
+        Файл базы кэша
+    max_entries: int
+        Сколько записей хранить
+    max_bytes: int
+        Сколько байт значений хранить
+    evict_every: int
+        Через сколько записей проверять лимиты
+    """
+
+    _instances: dict[str, "KeyValueCache"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(
+            self,
+            path: str,
+            max_entries: int = 10_000,
+            max_bytes: int = 50 * 1024 * 1024,
+            evict_every: int = 64,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.evict_every = evict_every
+        self._lock = threading.Lock()
+        self._writes = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS entries (namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+            "size INTEGER NOT NULL, expires_at REAL, accessed_at REAL NOT NULL, PRIMARY KEY (namespace, key))"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)")
+
+    @classmethod
+    def for_folder(cls, folder: str, name: str = ".hotconsole-cache.db") -> "KeyValueCache":
+        """Общий кэш приложения из папки со скриптами. Открывается один раз на процесс"""
+        path = os.path.join(folder, name)
+        with cls._instances_lock:
+            if path not in cls._instances:
+                cls._instances[path] = cls(path)
+            return cls._instances[path]
+
+    def get(self, key: str, namespace: str = "", default: Any = None) -> Any:
+        """Значение по ключу. Если его нет или истекло время жизни - default"""
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, expires_at FROM entries WHERE namespace = ? AND key = ?", (namespace, key)
+            ).fetchone()
+            if row is None:
+                return default
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self._connection.execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key))
+                return default
+            self._connection.execute(
+                "UPDATE entries SET accessed_at = ? WHERE namespace = ? AND key = ?", (now, namespace, key)
+            )
+        return json.loads(value)
+
+    def set(self, key: str, value: Any, namespace: str = "", ttl: float | None = None):
+        """Сохраняет значение. ttl - время жизни в секундах, None - без ограничения"""
+        data = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+        expires_at = None if ttl is None else now + ttl
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                (namespace, key, data, len(data.encode("utf-8")), expires_at, now),
+            )
+            self._writes += 1
+            if self._writes % self.evict_every == 0:
+                self._evict(now)
+
+    def get_or_set(self, key: str, producer: Callable[[], Any], namespace: str = "", ttl: float | None = None) -> Any:
+        """Значение из кэша, а если его нет - результат producer(), который сразу сохраняется"""
+        value = self.get(key, namespace, _MISSING)
+        if value is _MISSING:
+            value = producer()
+            self.set(key, value, namespace, ttl)
+        return value
+
+    def delete(self, key: str, namespace: str = ""):
+        with self._lock:
+            self._connection.execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def clear(self, namespace: str | None = None):
+        """Удаляет все записи - или только записи одного пространства имен"""
+        with self._lock:
+            if namespace is None:
+                self._connection.execute("DELETE FROM entries")
+            else:
+                self._connection.execute("DELETE FROM entries WHERE namespace = ?", (namespace,))
+
+    def evict(self):
+        """Удаляет истекшие записи и давно не используемые сверх лимитов"""
+        with self._lock:
+            self._evict(time.time())
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            entries, size = self._connection.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return {"entries": entries, "bytes": size}
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+        with self._instances_lock:
+            if self._instances.get(self.path) is self:
+                del self._instances[self.path]
+
+    @classmethod
+    def close_all(cls):
+        """Закрывает все общие кэши. При следующем for_folder кэш откроется заново"""
+        with cls._instances_lock:
+            caches = list(cls._instances.values())
+        for cache in caches:
+            cache.close()
+
+    def _evict(self, now: float):
+        self._connection.execute("DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+        self._connection.execute(
+            "DELETE FROM entries WHERE rowid IN (SELECT rowid FROM (SELECT rowid, "
+            "ROW_NUMBER() OVER (ORDER BY accessed_at DESC) AS number, "
+            "SUM(size) OVER (ORDER BY accessed_at DESC ROWS UNBOUNDED PRECEDING) AS total FROM entries) "
+            "WHERE number > ? OR total > ?)",
+            (self.max_entries, self.max_bytes),
+        )
+
+
+class HttpCache:
+    """Кэш ответов справочных API на диске. Пока не истек Cache-Control: max-age, ответ берется из кэша без запроса.
+    Потом отправляется условный запрос с If-None-Match и If-Modified-Since, и на ответ 304 сервер не присылает тело.
+    Ответы с Cache-Control: no-store не сохраняются
+
+    Parameters
+    ----------
+    path: str
+        Файл базы кэша
+    max_entries: int
+        Сколько ответов хранить - лишние вытесняются, начиная с давно не используемых
+    """
+
+    _namespace = "http"
+    _instances: dict[str, "HttpCache"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, path: str, max_entries: int = 500):
+        self.store = KeyValueCache(path, max_entries=max_entries, evict_every=16)
+        self.hits = 0
+        self.revalidations = 0
+        self.misses = 0
+
+    @classmethod
+    def for_folder(cls, folder: str, name: str = ".hotconsole-http-cache.db") -> "HttpCache":
+        path = os.path.join(folder, name)
+        with cls._instances_lock:
+            if path not in cls._instances:
+                cls._instances[path] = cls(path)
+            return cls._instances[path]
+
+    def get(self, session, url: str, check: Callable[[Any], None] | None = None) -> str:
+        """Текст ответа на GET-запрос через session (requests.Session): из кэша, после ответа 304 или новый.
+        check вызывается для каждого настоящего ответа - например, чтобы выбросить ошибку на 4xx и 5xx"""
+        entry = self.store.get(url, self._namespace)
+        now = time.time()
+        if entry is not None and entry["fresh_until"] > now:
+            self.hits += 1
+            return entry["body"]
+        headers = {}
+        if entry is not None and entry["etag"] is not None:
+            headers["If-None-Match"] = entry["etag"]
+        if entry is not None and entry["last_modified"] is not None:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        response = session.get(url, headers=headers)
+        cache_control = response.headers.get("Cache-Control", "")
+        if response.status_code == 304 and entry is not None:
+            self.revalidations += 1
+            entry["fresh_until"] = now + self.max_age(cache_control)
+            self.store.set(url, entry, self._namespace)
+            return entry["body"]
+        if check is not None:
+            check(response)
+        self.misses += 1
+        if "no-store" not in cache_control.lower():
+            entry = {
+                "body": response.text,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "fresh_until": now + self.max_age(cache_control),
+            }
+            self.store.set(url, entry, self._namespace)
+        return response.text
+
+    @staticmethod
+    def max_age(cache_control: str) -> float:
+        """Сколько секунд ответ свежий. При no-cache или без max-age - 0, то есть каждый раз условный запрос"""
+        if "no-cache" in cache_control.lower():
+            return 0
+        match = re.search(r"max-age=(\d+)", cache_control, re.IGNORECASE)
+        return int(match.group(1)) if match is not None else 0
+
+    def stats(self) -> dict[str, int]:
+        """Счетчики: hits - без запроса, revalidations - по ответу 304, misses - скачано заново"""
+        return {"hits": self.hits, "revalidations": self.revalidations, "misses": self.misses, **self.store.stats()}
+
+    def clear(self):
+        self.store.clear(self._namespace)
+
+    def close(self):
+        self.store.close()
+        with self._instances_lock:
+            for path, cache in list(self._instances.items()):
+                if cache is self:
+                    del self._instances[path]
+
+    @classmethod
+    def close_all(cls):
+        with cls._instances_lock:
+            caches = list(cls._instances.values())
+        for cache in caches:
+            cache.close()
+
+
+class QueryCache:
+    """Кэш результатов SELECT в памяти. Ключ - адрес базы, текст запроса и параметры.
+    Результат действителен, пока у файла базы и его -wal не изменились время изменения и размер:
+    это проверяется одним os.stat без открытия соединения. При превышении max_bytes
+    вытесняются давно не используемые результаты
+
+    Parameters
+    ----------
+    max_bytes: int
+        Примерный объем памяти под результаты
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.size = 0
+        self._entries: collections.OrderedDict[tuple, tuple[tuple, list, int]] = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_execute(self, db_path: str, query: str, params: tuple, execute: Callable[[], list]) -> list:
+        """Строки из кэша, если база не менялась, а иначе - результат execute(), который сохраняется"""
+        key = (os.path.abspath(db_path), query, tuple(params))
+        signature = self.signature(db_path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == signature:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self.bytes_saved += entry[2]
+                return list(entry[1])
+        self.misses += 1
+        rows = execute()
+        size = self.estimate_size(rows)
+        if size <= self.max_bytes:
+            with self._lock:
+                self._store(key, (signature, list(rows), size))
+        return rows
+
+    @staticmethod
+    def signature(db_path: str) -> tuple:
+        """Время изменения и размер файла базы и журнала WAL - меняются при любой записи"""
+        result = []
+        for path in (db_path, db_path + "-wal"):
+            try:
+                stat = os.stat(path)
+                result.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                result.append(None)
+        return tuple(result)
+
+    @staticmethod
+    def estimate_size(rows: list) -> int:
+        size = sys.getsizeof(rows)
+        for row in rows:
+            size += sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row)
+        return size
+
+    def invalidate(self, db_path: str | None = None):
+        """Сбрасывает результаты одной базы или все"""
+        with self._lock:
+            for key in list(self._entries):
+                if db_path is None or key[0] == os.path.abspath(db_path):
+                    self.size -= self._entries.pop(key)[2]
+
+    def stats(self) -> dict[str, float]:
+        """Счетчики: попадания, промахи, доля попаданий, сколько байт не пришлось читать из базы заново"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total != 0 else 0.0,
+            "bytes_saved": self.bytes_saved,
+            "entries": len(self._entries),
+            "bytes": self.size,
+        }
+
+    def _store(self, key: tuple, entry: tuple[tuple, list, int]):
+        if key in self._entries:
+            self.size -= self._entries.pop(key)[2]
+        self._entries[key] = entry
+        self.size += entry[2]
+        while self.size > self.max_bytes:
+            _, (_, _, size) = self._entries.popitem(last=False)
+            self.size -= size
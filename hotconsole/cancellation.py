@@ -0,0 +1,97 @@
+"""
+Модуль с ограничением времени выполнения команд и их отменой
+
+Classes
+-------
+CommandTimeoutError
+    Ошибка: команда не уложилась в отведенное время
+CancellationToken
+    Флаг отмены, который команда может проверять сама
+TimeoutRunner
+    Запускает команду с ограничением по времени в отдельном потоке
+
+Принудительная остановка команд в отдельном процессе - в модуле hotconsole.worker
+"""
+
+import contextvars
+import threading
+from typing import Callable
+
+
+class CommandTimeoutError(Exception):
+    """Команда не уложилась в отведенное время и была отменена или остановлена"""
+
+    def __init__(self, timeout: float, stopped: bool = True):
+        self.timeout = timeout
+        self.stopped = stopped
+        message = f"Команда выполнялась дольше {timeout:g} с"
+        message += " и была остановлена" if stopped else " и не ответила на отмену - она доработает в фоне"
+        super().__init__(message)
+
+
+class CancellationToken:
+    """Флаг отмены команды. Долгие команды проверяют его между шагами через
+    CommandHelpers.check_cancelled() или ждут через CommandHelpers.sleep(), чтобы отмена прерывала ожидание"""
+
+    _current: contextvars.ContextVar["CancellationToken | None"] = contextvars.ContextVar(
+        "cancellation_token", default=None
+    )
+
+    def __init__(self):
+        self._event = threading.Event()
+        self.timeout: float | None = None
+
+    @classmethod
+    def current(cls) -> "CancellationToken | None":
+        """Токен команды, которая выполняется в текущем контексте"""
+        return cls._current.get()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        if self.is_cancelled:
+            raise CommandTimeoutError(self.timeout or 0)
+
+    def sleep(self, seconds: float):
+        """Пауза, которая сразу прерывается при отмене"""
+        if self._event.wait(seconds):
+            self.raise_if_cancelled()
+
+
+class TimeoutRunner:
+    """Запускает функцию команды с ограничением по времени"""
+
+    @classmethod
+    def run_in_thread(cls, execute: Callable, option_number, timeout: float, grace: float = 5):
+        """Сначала команду просят остановиться через токен отмены. Поток нельзя убить принудительно,
+        поэтому если команда не реагирует за grace секунд, она дорабатывает в фоне, а Executor идет дальше"""
+        token = CancellationToken()
+        token.timeout = timeout
+        outcome: dict = {}
+
+        def target():
+            CancellationToken._current.set(token)
+            try:
+                outcome["result"] = execute(option_number)
+            except BaseException as e:
+                outcome["error"] = e
+
+        context = contextvars.copy_context()
+        thread = threading.Thread(target=context.run, args=(target,), daemon=True, name="hotconsole-command")
+        thread.start()
+        thread.join(timeout)
+        if thread.is_alive():
+            token.cancel()
+            thread.join(grace)
+            if thread.is_alive():
+                raise CommandTimeoutError(timeout, stopped=False)
+            if "error" not in outcome or isinstance(outcome["error"], CommandTimeoutError):
+                raise CommandTimeoutError(timeout)
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome.get("result")
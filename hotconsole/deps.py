@@ -0,0 +1,114 @@
+"""
+Модуль для установки зависимостей скриптов из requirements.txt без лишних запусков pip
+
+Classes
+-------
+DependencyManager
+    Пропускает pip, если requirements.txt и установленные версии не изменились,
+    а при установке сначала берет пакеты из локальной папки wheelhouse
+"""
+
+import hashlib
+import importlib.metadata
+import importlib.util
+import json
+import os
+import re
+import subprocess
+import sys
+
+
+class DependencyManager:
+    """Следит за зависимостями из requirements.txt в папке со скриптами
+
+    Parameters
+    ----------
+    folder: str
+        Папка со скриптами, в которой лежат requirements.txt и (необязательно) папка wheelhouse
+    requirements_name: str
+        Имя файла с зависимостями
+    wheelhouse_name: str
+        Имя папки с заранее скачанными пакетами, из которой можно ставить без сети
+    state_name: str
+        Имя файла, в котором хранится хэш requirements.txt и установленные версии
+    """
+
+    def __init__(
+            self,
+            folder: str,
+            requirements_name: str = "requirements.txt",
+            wheelhouse_name: str = "wheelhouse",
+            state_name: str = ".hotconsole-deps.json",
+    ):
+        self.requirements_path = os.path.join(folder, requirements_name)
+        self.wheelhouse_path = os.path.join(folder, wheelhouse_name)
+        self.state_path = os.path.join(folder, state_name)
+
+    def ensure(self) -> bool:
+        """Устанавливает зависимости, только если что-то изменилось. Возвращает True, если pip запускался"""
+        if not os.path.exists(self.requirements_path) or self.is_satisfied():
+            return False
+        self.install()
+        return True
+
+    def is_satisfied(self) -> bool:
+        """Совпадают ли хэш requirements.txt и версии пакетов с тем, что было после прошлой установки"""
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as file:
+                state = json.loads(file.read())
+        except (OSError, ValueError):
+            return False
+        if state.get("hash") != self.requirements_hash():
+            return False
+        versions = self.installed_versions()
+        return None not in versions.values() and state.get("versions") == versions
+
+    def install(self):
+        """Ставит зависимости: из wheelhouse без сети, а если там чего-то нет - из интернета"""
+        if importlib.util.find_spec("pip") is None:
+            subprocess.check_call([sys.executable, "-m", "ensurepip"])
+        pip_install = [sys.executable, "-m", "pip", "install", "-r", self.requirements_path]
+        if os.path.isdir(self.wheelhouse_path):
+            offline = pip_install + ["--no-index", "--find-links", self.wheelhouse_path]
+            if subprocess.call(offline) != 0:
+                subprocess.check_call(pip_install + ["--find-links", self.wheelhouse_path])
+        else:
+            subprocess.check_call(pip_install)
+        self.save_state()
+
+    def fill_wheelhouse(self):
+        """Скачивает пакеты из requirements.txt в wheelhouse, чтобы потом ставить их без сети"""
+        download = [sys.executable, "-m", "pip", "download", "-r", self.requirements_path, "-d", self.wheelhouse_path]
+        subprocess.check_call(download)
+
+    def save_state(self):
+        state = {"hash": self.requirements_hash(), "versions": self.installed_versions()}
+        with open(self.state_path, "w", encoding="utf-8") as file:
+            file.write(json.dumps(state, indent=4))
+
+    def requirements_hash(self) -> str:
+        with open(self.requirements_path, "rb") as file:
+            return hashlib.sha256(file.read()).hexdigest()
+
+    def requirement_names(self) -> list[str]:
+        """Имена пакетов из requirements.txt без версий, опций и комментариев"""
+        names = []
+        with open(self.requirements_path, "r", encoding="utf-8") as file:
+            for line in file:
+                line = line.split("#")[0].strip()
+                if line == "" or line.startswith("-"):
+                    continue
+                match = re.match(r"[A-Za-z0-9][A-Za-z0-9._-]*", line)
+                if match is not None:
+                    names.append(match.group(0))
+        return names
+
+    def installed_versions(self) -> dict[str, str | None]:
+        """Установленные версии пакетов из requirements.txt. None - если пакет не установлен"""
+        versions: dict[str, str | None] = {}
+        for name in self.requirement_names():
+            try:
+                versions[name] = importlib.metadata.version(name)
+            except importlib.metadata.PackageNotFoundError:
+                versions[name] = None
+        return versions
@@ -0,0 +1,387 @@
+"""
+Модуль для быстрой работы с большими папками: удаление и синхронизация
+
+Classes
+-------
+DeletionReport
+    Датакласс с итогами удаления папки
+FolderDeleter
+    Параллельно удаляет файлы папки и повторяет попытки только для заблокированных файлов
+SyncReport
+    Датакласс с итогами синхронизации папок
+FolderSync
+    Копирует в целевую папку только изменившиеся файлы и удаляет лишние
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import stat
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable
+
+
+@dataclass
+class DeletionReport:
+    """Итоги удаления папки
+
+    Parameters
+    ----------
+    path: str
+        Удаляемая папка
+    files: int
+        Сколько файлов удалено
+    folders: int
+        Сколько папок удалено
+    size: int
+        Сколько байт освобождено
+    failed: list[str]
+        Файлы и папки, которые не удалось удалить даже после всех попыток
+    elapsed: float
+        Сколько секунд заняло удаление
+    """
+
+    path: str
+    files: int = 0
+    folders: int = 0
+    size: int = 0
+    failed: list[str] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def is_success(self) -> bool:
+        return len(self.failed) == 0
+
+    def __str__(self):
+        report = (
+            f"Файлов: {self.files}, папок: {self.folders}, {self.size / 1024 / 1024:.1f} МБ "
+            f"за {self.elapsed:.1f} с"
+        )
+        if not self.is_success:
+            report += f". Не удалось удалить: {len(self.failed)}, например {self.failed[0]}"
+        return report
+
+
+class FolderDeleter:
+    """Удаляет папку: файлы - параллельно, заблокированные файлы - повторно с растущей паузой
+
+    Parameters
+    ----------
+    workers: int
+        Сколько файлов удаляется одновременно
+    retries: int
+        Сколько раз повторять удаление файлов, которые не удалось удалить
+    backoff: float
+        Пауза перед первым повтором в секундах, дальше она удваивается
+    on_progress: Callable[[int, int], None] | None
+        Вызывается после каждой пачки файлов с количеством удаленных и общим количеством
+    """
+
+    def __init__(
+            self,
+            workers: int = 8,
+            retries: int = 5,
+            backoff: float = 0.2,
+            on_progress: Callable[[int, int], None] | None = None,
+    ):
+        self.workers = max(workers, 1)
+        self.retries = retries
+        self.backoff = backoff
+        self.on_progress = on_progress
+
+    def delete(self, path: str) -> DeletionReport:
+        """Удаляет папку и возвращает отчет"""
+        start = time.monotonic()
+        report = DeletionReport(path)
+        files, folders = self._scan(path)
+        total = len(files)
+        pending = list(files)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for attempt in range(self.retries + 1):
+                if attempt > 0:
+                    time.sleep(self.backoff * 2 ** (attempt - 1))
+                removed = list(pool.map(self._remove_file, pending))
+                pending = [file for file, is_removed in zip(pending, removed) if not is_removed]
+                if self.on_progress is not None:
+                    self.on_progress(total - len(pending), total)
+                if len(pending) == 0:
+                    break
+        failed = set(pending)
+        report.files = total - len(failed)
+        report.size = sum(size for file, size in files.items() if file not in failed)
+        report.failed = sorted(failed)
+        folder_retries = self.retries if len(failed) == 0 else 0
+        for folder in folders:
+            if self._remove_folder(folder, folder_retries):
+                report.folders += 1
+            elif len(failed) == 0:
+                report.failed.append(folder)
+        report.elapsed = time.monotonic() - start
+        return report
+
+    def delete_in_background(self, path: str, on_done: Callable[[DeletionReport], None] | None = None):
+        """Сразу переименовывает папку, а удаляет ее в фоновом потоке. Исходный адрес освобождается моментально.
+        Если переименовать не получилось (например, папка занята), возвращает None"""
+        trash_path = f"{path.rstrip(os.sep)}.deleting-{time.time_ns()}"
+        try:
+            os.rename(path, trash_path)
+        except OSError:
+            return None
+
+        def delete_trash():
+            report = self.delete(trash_path)
+            if on_done is not None:
+                on_done(report)
+
+        thread = threading.Thread(target=delete_trash, daemon=True)
+        thread.start()
+        return thread
+
+    def _scan(self, path: str) -> tuple[dict[str, int], list[str]]:
+        """Один обход дерева: файлы с размерами и папки в порядке от самых вложенных"""
+        files: dict[str, int] = {}
+        folders: list[str] = []
+        stack = [path]
+        while stack:
+            folder = stack.pop()
+            folders.append(folder)
+            try:
+                with os.scandir(folder) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        else:
+                            files[entry.path] = entry.stat(follow_symlinks=False).st_size
+            except OSError:
+                continue
+        folders.sort(key=lambda folder: folder.count(os.sep), reverse=True)
+        return files, folders
+
+    @staticmethod
+    def _remove_file(path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return True
+        except PermissionError:
+            try:
+                os.chmod(path, stat.S_IWRITE)
+                os.remove(path)
+                return True
+            except OSError:
+                return False
+        except OSError:
+            return False
+
+    def _remove_folder(self, path: str, retries: int) -> bool:
+        """Папки с оставшимися заблокированными файлами не повторяем - они все равно не удалятся"""
+        for attempt in range(retries + 1):
+            try:
+                os.rmdir(path)
+                return True
+            except FileNotFoundError:
+                return True
+            except OSError:
+                if attempt < retries:
+                    time.sleep(self.backoff * 2 ** attempt)
+        return False
+
+
+@dataclass
+class SyncReport:
+    """Итоги синхронизации папок
+
+    Parameters
+    ----------
+    source: str
+        Папка, из которой копируем
+    target: str
+        Папка, в которую копируем
+    copied: list[str]
+        Новые и изменившиеся файлы (относительные пути)
+    deleted: list[str]
+        Файлы, которых больше нет в источнике и которые удалены из целевой папки
+    unchanged: int
+        Сколько файлов совпало и не копировалось
+    size: int
+        Сколько байт скопировано
+    failed: list[str]
+        Файлы, которые не удалось скопировать или удалить
+    elapsed: float
+        Сколько секунд заняла синхронизация
+    """
+
+    source: str
+    target: str
+    copied: list[str] = field(default_factory=list)
+    deleted: list[str] = field(default_factory=list)
+    unchanged: int = 0
+    size: int = 0
+    failed: list[str] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def is_success(self) -> bool:
+        return len(self.failed) == 0
+
+    def __str__(self):
+        report = (
+            f"Скопировано: {len(self.copied)} ({self.size / 1024 / 1024:.1f} МБ), удалено: {len(self.deleted)}, "
+            f"без изменений: {self.unchanged} за {self.elapsed:.1f} с"
+        )
+        if not self.is_success:
+            report += f". Ошибки: {len(self.failed)}, например {self.failed[0]}"
+        return report
+
+
+class FolderSync:
+    """Синхронизирует целевую папку с источником: копирует только отличающиеся файлы и удаляет лишние.
+    Файлы сравниваются по размеру и времени изменения, а при use_hash - еще и по содержимому.
+    Хэши кэшируются в манифесте в целевой папке, поэтому неизменные файлы повторно не читаются
+
+    Parameters
+    ----------
+    workers: int
+        Сколько файлов копируется одновременно
+    use_hash: bool
+        Сравнивать ли файлы по хэшу содержимого, если размер совпал, а время изменения - нет
+    delete_stale: bool
+        Удалять ли из целевой папки файлы, которых нет в источнике
+    manifest_name: str
+        Имя файла манифеста в целевой папке. Он не копируется и не удаляется
+    """
+
+    def __init__(
+            self,
+            workers: int = 8,
+            use_hash: bool = False,
+            delete_stale: bool = True,
+            manifest_name: str = ".hotconsole-sync.json",
+    ):
+        self.workers = max(workers, 1)
+        self.use_hash = use_hash
+        self.delete_stale = delete_stale
+        self.manifest_name = manifest_name
+
+    def sync(self, source: str, target: str) -> SyncReport:
+        """Синхронизирует папки и возвращает отчет"""
+        start = time.monotonic()
+        report = SyncReport(source, target)
+        source_files = self._scan(source)
+        target_files = self._scan(target) if os.path.isdir(target) else {}
+        target_files.pop(self.manifest_name, None)
+        manifest = self._load_manifest(target)
+        new_manifest: dict[str, dict] = {}
+        to_copy = []
+        for relative_path, source_stat in source_files.items():
+            target_stat = target_files.get(relative_path)
+            entry = self._compare(source, target, relative_path, source_stat, target_stat, manifest)
+            if entry is None:
+                to_copy.append(relative_path)
+            else:
+                report.unchanged += 1
+                new_manifest[relative_path] = entry
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            entries = list(pool.map(lambda path: self._copy(source, target, path), to_copy))
+        for relative_path, entry in zip(to_copy, entries):
+            if entry is None:
+                report.failed.append(relative_path)
+                continue
+            report.copied.append(relative_path)
+            report.size += entry["size"]
+            new_manifest[relative_path] = entry
+        if self.delete_stale:
+            for relative_path in sorted(set(target_files) - set(source_files)):
+                if FolderDeleter._remove_file(os.path.join(target, relative_path)):
+                    report.deleted.append(relative_path)
+                else:
+                    report.failed.append(relative_path)
+            self._remove_empty_folders(target)
+        self._save_manifest(target, new_manifest)
+        report.elapsed = time.monotonic() - start
+        return report
+
+    def _compare(
+            self,
+            source: str,
+            target: str,
+            relative_path: str,
+            source_stat: tuple[int, int],
+            target_stat: tuple[int, int] | None,
+            manifest: dict,
+    ) -> dict | None:
+        """Если файл в целевой папке совпадает с источником, возвращает запись для манифеста, иначе None"""
+        if target_stat is None or source_stat[0] != target_stat[0]:
+            return None
+        entry = manifest.get(relative_path, {})
+        known_hash = entry.get("hash") if [entry.get("size"), entry.get("mtime")] == list(target_stat) else None
+        if source_stat[1] == target_stat[1]:
+            return {"size": target_stat[0], "mtime": target_stat[1], "hash": known_hash}
+        if not self.use_hash or known_hash is None or self._hash(os.path.join(source, relative_path)) != known_hash:
+            return None
+        os.utime(os.path.join(target, relative_path), ns=(source_stat[1], source_stat[1]))
+        return {"size": source_stat[0], "mtime": source_stat[1], "hash": known_hash}
+
+    def _scan(self, path: str) -> dict[str, tuple[int, int]]:
+        """Файлы папки: относительный путь -> (размер, время изменения в наносекундах)"""
+        files: dict[str, tuple[int, int]] = {}
+        stack = [path]
+        while stack:
+            folder = stack.pop()
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    else:
+                        entry_stat = entry.stat(follow_symlinks=False)
+                        files[os.path.relpath(entry.path, path)] = (entry_stat.st_size, entry_stat.st_mtime_ns)
+        return files
+
+    def _copy(self, source: str, target: str, relative_path: str) -> dict | None:
+        """Копирует файл и возвращает запись для манифеста. При ошибке - None"""
+        source_path = os.path.join(source, relative_path)
+        target_path = os.path.join(target, relative_path)
+        try:
+            os.makedirs(os.path.dirname(target_path), exist_ok=True)
+            if os.path.exists(target_path) and not os.access(target_path, os.W_OK):
+                os.chmod(target_path, stat.S_IWRITE)
+            shutil.copy2(source_path, target_path)
+            target_stat = os.stat(target_path)
+            file_hash = self._hash(source_path) if self.use_hash else None
+            return {"size": target_stat.st_size, "mtime": target_stat.st_mtime_ns, "hash": file_hash}
+        except OSError:
+            return None
+
+    @staticmethod
+    def _hash(path: str) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _load_manifest(self, target: str) -> dict:
+        try:
+            with open(os.path.join(target, self.manifest_name), "r", encoding="utf-8") as file:
+                return json.loads(file.read())
+        except (OSError, ValueError):
+            return {}
+
+    def _save_manifest(self, target: str, manifest: dict):
+        if not os.path.isdir(target):
+            return
+        with open(os.path.join(target, self.manifest_name), "w", encoding="utf-8") as file:
+            file.write(json.dumps(manifest))
+
+    def _remove_empty_folders(self, target: str):
+        for folder, _, _ in sorted(os.walk(target), key=lambda item: item[0].count(os.sep), reverse=True):
+            if folder != target:
+                try:
+                    os.rmdir(folder)
+                except OSError:
+                    pass
@@ -6,44 +6,59 @@ Classes
 OSHelper
     Для взаимодействия с виндой (запуск служб, убийство процессов, переключение окон)
 ServiceState(Enum)
-    Состояние службы
+    Состояние службы (объявлено в hotconsole.services вместе с ServiceMonitor)
 DBHelper
     Для взаимодействия с БД SQLite
 RequestsHelper
     Для создания запросов к внешнему API.
 InnGenerator
     Для генерации ИНН
+
+Массовая генерация тестовых данных (ИНН, КПП, ОГРН, СНИЛС) вынесена в модуль hotconsole.testdata
+
+Быстрое удаление и синхронизация больших папок вынесены в модуль hotconsole.files
 """
 
 import ctypes
+import datetime
+import itertools
 import json
-import keyboard
 import os
 import random
 import re
 import requests
-import shutil
 import sqlite3
 import string
-import subprocess
 import sys
 import time
 import traceback
-import win32api
-import win32con
-import win32gui
 from PIL import Image
-from enum import Enum
+from typing import Callable, Iterable
+
+from hotconsole.cache import HttpCache, QueryCache
+from hotconsole.files import DeletionReport, FolderDeleter, FolderSync, SyncReport
+from hotconsole.logs import CommandLog
+from hotconsole.platform import Platform
+from hotconsole.prompts import PromptBroker
+from hotconsole.services import ServiceMonitor, ServiceState, ServiceStatus
+from hotconsole.tracing import Tracer
 
 
 class DBHelper:
     """Класс для запросов в БД SQLite"""
 
+    result_cache = QueryCache()
+
     @classmethod
-    def connect_and_execute_query(cls, db_path: str, query: str):
-        """Открывает соединение, выполняет запрос и закрывает соединение"""
+    def connect_and_execute_query(cls, db_path: str, query: str, params: tuple = (), use_cache: bool = False):
+        """Открывает соединение, выполняет запрос и закрывает соединение.
+        С use_cache результат SELECT запоминается и переиспользуется, пока файл базы не изменился"""
+        if use_cache and query.split()[0].lower() == "select":
+            return cls.result_cache.get_or_execute(
+                db_path, query, params, lambda: cls.execute_query(cls.connect(db_path), query, True, params)
+            )
         con = cls.connect(db_path)
-        return cls.execute_query(con, query, True)
+        return cls.execute_query(con, query, True, params)
 
     @classmethod
     def connect(cls, db_path: str):
@@ -57,11 +72,11 @@ class DBHelper:
         return sqlite3.connect(db_path)
 
     @classmethod
-    def execute_query(cls, con: sqlite3.Connection, query: str, close_connection: bool = True):
+    def execute_query(cls, con: sqlite3.Connection, query: str, close_connection: bool = True, params: tuple = ()):
         """Выполняет запрос к БД. Не используется with, т.к. он не закрывает соединение"""
         try:
             cur = con.cursor()
-            cur.execute(query)
+            cur.execute(query, params)
             statement = query.split()[0].lower()
             if statement == "select":
                 return cur.fetchall()
@@ -72,12 +87,112 @@ class DBHelper:
             if close_connection:
                 con.close()
 
+    @classmethod
+    def insert_many(cls, db_path: str, table: str, rows: Iterable[dict], batch_size: int = 10_000) -> int:
+        """Вставляет строки пачками через executemany в одной транзакции. Если таблицы нет, она создается
+        с колонками из первой строки. Возвращает количество вставленных строк"""
+        iterator = iter(rows)
+        first = next(iterator, None)
+        if first is None:
+            return 0
+        columns = list(first)
+        names = ", ".join(f'"{column}"' for column in columns)
+        query = f'INSERT INTO "{table}" ({names}) VALUES ({", ".join("?" * len(columns))})'
+        con = cls.connect(db_path)
+        try:
+            con.execute(f'CREATE TABLE IF NOT EXISTS "{table}" ({names})')
+            count = 0
+            iterator = itertools.chain([first], iterator)
+            while batch := list(itertools.islice(iterator, batch_size)):
+                con.executemany(query, [tuple(row[column] for column in columns) for row in batch])
+                count += len(batch)
+            con.commit()
+            return count
+        except Exception as e:
+            raise sqlite3.OperationalError("В ходе вставки строк возникла ошибка") from e
+        finally:
+            con.close()
+
+    @classmethod
+    def snapshot(
+            cls,
+            db_path: str,
+            folder: str | None = None,
+            keep: int | None = 5,
+            pages: int = 256,
+            pause: float = 0.005,
+            progress: Callable[[int, int], None] | None = None,
+    ) -> str:
+        """Делает согласованную копию базы через backup API SQLite - даже пока касса пишет в базу.
+        Копирует по pages страниц и между пачками ждет pause секунд, чтобы не держать базу долго.
+        progress(скопировано, всего) вызывается после каждой пачки. Хранятся последние keep копий.
+        Возвращает адрес копии. По умолчанию копии лежат в папке snapshots рядом с базой"""
+        folder = folder or cls._snapshots_folder(db_path)
+        os.makedirs(folder, exist_ok=True)
+        name = os.path.splitext(os.path.basename(db_path))[0]
+        snapshot_path = os.path.join(folder, f"{name}-{datetime.datetime.now():%Y%m%d-%H%M%S-%f}.db")
+        cls._backup(cls.connect(db_path), sqlite3.connect(snapshot_path), pages, pause, progress)
+        if keep is not None:
+            cls.prune_snapshots(db_path, keep, folder)
+        return snapshot_path
+
+    @classmethod
+    def restore_snapshot(
+            cls,
+            snapshot_path: str,
+            db_path: str,
+            pages: int = 256,
+            pause: float = 0.005,
+            progress: Callable[[int, int], None] | None = None,
+    ):
+        """Восстанавливает базу из копии тем же backup API: другие соединения увидят целиком новую базу"""
+        cls._backup(cls.connect(snapshot_path), cls.connect(db_path), pages, pause, progress)
+
+    @classmethod
+    def list_snapshots(cls, db_path: str, folder: str | None = None) -> list[str]:
+        """Копии именно этой базы от старых к новым: копии db-old.db рядом с db.db не попадут в список"""
+        folder = folder or cls._snapshots_folder(db_path)
+        if not os.path.isdir(folder):
+            return []
+        pattern = re.escape(os.path.splitext(os.path.basename(db_path))[0]) + r"-\d{8}-\d{6}-\d{6}\.db"
+        names = sorted(name for name in os.listdir(folder) if re.fullmatch(pattern, name))
+        return [os.path.join(folder, name) for name in names]
+
+    @classmethod
+    def prune_snapshots(cls, db_path: str, keep: int, folder: str | None = None) -> list[str]:
+        """Удаляет все копии, кроме последних keep. Возвращает удаленные"""
+        snapshots = cls.list_snapshots(db_path, folder)
+        removed = snapshots[:max(len(snapshots) - keep, 0)]
+        for path in removed:
+            os.remove(path)
+        return removed
+
+    @classmethod
+    def _backup(
+            cls,
+            source: sqlite3.Connection,
+            target: sqlite3.Connection,
+            pages: int,
+            pause: float,
+            progress: Callable[[int, int], None] | None,
+    ):
+        def on_progress(status: int, remaining: int, total: int):
+            if progress is not None:
+                progress(total - remaining, total)
+            if remaining != 0 and pause > 0:
+                time.sleep(pause)
 
-class ServiceState(Enum):
-    """Состояние службы"""
+        try:
+            source.backup(target, pages=pages, progress=on_progress)
+        except sqlite3.Error as e:
+            raise sqlite3.OperationalError("Не удалось скопировать базу данных") from e
+        finally:
+            target.close()
+            source.close()
 
-    STOPPED = 1
-    RUNNING = 2
+    @staticmethod
+    def _snapshots_folder(db_path: str) -> str:
+        return os.path.join(os.path.dirname(os.path.abspath(db_path)), "snapshots")
 
 
 class OSHelper:
@@ -88,20 +203,20 @@ class OSHelper:
     @staticmethod
     def set_english_layout():
         """Выбирает английскую раскладку, которая необходима для корректной установки горячих клавиш"""
-        win32api.LoadKeyboardLayout("00000409", 1)
+        Platform.current().set_english_layout()
 
     @staticmethod
     def rerun_as_admin(even_if_admin: bool = False):
         """Перезпускает текущий скрипт из-под админа"""
         if not ctypes.windll.shell32.IsUserAnAdmin() or even_if_admin:
             ctypes.windll.shell32.ShellExecuteW(None, "runas", sys.executable, " ".join(sys.argv), None, 1)
+            CommandLog.shutdown()
             os._exit(1)
 
     @staticmethod
     def close_window(title: str):
         """Закрывает окно, которое находит по заголовку"""
-        hwnd = win32gui.FindWindow(None, title)
-        win32gui.PostMessage(hwnd, win32con.WM_CLOSE, 0, 0)
+        Platform.current().close_window(title)
 
     @staticmethod
     def get_vbs_script_for_admin_rights() -> str:
@@ -109,30 +224,41 @@ class OSHelper:
 cd /d "%~dp0" && ( if exist "%temp%\getadmin.vbs" del "%temp%\getadmin.vbs" ) && fsutil dirty query %systemdrive% 1>nul 2>nul || (  echo Set UAC = CreateObject^("Shell.Application"^) : UAC.ShellExecute "cmd.exe", "/k cd ""%~sdp0"" && ""%~s0"" %params%", "", "runas", 1 >> "%temp%\getadmin.vbs" && "%temp%\getadmin.vbs" && exit /B )"""
 
     @staticmethod
-    def write_install_libraries_bat(folder_path: str, bat_name: str):
+    def write_install_libraries_bat(folder_path: str, bat_name: str) -> bool:
         """Добавляет в папку батник для установки библиотек из requirements.txt.
-        Он нужен для пользователей, которые не готовы руками вводить команды
+        Он нужен для пользователей, которые не готовы руками вводить команды.
+        Если рядом есть папка wheelhouse, пакеты ставятся из нее без сети.
+        Файл перезаписывается, только если его содержимое изменилось
         """
         bat = f"""@echo off
 {OSHelper.get_vbs_script_for_admin_rights()}
-python -m ensurepip
-python -m pip install --upgrade hotconsole
-python -m pip install -r "requirements.txt"
+python -m pip --version >nul 2>&1 || python -m ensurepip
+if exist "wheelhouse" (
+    python -m pip install --upgrade --find-links "wheelhouse" hotconsole
+    python -m pip install --no-index --find-links "wheelhouse" -r "requirements.txt" || python -m pip install --find-links "wheelhouse" -r "requirements.txt"
+) else (
+    python -m pip install --upgrade hotconsole
+    python -m pip install -r "requirements.txt"
+)
 python -m pip show -v hotconsole
 set /p userInput=Press Enter to continue...
 exit
 """
-        folder_path = os.path.join(folder_path, bat_name)
-        if not os.path.exists(folder_path):
-            OSHelper.write_file(folder_path, bat)
+        bat_path = os.path.join(folder_path, bat_name)
+        if os.path.exists(bat_path):
+            with open(bat_path, "r", encoding="utf-8") as file:
+                if file.read() == bat:
+                    return False
+        OSHelper.write_file(bat_path, bat)
+        return True
 
     @staticmethod
     def set_title(title: str):
-        ctypes.windll.kernel32.SetConsoleTitleW(title)
+        Platform.current().set_title(title)
 
     @staticmethod
     def kill_process_by_name(process_name: str) -> bool:
-        output = subprocess.run(["tasklist"], capture_output=True, shell=True, check=True).stdout.decode("cp866")
+        output = Platform.current().run(["tasklist"])
         process_found = False
         for line in output.split("\r\n"):
             if line.startswith(process_name):
@@ -140,7 +266,7 @@ exit
                 pid = line.removeprefix(process_name).replace(" ", "")[:5]
                 if pid[4] not in string.digits:
                     pid = pid[:4]
-                subprocess.call(["taskkill", "/f", "/t", "/PID", pid])
+                Platform.current().call(["taskkill", "/f", "/t", "/PID", pid])
         return process_found
 
     @staticmethod
@@ -159,48 +285,65 @@ exit
 
     @staticmethod
     def change_service_state(target_state: ServiceState, service: str, timeout: int = 10) -> bool:
+        """Запускает или останавливает службу и ждет нужного состояния по событию от ServiceMonitor"""
         if OSHelper._service_has_target_state(target_state, service):
             return True
         match target_state:
             case ServiceState.STOPPED:
-                subprocess.call(["sc", "stop", service])
+                Platform.current().call(["sc", "stop", service])
             case ServiceState.RUNNING:
-                subprocess.call(["sc", "start", service])
+                Platform.current().call(["sc", "start", service])
             case _:
                 raise ValueError("Нет такого состояния службы!")
-        for _ in range(timeout):
-            time.sleep(1)
-            if OSHelper._service_has_target_state(target_state, service):
-                return True
-        return False
+        return ServiceMonitor.shared().wait_for(service, target_state, timeout)
+
+    @staticmethod
+    def get_service_statuses(services: list[str]) -> dict[str, ServiceStatus | None]:
+        """Состояние нескольких служб из одного опроса. None - если службы нет"""
+        monitor = ServiceMonitor.shared()
+        return {service: monitor.status(service, max_age=monitor.min_interval) for service in services}
 
     @staticmethod
     def _service_has_target_state(target_state: ServiceState, service: str) -> bool:
-        output = subprocess.run(["sc", "query", service], capture_output=True, shell=True, check=True).stdout.decode(
-            "cp866"
-        )
-        match target_state:
-            case ServiceState.STOPPED:
-                return "STOPPED" in output
-            case ServiceState.RUNNING:
-                return "RUNNING" in output
-            case _:
-                raise ValueError("Нет такого состояния службы!")
+        if target_state not in (ServiceState.STOPPED, ServiceState.RUNNING):
+            raise ValueError("Нет такого состояния службы!")
+        return ServiceMonitor.shared().has_state(service, target_state, max_age=0)
 
     @staticmethod
-    def delete_folder(file_path: str, retries: int = 5):
+    def delete_folder(file_path: str, retries: int = 5, background: bool = False) -> DeletionReport | None:
+        """Удаляет папку: файлы удаляются параллельно, а повторяются только заблокированные.
+        Если background = True, папка сразу переименовывается, а удаляется в фоне"""
         if not os.path.exists(file_path):
             print(f"\nНа ПК уже нет папки: {file_path}\n")
-            return
-        for _ in range(retries):
-            try:
-                shutil.rmtree(file_path)
-            except Exception:
-                pass
-            time.sleep(1)
-            if not os.path.exists(file_path):
-                print(f"\nУдалили: {file_path}\n")
-                return
+            return None
+        deleter = FolderDeleter(retries=retries)
+        if background:
+            if deleter.delete_in_background(file_path, OSHelper._print_deletion_report) is not None:
+                print(f"\nПапка {file_path} удаляется в фоне\n")
+                return None
+        report = deleter.delete(file_path)
+        OSHelper._print_deletion_report(report)
+        return report
+
+    @staticmethod
+    def _print_deletion_report(report: DeletionReport):
+        if report.is_success:
+            print(f"\nУдалили: {report.path}. {report}\n")
+        else:
+            print(f"\nНе удалось полностью удалить: {report.path}. {report}\n")
+
+    @staticmethod
+    def sync_folder(source: str, target: str, use_hash: bool = False, delete_stale: bool = True) -> SyncReport:
+        """Обновляет папку target по папке source: копирует только новые и изменившиеся файлы,
+        удаляет лишние. Используйте вместо удаления папки и копирования сборки целиком"""
+        if not os.path.isdir(source):
+            raise FileNotFoundError(f"Не найдена папка: {source}")
+        report = FolderSync(use_hash=use_hash, delete_stale=delete_stale).sync(source, target)
+        if report.is_success:
+            print(f"\nОбновили: {target}. {report}\n")
+        else:
+            print(f"\nНе удалось полностью обновить: {target}. {report}\n")
+        return report
 
     @staticmethod
     def update_json_file(key: str, value, path: str):
@@ -234,91 +377,66 @@ exit
 
     @staticmethod
     def gen_random_string(length: int) -> str:
-        letters = string.ascii_lowercase
-        return "".join(random.choice(letters) for _ in range(length))
+        return "".join(random.choices(string.ascii_lowercase, k=length))
 
     @staticmethod
     def get_random_numbers(length: int) -> str:
-        digits = string.digits
-        return "".join(random.choice(digits) for _ in range(length))
+        return "".join(random.choices(string.digits, k=length))
 
     @staticmethod
     def flash_window(title: str):
         """Не используется, поскольку лучше переключаться на нужное окно, чем просто поджигать иконку"""
-        hwnd = win32gui.FindWindow(None, title)
-        win32gui.FlashWindow(hwnd, 1)
+        Platform.current().flash_window(title)
 
     @staticmethod
     def switch_to_window(title: str):
-        try:
-            hwnd = win32gui.FindWindow(None, title)
-            if win32gui.IsIconic(hwnd):
-                win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
-            win32gui.SetForegroundWindow(hwnd)
-        except Exception:
-            keyboard.press_and_release("alt + tab")
-        finally:
-            time.sleep(0.5)
+        """Выводит окно на передний план и ждет полсекунды, пока оно отрисуется"""
+        with Tracer.span("switch_to_window", title=title):
+            try:
+                Platform.current().switch_to_window(title)
+            except Exception:
+                Platform.current().press_and_release("alt + tab")
+            finally:
+                time.sleep(0.5)
 
     @staticmethod
     def get_current_console_title() -> str:
-        GetConsoleTitle = ctypes.windll.kernel32.GetConsoleTitleW
-        GetConsoleTitle.restype = ctypes.c_uint
-        buffer_size = 100
-        title_buffer = ctypes.create_unicode_buffer(buffer_size)
-        GetConsoleTitle(title_buffer, buffer_size)
-        return title_buffer.value
+        return Platform.current().console_title()
 
     @staticmethod
     def switch_to_script_window():
-        """Переключения окна само на себя не работает, поэтому приходится запускать новый скрипт в отдельном окне"""
-        console_title = OSHelper.get_current_console_title()
-        script = str(
-            f"""
-import ctypes
-import sys
-if not ctypes.windll.shell32.IsUserAnAdmin():
-    ctypes.windll.shell32.ShellExecuteW(None, 'runas', sys.executable, ' '.join(sys.argv), None, 1)
-    exit()
-import win32gui
-import win32con
-hwnd = win32gui.FindWindow(None, '{console_title}')
-if win32gui.IsIconic(hwnd):
-    win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
-win32gui.SetForegroundWindow(hwnd)"""
-        )
-        try:
-            file_path = os.path.join(sys.path[0], "switcher.py")
-            with open(file_path, "w+", encoding="utf-8") as file:
-                file.writelines(script)
-            script_window_is_background = win32gui.FindWindow(None, console_title) != win32gui.GetForegroundWindow()
-            if script_window_is_background:
-                subprocess.call(f"python {file_path}", creationflags=subprocess.CREATE_NEW_CONSOLE)
-            os.remove(file_path)
-            OSHelper.clean_console_input()
-        except Exception:
-            print(traceback.format_exc())
-            keyboard.press_and_release("alt + tab")
+        """Выводит окно консоли со скриптами на передний план, чтобы пользователь увидел вопрос"""
+        with Tracer.span("switch_to_script_window"):
+            try:
+                Platform.current().switch_to_console()
+                OSHelper.clean_console_input()
+            except Exception:
+                print(traceback.format_exc())
+                Platform.current().press_and_release("alt + tab")
 
     @staticmethod
     def clean_console_input():
         for _ in range(100):
-            keyboard.press_and_release("backspace")
+            Platform.current().press_and_release("backspace")
 
     @staticmethod
-    def input_number(message: str = "") -> int:
+    def input_number(message: str = "", timeout: float | None = None, default: int | None = None) -> int:
+        """Число от пользователя через общую очередь вопросов. Если за timeout секунд ответа нет - default"""
         if message != "":
             message = f"\n{message}\n\n"
-        number = input(message).strip()
+        number = PromptBroker.shared().ask(message, timeout, None if default is None else str(default)).strip()
         if not number.isdigit():
             raise TypeError("Вы ввели не число")
         return int(number)
 
     @staticmethod
-    def input_number_array(message: str = "") -> list[int]:
+    def input_number_array(
+            message: str = "", timeout: float | None = None, default: list[int] | None = None
+    ) -> list[int]:
         if message != "":
             message = f"\n{message}\n\n"
-        numbers = input(message).strip().split()
+        answer = PromptBroker.shared().ask(message, timeout, None if default is None else " ".join(map(str, default)))
+        numbers = answer.strip().split()
         for number in numbers:
             if not number.isdigit():
                 raise TypeError("Вы ввели не число")
@@ -328,13 +446,22 @@ win32gui.SetForegroundWindow(hwnd)"""
 class RequestsHelper:
     @classmethod
     def check_request(cls, result):
+        CommandLog.info(
+            f"{result.request.method} {result.url}",
+            status=result.status_code,
+            elapsed=round(result.elapsed.total_seconds(), 3),
+        )
         result.raise_for_status()
         print()
         print(result.request.method, result.url, sep=" ")
         print(result.status_code, result.reason, sep=" ")
 
     @classmethod
-    def do_get_request(cls, session: requests.Session, url: str) -> dict:
+    def do_get_request(cls, session: requests.Session, url: str, cache: HttpCache | None = None) -> dict:
+        """GET-запрос, ответ которого разбирается как JSON.
+        С cache (например, CommandHelpers.http_cache()) неизменившиеся ответы берутся с диска"""
+        if cache is not None:
+            return json.loads(cache.get(session, url, cls.check_request))
         result = session.get(url)
         cls.check_request(result)
         return json.loads(result.content)
@@ -0,0 +1,234 @@
+"""
+Модуль хоста - позволяет запускать несколько приложений hotconsole в одном процессе
+
+Classes
+-------
+HostedApp
+    Датакласс с приложением, которое загружено в хост: папка, заголовок, горячие клавиши и строки
+Host
+    Раннер, который загружает приложения из нескольких папок и обслуживает их общим хуком,
+    общим отслеживанием блокировки экрана и общим пулом потоков
+"""
+
+import contextlib
+import contextvars
+import os
+import runpy
+import sys
+import time
+import traceback
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from types import ModuleType
+
+
+from hotconsole.hotconsole import (
+    DEFAULT_TITLE,
+    Command,
+    CommandHelpers,
+    Config,
+    Executor,
+    Hotkey,
+    Hotstring,
+    Runner,
+    get_scripts_path,
+    scripts_folder,
+)
+from hotconsole.platform import Platform
+from hotconsole.registry import LazyCallable
+from hotconsole.scheduler import Job
+from hotconsole.tracing import Tracer
+
+
+@dataclass
+class HostedApp:
+    """Приложение, загруженное в хост
+
+    Parameters
+    ----------
+    folder: str
+        Папка со скриптами приложения - в ней лежат main.py и свой data.json
+    main: str
+        Файл, в котором приложение создает Runner и вызывает run
+    title: str
+        Заголовок приложения из его Runner
+    hotkeys: list[Hotkey]
+        Горячие клавиши приложения
+    hotstrings: list[Hotstring]
+        Горячие строки приложения
+    modules: dict[str, ModuleType]
+        Модули из папки приложения. Хранятся отдельно, чтобы одноименные модули разных приложений не пересекались
+    jobs: list[Job]
+        Задачи по расписанию, которые приложение добавило в свой Runner - их выполняет планировщик хоста
+    """
+
+    folder: str
+    main: str = "main.py"
+    title: str = DEFAULT_TITLE
+    hotkeys: list[Hotkey] = field(default_factory=list)
+    hotstrings: list[Hotstring] = field(default_factory=list)
+    modules: dict[str, ModuleType] = field(default_factory=dict)
+    jobs: list[Job] = field(default_factory=list)
+
+    def register(self, runner: Runner, hotkeys: list[Hotkey], hotstrings: list[Hotstring]):
+        """Вызывается вместо Runner.run приложения"""
+        self.title = runner.title
+        self.hotkeys = list(hotkeys)
+        self.hotstrings = list(hotstrings)
+        self.jobs = list(runner.scheduler.jobs.values())
+
+
+class Host(Runner):
+    """Запускает несколько приложений hotconsole в одном процессе.
+    Каждое приложение - это папка со своим main.py, data.json, заголовком и командами.
+    Горячие клавиши всех приложений обслуживаются одним хуком, команды выполняются в общем пуле потоков,
+    а блокировку экрана отслеживает один цикл на весь хост
+
+    Parameters
+    ------------
+    folders: list[str]
+        Папки со скриптами приложений
+    title: str
+        Заголовок окна хоста
+    workers: int
+        Сколько команд может выполняться одновременно
+    init_config: Config
+        Конфиг самого хоста, который создается в папке со скриптом хоста
+    main_name: str
+        Имя файла, который запускает приложение в каждой папке, по умолчанию main.py
+    """
+
+    def __init__(
+            self,
+            folders: list[str],
+            title: str = "Hotconsole Host",
+            workers: int = 4,
+            init_config: Config = Config(version=1, consoleMode=False, refuseStartup=False),
+            main_name: str = "main.py",
+    ):
+        super().__init__(init_config, title=title)
+        self.apps = [HostedApp(os.path.abspath(folder), main_name) for folder in folders]
+        self.pool = ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="hotconsole")
+        self._apps: dict[str, HostedApp] = {}
+        self._loaded: dict[str, Command] = {}
+
+    def run(self, hotkeys: list[Hotkey] | None = None, hotstrings: list[Hotstring] | None = None):
+        """Загружает все приложения и запускает их вместе с собственными горячими клавишами хоста"""
+        all_hotkeys, all_hotstrings = self.load_apps(hotkeys or [], hotstrings or [])
+        self.print_conflicts(all_hotkeys)
+        super().run(all_hotkeys, all_hotstrings)
+
+    def load_apps(self, hotkeys: list[Hotkey], hotstrings: list[Hotstring]) -> tuple[list[Hotkey], list[Hotstring]]:
+        """Загружает все приложения и возвращает их горячие клавиши и строки вместе с клавишами хоста.
+        Команды запоминаются по ключу "папка приложения:название" - так же хранится состояние задач планировщика"""
+        all_hotkeys = list(hotkeys)
+        all_hotstrings = list(hotstrings)
+        for app in self.apps:
+            self.load_app(app)
+            for command in [hotkey.command for hotkey in app.hotkeys] + [job.command for job in app.jobs]:
+                self._isolate(app, command)
+                key = f"{app.folder}:{command.name}"
+                self._apps[key] = app
+                self._loaded[key] = command
+            all_hotkeys += app.hotkeys
+            all_hotstrings += app.hotstrings
+            for job in app.jobs:
+                job.app = app.folder
+                self.scheduler.add(job)
+        return all_hotkeys, all_hotstrings
+
+    def load_app(self, app: HostedApp):
+        """Выполняет main.py приложения так, чтобы его Runner не запускался, а передал команды хосту"""
+        known_modules = set(sys.modules)
+        Runner.registrar = app.register
+        sys.path.insert(0, app.folder)
+        try:
+            with scripts_folder(app.folder):
+                runpy.run_path(os.path.join(app.folder, app.main), run_name="__main__")
+            print(f"Загружено приложение {app.title}: {len(app.hotkeys)} горячих клавиш")
+        except Exception:
+            print(traceback.format_exc())
+            CommandHelpers.print_error(f"Не удалось загрузить скрипты из папки {app.folder}")
+        finally:
+            Runner.registrar = None
+            sys.path.remove(app.folder)
+            sys.path.append(app.folder)
+            self._take_app_modules(app, known_modules)
+
+    def execute(self, command: Command, option_number: int | list[int] | None = None) -> str:
+        """Выполняет команду с конфигом того приложения, которому она принадлежит"""
+        with self.app_folder(command), self.idle_policy.activity():
+            return Executor.try_execute(command, option_number)
+
+    def execute_in_background(self, command: Command, option_number: int | None = None) -> str:
+        """Задача планировщика тоже выполняется с конфигом своего приложения"""
+        with self.app_folder(command), self.idle_policy.activity():
+            return Executor.execute_in_background(command, option_number)
+
+    @contextlib.contextmanager
+    def warmup_scope(self, command: Command):
+        """Прогрев, как и команда, видит конфиг своего приложения"""
+        with self.app_folder(command), super().warmup_scope(command):
+            yield
+
+    def app_folder(self, command: Command) -> contextlib.AbstractContextManager:
+        """Папка со скриптами приложения, которому принадлежит команда"""
+        app = self._apps.get(self.command_key(command))
+        return scripts_folder(app.folder if app is not None else get_scripts_path())
+
+    def command_key(self, command: Command) -> str:
+        """Ключ "папка приложения:название". Команда ищется по самому объекту среди актуальных и загруженных
+        из main.py, поэтому после перезагрузки модулей и старая, и новая версия находят свое приложение"""
+        for commands in (self.commands, self._loaded):
+            for key, known in commands.items():
+                if known is command:
+                    return key
+        return command.name
+
+    def command_table(self, hotkeys: list[Hotkey]) -> dict[str, Command]:
+        """Команды приложений (и задач планировщика) по ключу с папкой приложения, чтобы одноименные команды
+        разных приложений не затирали друг друга. Собственные горячие клавиши хоста - по названию"""
+        table = dict(self._loaded)
+        for hotkey in hotkeys:
+            table.setdefault(self.command_key(hotkey.command), hotkey.command)
+        return table
+
+    def add_hotkey(self, key: str, command: Command, option_number: int | list[int] | None):
+        """Горячая клавиша только ставит команду в общий пул, поэтому хук никогда не ждет выполнения"""
+        Platform.current().add_hotkey(key, lambda: self.submit(self.current(command), option_number))
+
+    def submit(self, command: Command, option_number: int | list[int] | None) -> Future:
+        """Ставит команду в пул в копии контекста, чтобы ее стадии попали в трассу нажатия.
+        Ожидание свободного потока записывается как стадия host_queue"""
+        queued = time.perf_counter()
+
+        def execute() -> str:
+            Tracer.record("host_queue", queued, time.perf_counter())
+            return self.execute(command, option_number)
+
+        return self.pool.submit(contextvars.copy_context().run, execute)
+
+    def print_conflicts(self, hotkeys: list[Hotkey]):
+        """Предупреждает о горячих клавишах и командах, которые объявлены в нескольких приложениях"""
+        keys = [hotkey.keyboard_key for hotkey in hotkeys]
+        names = list({id(hotkey.command): hotkey.command.name for hotkey in hotkeys}.values())
+        duplicates = {key for key in keys if keys.count(key) > 1} | {name for name in names if names.count(name) > 1}
+        if len(duplicates) != 0:
+            message = "В приложениях пересекаются горячие клавиши или команды: "
+            CommandHelpers.print_error(message + ", ".join(sorted(duplicates)))
+
+    @staticmethod
+    def _isolate(app: HostedApp, command: Command):
+        """Модули приложения убраны из sys.modules, поэтому функцию команды с isolated=True нельзя передать
+        в процесс по имени модуля. Она заменяется адресом с папкой приложения - процесс импортирует модуль оттуда"""
+        execute = command.execute
+        if not command.isolated or isinstance(execute, LazyCallable) or execute.__module__ in ("__main__", None):
+            return
+        command.execute = LazyCallable(f"{execute.__module__}:{execute.__qualname__}", app.folder)
+
+    def _take_app_modules(self, app: HostedApp, known_modules: set[str]):
+        """Убирает модули приложения из sys.modules, чтобы следующее приложение импортировало свои"""
+        for name in set(sys.modules) - known_modules:
+            module_file = getattr(sys.modules[name], "__file__", None)
+            if module_file is not None and os.path.abspath(module_file).startswith(app.folder + os.sep):
+                app.modules[name] = sys.modules.pop(name)
@@ -21,6 +21,15 @@ Hotkey
 Hotstring
     Именнованный кортеж: короткая строка, описание, полная строка
 
+Functions
+---------
+get_scripts_path
+    Адрес папки со скриптами текущего приложения
+get_config_path
+    Адрес data.json текущего приложения
+scripts_folder
+    Контекстный менеджер, который переключает текущее приложение (используется хостом)
+
 Constants
 ---------
 SCRIPTS_PATH
@@ -33,30 +42,72 @@ DEFAULT_TITLE
     Заголовок в консоли по умолчанию
 """
 
+import atexit
 import collections
+import contextlib
+import contextvars
+import functools
 import getpass
 import json
 import os
 import sqlite3
-import subprocess
 import sys
+import threading
 import time
 import traceback
+import tracemalloc
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import Callable
+from typing import Any, Awaitable, Callable
 
-import keyboard
 import requests
-from pydantic import BaseModel, ConfigDict, ValidationError, PositiveInt
+from pydantic import BaseModel, ConfigDict, ValidationError, PositiveFloat, PositiveInt
 
-from hotconsole.helpers import OSHelper
+from hotconsole.aio import AsyncHelper, CommandLoop, is_coroutine_function
+from hotconsole.cache import HttpCache, KeyValueCache
+from hotconsole.cancellation import CancellationToken, CommandTimeoutError, TimeoutRunner
+from hotconsole.helpers import DBHelper, OSHelper
+from hotconsole.logs import CommandLog
+from hotconsole.memory import IdlePolicy, MemoryTracker
+from hotconsole.options import DEFAULT_PAGE_SIZE, OptionsPager, OptionsProvider
+from hotconsole.parallel import OptionResult, ThreadOutput
+from hotconsole.platform import Platform
+from hotconsole.prompts import PromptBroker
+from hotconsole.reload import CommandReloader
+from hotconsole.scheduler import CronTrigger, IntervalTrigger, Job, OnceTrigger, Scheduler
+from hotconsole.tracing import Tracer
+from hotconsole.warmup import Warmup
+from hotconsole.worker import WorkerPool, WorkerProcess
 
 SCRIPTS_PATH = sys.path[0]
 CONFIG_PATH = os.path.join(SCRIPTS_PATH, "data.json")
-MAIN_NAME = os.path.abspath(str(sys.modules['__main__'].__file__)).split("\\")[-1]
+MAIN_NAME = os.path.abspath(str(getattr(sys.modules['__main__'], "__file__", ""))).split("\\")[-1]
 DEFAULT_TITLE = "Hotconsole Scripts"
 Hotkey = collections.namedtuple("Hotkey", ["keyboard_key", "command", "option_number"])
 Hotstring = collections.namedtuple("Hotstring", ["abbreviation", "description", "string"])
+_scripts_folder: contextvars.ContextVar[str | None] = contextvars.ContextVar("scripts_folder", default=None)
+_current_command: contextvars.ContextVar[str] = contextvars.ContextVar("current_command", default="")
+
+
+def get_scripts_path() -> str:
+    """Папка со скриптами текущего приложения. В режиме хоста у каждого приложения она своя"""
+    return _scripts_folder.get() or SCRIPTS_PATH
+
+
+def get_config_path() -> str:
+    """Адрес data.json текущего приложения"""
+    return os.path.join(get_scripts_path(), "data.json")
+
+
+@contextlib.contextmanager
+def scripts_folder(path: str):
+    """Внутри блока with конфиг и служебные файлы берутся из указанной папки.
+    Действует в текущем контексте: в потоке, а также в потоках, запущенных Executor для этой команды"""
+    token = _scripts_folder.set(path)
+    try:
+        yield
+    finally:
+        _scripts_folder.reset(token)
 
 
 class Config(BaseModel):
@@ -70,31 +121,37 @@ class Config(BaseModel):
         Если true - скрипты запускаются в консольном режиме без горячих клавиш
     refuseStartup: bool
         Если true - приложение не предлагает добавить запуск в автозагрузку
+    commandTimeout: PositiveFloat | None
+        Сколько секунд может выполняться команда, если у нее не задан свой timeout. None - без ограничения
+    promptTimeout: PositiveFloat | None
+        Сколько секунд команда ждет ответа на вопрос, если у вопроса не задан свой timeout. None - без ограничения
     """
     model_config = ConfigDict(extra="allow")
 
     version: PositiveInt
     consoleMode: bool
     refuseStartup: bool
+    commandTimeout: PositiveFloat | None = None
+    promptTimeout: PositiveFloat | None = None
 
     def dump(self):
         """Перезаписывает фактический конфиг"""
-        OSHelper.write_file(CONFIG_PATH, self.model_dump_json(indent=4))
+        OSHelper.write_file(get_config_path(), self.model_dump_json(indent=4))
 
     @staticmethod
     def load_config():
         """Получает фактический конфиг в виде конфига"""
-        return Config(**OSHelper.extract_whole_json(CONFIG_PATH))
+        return Config(**OSHelper.extract_whole_json(get_config_path()))
 
     @staticmethod
     def load_dict() -> dict:
         """Получает фактический конфиг в виде словаря"""
-        return Config(**OSHelper.extract_whole_json(CONFIG_PATH)).load_config().model_dump()
+        return Config(**OSHelper.extract_whole_json(get_config_path())).load_config().model_dump()
 
     @staticmethod
     def load_string() -> str:
         """Получает фактический конфиг в текстовом виде"""
-        return Config(**OSHelper.extract_whole_json(CONFIG_PATH)).load_config().model_dump_json(indent=4)
+        return Config(**OSHelper.extract_whole_json(get_config_path())).load_config().model_dump_json(indent=4)
 
     @staticmethod
     def is_corrupted() -> bool:
@@ -111,7 +168,7 @@ class Config(BaseModel):
         pass
 
 
-@dataclass()
+@dataclass(slots=True)
 class Command:
     """На основе объектов этого класса создаются горячие клавиши и команды в консоли
 
@@ -122,22 +179,51 @@ class Command:
     description: str
         Объяснение, что можно сделать при помощи команды - отображается при ошибках
     execute: Callable
-        Собственно команда
-    options: list[str]
-        Номер опции запрашиваем у пользователя перед выполнением команды
+        Собственно команда. Может быть объявлена через async def - тогда она выполняется на общем цикле событий
+        (см. hotconsole.aio) и может ждать несколько запросов одновременно
+    options: list[str] | OptionsProvider | Callable[[], list]
+        Номер опции запрашиваем у пользователя перед выполнением команды.
+        Вместо списка можно передать функцию или OptionsProvider - тогда опции получатся только при вопросе
     options_message: str
         Фраза, с которой запрашиваем номер опции
+    multi_options: bool
+        Если true - у пользователя запрашиваются сразу несколько опций, и команда выполняется для каждой параллельно
+    parallelism: int
+        Сколько опций выполняется одновременно
+    timeout: float | None
+        Сколько секунд может выполняться команда. По истечении команда отменяется (см. CommandHelpers.check_cancelled),
+        а если она isolated - ее процесс завершается принудительно. None - берется commandTimeout из data.json
+    isolated: bool
+        Если true - команда выполняется в отдельном процессе. Функция команды должна лежать в отдельном модуле
+    warmup: Callable[[], None] | None
+        Прогрев: импорт библиотек, подключение к БД, вход в API, заполнение кэша через CommandHelpers.cached.
+        Runner выполняет его в фоне после запуска и после простоя, поэтому первое нажатие не ждет.
+        Для команд с isolated=True прогрев не выполняется
+    warmup_priority: int
+        Чем больше, тем раньше команда прогревается
     """
 
     name: str
     description: str
-    execute: Callable[[int | None], str]
-    options: list[str] = field(default_factory=list)
+    execute: Callable[[int | None], str | None] | Callable[[int | None], Awaitable[str | None]]
+    options: list[str] | OptionsProvider | Callable[[], list] = field(default_factory=list)
     options_message: str = "Введите номер варианта"
+    multi_options: bool = False
+    parallelism: int = 4
+    timeout: float | None = None
+    isolated: bool = False
+    warmup: Callable[[], None] | None = None
+    warmup_priority: int = 0
 
     def __post_init__(self):
         if self.options_message == "":
             self.options_message = "Введите номер варианта"
+        if callable(self.options) and not isinstance(self.options, OptionsProvider):
+            self.options = OptionsProvider(self.options)
+
+    def has_options(self) -> bool:
+        """Есть ли у команды опции. Для поставщика опций список не запрашивается"""
+        return isinstance(self.options, OptionsProvider) or self.options != []
 
     def __str__(self):
         return f"Название команды: {self.name}, описание: {self.description}"
@@ -147,33 +233,71 @@ class CommandHelpers:
     """Класс со вспомогательными методами, которыми пользуются команды"""
 
     @classmethod
-    def ask_option_number_from_one(cls, options: list, message: str = "Введите номер варианта"):
-        """Запросить у пользователя номер нужной опции"""
-        OSHelper.switch_to_script_window()
-        print(f"\n{message}\n")
-        if isinstance(options[0], tuple):
-            cls.print_options_tuple(options)
-        elif isinstance(options[0], str):
-            cls.print_options(options)
-        else:
-            raise TypeError("У команды некорректные опции. Должен быть массив строк или кортежей строк")
-        option_number = OSHelper.input_number()
+    def ask_option_number_from_one(
+            cls,
+            options: list | OptionsProvider,
+            message: str = "Введите номер варианта",
+            timeout: float | None = None,
+            default: int | None = None,
+    ):
+        """Запросить у пользователя номер нужной опции.
+        Длинные списки и опции от поставщика выводятся постранично, с поиском.
+        Если за timeout секунд ответа нет, выбирается опция default"""
+        with PromptBroker.shared().session():
+            OSHelper.switch_to_script_window()
+            print(f"\n{message}\n")
+            if isinstance(options, OptionsProvider):
+                return OptionsPager(options.get(), options.page_size).ask(timeout, default)
+            if len(options) > DEFAULT_PAGE_SIZE:
+                return OptionsPager(options).ask(timeout, default)
+            if isinstance(options[0], tuple):
+                cls.print_options_tuple(options)
+            elif isinstance(options[0], str):
+                cls.print_options(options)
+            else:
+                raise TypeError("У команды некорректные опции. Должен быть массив строк или кортежей строк")
+            option_number = OSHelper.input_number(timeout=timeout, default=default)
         if option_number > len(options) or option_number < 1:
             raise ValueError("Выбран некорректный вариант")
         return option_number
 
     @classmethod
-    def ask_option_numbers_from_one(cls, options: list, message: str = "Введите номер варианта"):
+    def ask_option_numbers_from_one(
+            cls,
+            options: list | OptionsProvider,
+            message: str = "Введите номер варианта",
+            timeout: float | None = None,
+            default: list[int] | None = None,
+    ):
         """Запросить у пользователя номера нужных опций"""
-        OSHelper.switch_to_script_window()
-        print(message + "\n")
-        cls.print_options(options)
-        option_numbers = OSHelper.input_number_array()
+        with PromptBroker.shared().session():
+            OSHelper.switch_to_script_window()
+            print(message + "\n")
+            if isinstance(options, OptionsProvider):
+                options = options.get()
+            cls.print_options([OptionsPager.title(option) for option in options])
+            option_numbers = OSHelper.input_number_array(timeout=timeout, default=default)
+            while len(option_numbers) == 0:
+                print("\nВыберите хотя бы один вариант\n")
+                option_numbers = OSHelper.input_number_array(timeout=timeout, default=default)
         for number in option_numbers:
             if number > len(options) or number < 1:
                 raise ValueError("Выбран некорректный вариант")
         return option_numbers
 
+    @classmethod
+    def ask(cls, message: str, timeout: float | None = None, default: str | None = None) -> str:
+        """Задать пользователю вопрос через общую очередь вопросов.
+        Если за timeout секунд ответа нет - возвращает default, а без него выбрасывает PromptTimeoutError"""
+        with PromptBroker.shared().session():
+            OSHelper.switch_to_script_window()
+            return PromptBroker.shared().ask(f"\n{message}\n\n", timeout, default).strip()
+
+    @classmethod
+    def ask_async(cls, message: str, timeout: float | None = None, default: str | None = None) -> Future:
+        """Поставить вопрос в очередь и продолжить работу. Ответ - в future.result()"""
+        return PromptBroker.shared().ask_async(f"\n{message}\n\n", timeout, default)
+
     @classmethod
     def print_options(cls, options: list):
         """Пронумеровать и вывести в консоль список опций"""
@@ -187,17 +311,20 @@ class CommandHelpers:
             print(f"{str(index + 1)}. {name}")
 
     @classmethod
-    def ask_value_for_config(cls, key: str, message: str = "Вы еще не прописали этот параметр в конфиге") -> str:
+    def ask_value_for_config(
+            cls, key: str, message: str = "Вы еще не прописали этот параметр в конфиге", timeout: float | None = None
+    ) -> str:
         """
         Запросить у пользователя значение параметра для конфига.
-        При отказе возвращает пустую строку
+        При отказе или если за timeout секунд ответа нет, возвращает пустую строку
         """
-        print(f"\n{message}")
-        value = input("Введите значение - или пустую строку, чтобы выйти из команды\n\n").strip()
+        value = PromptBroker.shared().ask(
+            f"\n{message}\nВведите значение - или пустую строку, чтобы выйти из команды\n\n", timeout, ""
+        ).strip()
         if value == "":
             print("Ок, можете добавить в следующий раз или вручную в data.json")
         else:
-            OSHelper.update_json_file(key, value, CONFIG_PATH)
+            OSHelper.update_json_file(key, value, get_config_path())
         return value
 
     @classmethod
@@ -206,11 +333,43 @@ class CommandHelpers:
         Берет значение из конфига - а если оно пустое, спрашивает у пользователя.
         При отказе возвращает пустую строку
         """
-        value = OSHelper.get_from_json_file(key, CONFIG_PATH)
+        value = OSHelper.get_from_json_file(key, get_config_path())
         if value == "":
             value = CommandHelpers.ask_value_for_config(key, message)
         return value
 
+    @classmethod
+    def check_cancelled(cls):
+        """Долгие команды вызывают это между шагами: если время вышло, выполнение прервется"""
+        token = CancellationToken.current()
+        if token is not None:
+            token.raise_if_cancelled()
+
+    @classmethod
+    def sleep(cls, seconds: float):
+        """Пауза внутри команды, которую прерывает отмена по таймауту"""
+        token = CancellationToken.current()
+        if token is None:
+            time.sleep(seconds)
+        else:
+            token.sleep(seconds)
+
+    @classmethod
+    def cache(cls) -> KeyValueCache:
+        """Постоянный кэш приложения в .hotconsole-cache.db - для значений, которые не должны попадать в data.json"""
+        return KeyValueCache.for_folder(get_scripts_path())
+
+    @classmethod
+    def http_cache(cls) -> HttpCache:
+        """Кэш ответов API для RequestsHelper.do_get_request - в .hotconsole-http-cache.db"""
+        return HttpCache.for_folder(get_scripts_path())
+
+    @classmethod
+    def cached(cls, key: str, ttl: float | None, producer: Callable[[], Any]) -> Any:
+        """Значение из кэша текущей команды, а если его нет или оно устарело - результат producer().
+        У каждой команды свое пространство имен, поэтому одинаковые ключи разных команд не пересекаются"""
+        return cls.cache().get_or_set(key, producer, _current_command.get(), ttl)
+
     @classmethod
     def print_error(cls, message: str = "При выполнении скрипта возникла ошибка, попробуйте снова"):
         """Печатает текст ошибки на красном фоне"""
@@ -225,42 +384,254 @@ class CommandHelpers:
 class Executor:
     """Класс готовит данные для команд, выполняет команды и обрабатывает их ошибки"""
 
+    pool: WorkerPool | None = None
+    loop: CommandLoop | None = None
+    _loop_lock = threading.Lock()
+    _pool_at_exit = False
+
     @classmethod
-    def try_execute(cls, command: Command, option_number: int | None = None):
-        keyboard.stash_state()
+    def try_execute(cls, command: Command, option_number: int | list[int] | None = None) -> str:
+        """Выполняет команду и возвращает результат для журнала: success, error, exception или timeout.
+        Стадии до старта команды отмечаются в трассе нажатия (см. Tracer)"""
+        with Tracer.span("stash_state"):
+            Platform.current().stash_state()
+        start = time.monotonic()
+        memory = MemoryTracker.begin()
+        command_token = _current_command.set(command.name)
+        prompt_token = PromptBroker.command_timeout.set(None)
         try:
-            config = Config(**OSHelper.extract_whole_json(CONFIG_PATH))
-            config.actualize()
-            if command.options != [] and option_number is None:
-                option_number = CommandHelpers.ask_option_number_from_one(command.options, command.options_message)
-            error_message = command.execute(option_number)
+            with Tracer.span("config"):
+                config = Config(**OSHelper.extract_whole_json(get_config_path()))
+                config.actualize()
+            PromptBroker.command_timeout.set(config.promptTimeout)
+            if command.has_options() and option_number is None:
+                with Tracer.span("options"):
+                    ask = (
+                        CommandHelpers.ask_option_numbers_from_one if command.multi_options
+                        else CommandHelpers.ask_option_number_from_one
+                    )
+                    option_number = ask(command.options, command.options_message)
+            timeout = cls.get_timeout(command, config)
+            if isinstance(option_number, list):
+                results = cls.execute_for_options(command, option_number, timeout)
+                return "success" if all(result.is_success for result in results) else "error"
+            start = time.monotonic()
+            with Tracer.span("command", command=command.name, option=option_number):
+                error_message = cls.call(command, option_number, timeout)
             if error_message is None:
+                CommandLog.record(command.name, option_number, time.monotonic() - start, "success")
                 CommandHelpers.print_success()
-            else:
-                print(f"\n{error_message}")
-                CommandHelpers.print_error()
-        except requests.ConnectionError:
-            cls.print_exception(command, "Нет связи с сервером")
-        except requests.HTTPError:
-            cls.print_exception(command, "Что-то не так с запросом")
-        except AttributeError:
-            cls.print_exception(command, "На ПК не найдена база данных кассы")
-        except sqlite3.OperationalError:
-            cls.print_exception(command, "\nНе удалось подключиться к базе данных db.db\n")
-        except Exception:
-            cls.print_exception(command)
+                return "success"
+            CommandLog.record(command.name, option_number, time.monotonic() - start, "error", error_message)
+            print(f"\n{error_message}")
+            CommandHelpers.print_error()
+            return "error"
+        except Exception as e:
+            message = cls.get_exception_message(e)
+            duration = time.monotonic() - start
+            outcome = cls.get_outcome(e)
+            CommandLog.record(command.name, option_number, duration, outcome, message, traceback.format_exc())
+            cls.print_exception(command, message)
+            return outcome
         finally:
-            keyboard.stash_state()
+            PromptBroker.command_timeout.reset(prompt_token)
+            _current_command.reset(command_token)
+            MemoryTracker.finish(command.name, memory)
+            Platform.current().stash_state()
+
+    @classmethod
+    def execute_in_background(cls, command: Command, option_number: int | None = None) -> str:
+        """Выполняет команду по расписанию и возвращает результат для журнала. В отличие от try_execute,
+        не отпускает клавиши и не выводит итог в консоль - пользователь в это время может работать с другой командой.
+        Результат и ошибки пишутся только в журнал команд"""
+        start = time.monotonic()
+        memory = MemoryTracker.begin()
+        command_token = _current_command.set(command.name)
+        prompt_token = PromptBroker.command_timeout.set(None)
+        try:
+            config = Config(**OSHelper.extract_whole_json(get_config_path()))
+            config.actualize()
+            PromptBroker.command_timeout.set(config.promptTimeout)
+            error_message = cls.call(command, option_number, cls.get_timeout(command, config))
+            outcome = "success" if error_message is None else "error"
+            CommandLog.record(command.name, option_number, time.monotonic() - start, outcome, error_message or "")
+            return outcome
+        except Exception as e:
+            outcome = cls.get_outcome(e)
+            message = cls.get_exception_message(e)
+            CommandLog.record(
+                command.name, option_number, time.monotonic() - start, outcome, message, traceback.format_exc()
+            )
+            return outcome
+        finally:
+            PromptBroker.command_timeout.reset(prompt_token)
+            _current_command.reset(command_token)
+            MemoryTracker.finish(command.name, memory)
+
+    @classmethod
+    def call(cls, command: Command, option_number: int | None, timeout: float | None = None):
+        """Вызывает функцию команды: в отдельном процессе, если команда isolated (в процессе из пула, если он запущен),
+        на общем цикле событий, если она асинхронная, с ограничением по времени, если задан timeout,
+        или просто в текущем потоке"""
+        if command.isolated:
+            if cls.pool is not None:
+                return cls.pool.execute(command.execute, option_number, timeout, get_scripts_path())
+            return WorkerProcess.run_once(command.execute, option_number, timeout, get_scripts_path())
+        if is_coroutine_function(command.execute):
+            return cls.get_loop().run(command.execute(option_number), timeout)
+        if timeout is None:
+            return command.execute(option_number)
+        return TimeoutRunner.run_in_thread(command.execute, option_number, timeout)
+
+    @classmethod
+    def start_pool(cls, size: int, modules: list[str]) -> WorkerPool:
+        """Запускает пул процессов. При выходе останавливается тот пул, который запущен в этот момент,
+        поэтому пул можно перезапускать после простоя без новых обработчиков atexit"""
+        cls.pool = WorkerPool(size, modules)
+        if not cls._pool_at_exit:
+            atexit.register(cls.stop_pool)
+            cls._pool_at_exit = True
+        return cls.pool
+
+    @classmethod
+    def stop_pool(cls):
+        pool = cls.pool
+        cls.pool = None
+        if pool is not None:
+            pool.shutdown()
+
+    @classmethod
+    def get_loop(cls) -> CommandLoop:
+        """Общий цикл событий для асинхронных команд. Runner запускает его заранее, а без Runner он запустится здесь"""
+        with cls._loop_lock:
+            if cls.loop is None:
+                cls.loop = CommandLoop()
+                atexit.register(cls.loop.stop)
+            return cls.loop.start()
+
+    @classmethod
+    def get_timeout(cls, command: Command, config: Config) -> float | None:
+        """Ограничение времени команды, а если его нет - общее ограничение из data.json"""
+        return command.timeout if command.timeout is not None else config.commandTimeout
+
+    @classmethod
+    def execute_for_options(
+            cls, command: Command, option_numbers: list[int], timeout: float | None = None
+    ) -> list[OptionResult]:
+        """Параллельно выполняет команду для каждой опции и выводит сводку, сгруппированную по опциям"""
+        cls.check_option_numbers(command, option_numbers)
+        option_numbers = list(dict.fromkeys(option_numbers))
+        output = ThreadOutput.install()
+        with ThreadPoolExecutor(max_workers=max(command.parallelism, 1)) as pool:
+            futures = [
+                pool.submit(contextvars.copy_context().run, cls._execute_option, command, number, output, timeout)
+                for number in option_numbers
+            ]
+            results = [future.result() for future in futures]
+        cls.print_summary(command, results)
+        return results
+
+    @classmethod
+    def _execute_option(
+            cls, command: Command, option_number: int, output: ThreadOutput, timeout: float | None = None
+    ) -> OptionResult:
+        result = OptionResult(option_number, cls._get_option_title(command, option_number))
+        start = time.monotonic()
+        output.start_capture()
+        try:
+            with Tracer.span("command", command=command.name, option=option_number):
+                result.error = cls.call(command, option_number, timeout)
+            outcome = "success" if result.error is None else "error"
+            CommandLog.record(command.name, option_number, time.monotonic() - start, outcome, result.error or "")
+        except Exception as e:
+            cls.print_traceback()
+            result.error = cls.get_exception_message(e).strip() or "Не удалось " + command.description.lower()
+            duration = time.monotonic() - start
+            outcome = cls.get_outcome(e)
+            CommandLog.record(command.name, option_number, duration, outcome, result.error, traceback.format_exc())
+        finally:
+            result.output = output.stop_capture()
+            result.duration = time.monotonic() - start
+        return result
+
+    @classmethod
+    def check_option_numbers(cls, command: Command, option_numbers: list[int]):
+        """Номера из консоли и горячих клавиш проверяются так же, как выбранные в ответ на вопрос"""
+        if len(option_numbers) == 0:
+            raise ValueError("Не выбран ни один вариант")
+        options = cls._get_options(command)
+        for number in option_numbers:
+            if number > len(options) or number < 1:
+                raise ValueError("Выбран некорректный вариант")
+
+    @classmethod
+    def _get_options(cls, command: Command) -> list:
+        return command.options.get() if isinstance(command.options, OptionsProvider) else command.options
+
+    @classmethod
+    def _get_option_title(cls, command: Command, option_number: int) -> str:
+        options = cls._get_options(command)
+        if 1 <= option_number <= len(options):
+            return OptionsPager.title(options[option_number - 1])
+        return str(option_number)
+
+    @classmethod
+    def print_summary(cls, command: Command, results: list[OptionResult]):
+        """Выводит результаты по каждой опции, а затем общий итог"""
+        for result in results:
+            status = "успешно" if result.is_success else "ошибка"
+            print(f"\n--- {result.option_number}. {result.title}: {status} за {result.duration:.1f} с ---")
+            if result.output.strip() != "":
+                print(result.output.rstrip())
+            if not result.is_success:
+                print(result.error)
+        failed = [result for result in results if not result.is_success]
+        if len(failed) == 0:
+            CommandHelpers.print_success(f"Скрипт завершился успешно для всех опций: {len(results)}")
+        else:
+            print("\nНе удалось " + command.description.lower())
+            CommandHelpers.print_error(f"Ошибки в {len(failed)} из {len(results)} опций")
+
+    @classmethod
+    def get_exception_message(cls, exception: Exception) -> str:
+        """Понятное пользователю сообщение для известных ошибок. Для остальных - пустая строка"""
+        match exception:
+            case CommandTimeoutError():
+                return str(exception)
+            case requests.ConnectionError():
+                return "Нет связи с сервером"
+            case requests.HTTPError():
+                return "Что-то не так с запросом"
+            case AttributeError():
+                return "На ПК не найдена база данных кассы"
+            case sqlite3.OperationalError():
+                return "\nНе удалось подключиться к базе данных db.db\n"
+            case _:
+                return ""
+
+    @classmethod
+    def get_outcome(cls, exception: Exception) -> str:
+        """Результат для журнала: превышение времени отдельно от остальных ошибок"""
+        return "timeout" if isinstance(exception, CommandTimeoutError) else "exception"
 
     @classmethod
     def print_exception(cls, command: Command, message: str = ""):
-        print(traceback.format_exc())
+        cls.print_traceback()
         print("Не удалось " + command.description.lower())
         if message != "":
             CommandHelpers.print_error(message)
         else:
             CommandHelpers.print_error()
 
+    @classmethod
+    def print_traceback(cls):
+        """Если журнал включен, в консоль выводится только суть ошибки, а полный traceback - в журнал"""
+        if not CommandLog.is_enabled():
+            print(traceback.format_exc())
+            return
+        print(traceback.format_exc().strip().splitlines()[-1])
+        print(f"Подробности в журнале: {CommandLog.path}")
+
 
 class Init:
     """Класс инициализации, который используется раннером"""
@@ -272,7 +643,7 @@ class Init:
         Если есть - в него автоматически добавляются новые поля.
         Для изменения старых полей - по порядку применяются migrations
         """
-        OSHelper.write_install_libraries_bat(SCRIPTS_PATH, "install-libs.bat")
+        OSHelper.write_install_libraries_bat(get_scripts_path(), "install-libs.bat")
         if cls._should_init():
             cls._update(True, init_config)
             return
@@ -295,7 +666,7 @@ class Init:
     @classmethod
     def _should_init(cls):
         """Проверяет, нужно ли инициализировать конфиг"""
-        return not os.path.exists(CONFIG_PATH)
+        return not os.path.exists(get_config_path())
 
     @classmethod
     def _should_update(cls, init_config: Config) -> bool:
@@ -312,14 +683,14 @@ class Init:
 
     @classmethod
     def clean_excess_fields(cls, init_config: Config):
-        config = OSHelper.extract_whole_json(CONFIG_PATH)
+        config = OSHelper.extract_whole_json(get_config_path())
         excess_fields = list()
         for key in config.keys():
             if key not in init_config.model_dump().keys():
                 excess_fields.append(key)
         for excess_field in excess_fields:
             config.pop(excess_field)
-        OSHelper.write_file(CONFIG_PATH, json.dumps(config, indent=4))
+        OSHelper.write_file(get_config_path(), json.dumps(config, indent=4))
 
     @classmethod
     def migrate_if_needed(cls, init_config: Config, migrations: list[Callable]):
@@ -358,17 +729,6 @@ class Init:
             config.refuseStartup = True
             config.dump()
 
-    @classmethod
-    def _install_libs(cls):
-        """Правильнее - вызывать команду pip вручную или пользоваться батником"""
-        try:
-            print("\nУстанавливаются необходимые библиотеки...\n")
-            requirements = os.path.join(SCRIPTS_PATH, "requirements.txt")
-            subprocess.check_call([sys.executable, "-m", "ensurepip"])
-            subprocess.check_call([sys.executable, "-m", "pip", "install", "-r", f"{requirements}"])
-        except Exception:
-            input("\n\nНе удалось установить библиотеки.\n\nВозможно, неправильно установлен питон")
-
 
 class Runner:
     """Инициализирует, запускает и выполняет приложение со скриптами
@@ -383,6 +743,33 @@ class Runner:
         Название окошка консоли со скриптами, по умолчанию Hotconsole Scripts
     migrations: list[Callable]
         Миграции для безболезненного обновления конфига ваших пользователей, по умолчанию пустой список
+    watch: bool
+        Если true - измененные модули с командами перезагружаются на лету, без перезапуска приложения
+
+    Attributes
+    ------------
+    registrar: Callable | None
+        Если задан (это делает Host), run не запускает приложение, а передает ему горячие клавиши и строки
+    console_commands: dict[str, tuple[str, Callable[[list[str]], None]]]
+        Встроенные консольные команды: название -> (описание, обработчик аргументов)
+    isolated_workers: int
+        Сколько процессов держать наготове для команд с isolated=True
+    idle_after: float | None
+        Через сколько секунд без команд сбросить кэши и остановить пул процессов. None (по умолчанию) - никогда
+    idle_policy: IdlePolicy
+        Освобождение памяти в простое
+    warmup_workers: int
+        Сколько прогревов команд выполняется одновременно
+    warmup: Warmup
+        Фоновый прогрев команд с warmup
+    hotkeys: list[Hotkey]
+        Горячие клавиши из run - по ним перехват клавиатуры переустанавливается при перезапуске
+    hotstrings: list[Hotstring]
+        Горячие строки из run
+    commands: dict[str, Command]
+        Актуальные команды по названию. Горячие клавиши берут команду отсюда, поэтому ее можно подменить на лету
+    scheduler: Scheduler
+        Планировщик команд по расписанию. Время последних запусков хранится в .hotconsole-jobs.json
 
     Methods
     ------------
@@ -390,35 +777,108 @@ class Runner:
         Единственная функция, которую надо использовать напрямую, запускает приложение
     console_mode(hotkeys: list[Hotkey])
         Запускает приложение в консольном режиме, без горячих клавиш
+    start_worker_pool(commands: list[Command])
+        Заранее запускает процессы для команд с isolated=True
+    start_event_loop(commands: list[Command])
+        Заранее запускает общий цикл событий, если среди команд есть асинхронные
+    start_idle_policy()
+        Включает освобождение памяти после idle_after секунд без команд
+    start_warmup()
+        Ставит в фон прогрев команд, которые еще не прогреты
+    warmup_scope(command: Command)
+        Контекст, в котором выполняется прогрев команды
+    show_warmup(args: list[str])
+        Выводит итоги прогрева (консольная команда warm)
+    show_trace(args: list[str])
+        Выводит перцентили стадий нажатий и сохраняет их для chrome://tracing (консольная команда trace)
+    execute(command: Command, option_number: int | list[int] | None)
+        Выполняет команду через Executor
+    execute_in_background(command: Command, option_number: int | None)
+        Выполняет задачу планировщика через Executor без вывода в консоль
     def add_hotkey(key: str, command: Command, option_number: int)
         Привязывает горячую клавишу к выполнению команды через Executor
     add_hotstring(short_string: str, string: str)
         Добавляет горячую строку
+    install_hooks()
+        Привязывает горячие клавиши и строки из run
+    start_watch()
+        Запускает перезагрузку измененных модулей с командами
+    schedule(command: Command, trigger: IntervalTrigger | CronTrigger | OnceTrigger, option_number: int | None)
+        Добавляет команду в планировщик
+    every(seconds: float, command: Command, option_number: int | None)
+        Выполнять команду каждые seconds секунд
+    cron(expression: str, command: Command, option_number: int | None)
+        Выполнять команду по расписанию cron
+    once(delay: float, command: Command, option_number: int | None)
+        Выполнить команду один раз через delay секунд
+    show_jobs(args: list[str])
+        Выводит задачи планировщика (консольная команда jobs)
+    show_memory(args: list[str])
+        Выводит память процесса по подсистемам и командам (консольная команда mem)
+    current(command: Command)
+        Актуальная версия команды после перезагрузки модулей
+    command_key(command: Command)
+        Ключ команды в commands
+    command_table(hotkeys: list[Hotkey])
+        Таблица команд для commands
+    warm_restart()
+        Переустанавливает перехват клавиатуры без перезапуска процесса
+    restart()
+        Теплый перезапуск в отдельном потоке, а если он не удался - перезапуск приложения
     print_hotkeys(hotkeys: list[Hotkey])
         Выводит список горячих клавиш    
     print_commands(commands: list[Command])
         Выводит список команд в консольном режиме
+    show_log(args: list[str])
+        Выводит последние записи журнала команд или ищет по нему (консольная команда log)
     is_screen_locked()
         Проверяет, заблокирован ли экран
     restart_after_lock
-        Перезапускает приложение после блокировки экрана (иначе горячие клавиши перестанут работать)
+        Перезапускает горячие клавиши после блокировки экрана (иначе они перестанут работать)
     """
 
+    registrar: Callable | None = None
+    isolated_workers = 2
+    idle_after: float | None = None
+    warmup_workers = 2
+    hotkeys: list[Hotkey] = []
+    hotstrings: list[Hotstring] = []
+    commands: dict[str, Command] = {}
+
     def __init__(
             self,
             init_config: Config = Config(version=1, consoleMode=False, refuseStartup=False),
             config_actualizer: Callable | None = None,
             title: str = DEFAULT_TITLE,
             migrations: list[Callable] = [],
+            watch: bool = False,
     ):
         self.init_config = init_config
         self.config_actualizer = config_actualizer
         self.title = title
         self.migrations = migrations
+        self.watch = watch
+        self.console_commands: dict[str, tuple[str, Callable[[list[str]], None]]] = {
+            "log": ("Журнал: log [число записей | текст для поиска]", self.show_log),
+            "jobs": ("Задачи по расписанию", self.show_jobs),
+            "mem": ("Память: mem [trace - разбивка по подсистемам | free - освободить сейчас]", self.show_memory),
+            "warm": ("Прогрев команд: warm [run - прогреть заново]", self.show_warmup),
+            "trace": ("Задержки горячих клавиш по стадиям: trace [за сколько секунд]", self.show_trace),
+        }
+        self.idle_policy = IdlePolicy(self.idle_after or 0)
+        self.warmup = Warmup(self.warmup_workers, lambda: self.idle_policy.is_busy)
+        self.scheduler = Scheduler(
+            lambda command, option_number: self.execute_in_background(self.current(command), option_number),
+            os.path.join(get_scripts_path(), ".hotconsole-jobs.json"),
+        )
         if config_actualizer is not None:
             Config.actualize = config_actualizer
+        if Runner.registrar is not None:
+            Init.init_or_update_config(init_config, migrations)
+            return
         if title is not None:
             OSHelper.set_title(title)
+        CommandLog.setup(os.path.join(get_scripts_path(), "logs", "hotconsole.log"))
         Init.init_or_update_config(init_config, migrations)
         Init.add_to_startup(title)
 
@@ -433,53 +893,282 @@ class Runner:
             hotstrings: list[Hotstring] | None
                 Список горячих строк для автозамены строк
         """
+        if Runner.registrar is not None:
+            Runner.registrar(self, hotkeys, hotstrings or [])
+            return
+        self.hotkeys = hotkeys
+        self.hotstrings = hotstrings or []
+        self.commands = self.command_table(hotkeys)
+        self.start_worker_pool([hotkey.command for hotkey in hotkeys])
+        self.start_event_loop([hotkey.command for hotkey in hotkeys])
+        self.start_idle_policy()
         CommandHelpers.print_success("Горячие клавиши готовы!")
-        for hotkey in hotkeys:
-            self.add_hotkey(hotkey.keyboard_key, hotkey.command, hotkey.option_number)
-        if hotstrings is not None:
-            for hotstring in hotstrings:
-                self.add_hotstring(hotstring.abbreviation, hotstring.string)
-        keyboard.add_hotkey("alt+h", lambda: self.print_hotkeys(hotkeys))
-        keyboard.add_hotkey("alt+q", lambda: self.console_mode(hotkeys))
+        self.install_hooks()
+        self.start_warmup()
+        if self.watch:
+            self.start_watch()
+        if len(self.scheduler.jobs) != 0:
+            self.scheduler.start()
         self.print_hotkeys(hotkeys)
-        if Config.load_config().consoleMode:
+        while Config.load_config().consoleMode:
             CommandHelpers.print_success("Включен режим только консольных команд")
             print("Чтобы выключить, выставьте в data.json consoleMode = false\n")
             self.console_mode(hotkeys)
         self.restart_after_lock()
 
+    def install_hooks(self):
+        """Привязывает горячие клавиши и строки, а также встроенные alt+h и alt+q"""
+        for hotkey in self.hotkeys:
+            self.add_hotkey(hotkey.keyboard_key, hotkey.command, hotkey.option_number)
+        for hotstring in self.hotstrings:
+            self.add_hotstring(hotstring.abbreviation, hotstring.string)
+        Platform.current().add_hotkey("alt+h", lambda: self.print_hotkeys(self.hotkeys))
+        Platform.current().add_hotkey("alt+q", lambda: self.console_mode(self.hotkeys))
+
+    def start_watch(self):
+        """Следит за модулями с командами. Новая таблица команд подменяется одним присваиванием,
+        а перехват клавиатуры не трогается, поэтому нажатия во время перезагрузки не теряются"""
+
+        def on_reload(commands: dict[str, Command]):
+            self.commands = commands
+            if Executor.pool is not None:
+                Executor.pool.recycle()
+            self.warmup.reset()
+            self.start_warmup()
+            CommandHelpers.print_success("Команды перезагружены")
+
+        CommandReloader(get_scripts_path()).watch(self.commands, on_reload)
+
+    def schedule(
+            self,
+            command: Command,
+            trigger: IntervalTrigger | CronTrigger | OnceTrigger,
+            option_number: int | None = None,
+            name: str = "",
+    ) -> Job:
+        """Добавляем команду в планировщик. Задачи добавляются до run и запускаются вместе с горячими клавишами"""
+        return self.scheduler.add(Job(command, trigger, option_number, name))
+
+    def every(self, seconds: float, command: Command, option_number: int | None = None) -> Job:
+        return self.schedule(command, IntervalTrigger(seconds), option_number)
+
+    def cron(self, expression: str, command: Command, option_number: int | None = None) -> Job:
+        return self.schedule(command, CronTrigger(expression), option_number)
+
+    def once(self, delay: float, command: Command, option_number: int | None = None) -> Job:
+        return self.schedule(command, OnceTrigger(delay), option_number)
+
+    def show_jobs(self, args: list[str]):
+        """Выводим задачи планировщика: расписание, прошлый и следующий запуск, результат"""
+        if len(self.scheduler.jobs) == 0:
+            print("\nЗадач по расписанию нет\n")
+            return
+        print()
+        for line in self.scheduler.format_jobs():
+            print(line)
+        print()
+
+    def show_memory(self, args: list[str]):
+        """Выводим память процесса, разбивку по подсистемам и по командам. mem trace включает и выключает разбивку"""
+        if args[:1] == ["trace"]:
+            if tracemalloc.is_tracing():
+                MemoryTracker.stop_tracing()
+                print("\nРазбивка по подсистемам выключена")
+            else:
+                MemoryTracker.start_tracing()
+                print("\nРазбивка по подсистемам включена - учитываются объекты, созданные с этого момента")
+        elif args[:1] == ["free"]:
+            freed = self.idle_policy.release()
+            print(f"\nОсвобождено: {MemoryTracker.format_size(freed)}")
+        print()
+        for line in MemoryTracker.format_report(get_scripts_path()):
+            print(line)
+        if self.idle_after is None:
+            print("\nОсвобождение памяти в простое выключено (Runner.idle_after)\n")
+        else:
+            print(f"\n{self.idle_policy.format_status()}\n")
+
+    def current(self, command: Command) -> Command:
+        return self.commands.get(self.command_key(command), command)
+
+    def command_key(self, command: Command) -> str:
+        """Ключ команды в self.commands. В Runner это название команды"""
+        return command.name
+
+    def command_table(self, hotkeys: list[Hotkey]) -> dict[str, Command]:
+        """Таблица актуальных команд по ключу command_key"""
+        return {self.command_key(hotkey.command): hotkey.command for hotkey in hotkeys}
+
+    def warm_restart(self) -> bool:
+        """Снимает и заново ставит горячие клавиши и строки в текущем процессе, не теряя конфиг, кэши
+        и процессы команд. Возвращает False, если переустановить не удалось"""
+        try:
+            Platform.current().unhook_all()
+            self.install_hooks()
+        except Exception as e:
+            CommandLog.info("Не удалось переустановить горячие клавиши", error=repr(e))
+            return False
+        CommandLog.info("Горячие клавиши переустановлены")
+        return True
+
+    def restart(self) -> threading.Thread:
+        """Переустанавливает горячие клавиши, а если не получилось - перезапускает приложение из-под админа.
+        Работа идет в отдельном потоке: exit в консольном режиме вызывается из обработчика alt+q,
+        а снимать перехват изнутри его же обработчика нельзя"""
+
+        def restart():
+            if not self.warm_restart():
+                OSHelper.rerun_as_admin(True)
+
+        thread = threading.Thread(target=restart, daemon=True, name="hotconsole-restart")
+        thread.start()
+        return thread
+
+    def start_worker_pool(self, commands: list[Command]):
+        """Если есть команды с isolated=True, заранее запускает процессы для них с уже импортированными модулями"""
+        isolated = [command for command in commands if command.isolated]
+        if len(isolated) == 0 or Executor.pool is not None:
+            return
+        modules = {command.execute.__module__ for command in isolated} - {"__main__", None}
+        Executor.start_pool(self.isolated_workers, sorted(modules))
+
+    def start_event_loop(self, commands: list[Command]):
+        """Цикл живет все время работы приложения, поэтому первая асинхронная команда не ждет его запуска.
+        Ленивые команды из реестра не проверяются, чтобы не импортировать их модули при запуске"""
+        if any(not command.isolated and is_coroutine_function(command.execute, resolve=False) for command in commands):
+            Executor.get_loop()
+
+    def stop_worker_pool(self):
+        Executor.stop_pool()
+
+    def start_idle_policy(self):
+        """В простое закрывает кэши, забывает опции и результаты запросов и останавливает пул процессов
+        (вместе с модулями, которые импортированы только в нем). Пул снова запускается перед следующей командой.
+        Прогрев ставится в очередь сразу после освобождения: он уступает командам, зато первая команда
+        после простоя не выполняется с холодным кэшем"""
+        if self.idle_after is None:
+            return
+        self.idle_policy.on_idle("кэши", self.release_caches)
+        self.idle_policy.on_idle("пул процессов", self.stop_worker_pool)
+        self.idle_policy.on_idle("прогрев", self.warmup.reset)
+        self.idle_policy.on_wake(lambda: self.start_worker_pool(list(self.commands.values())))
+        self.idle_policy.on_wake(self.start_warmup)
+        self.idle_policy.on_released(self.start_warmup)
+        self.idle_policy.start()
+
+    def start_warmup(self):
+        """Прогрев идет после установки перехвата клавиатуры и уступает выполняющимся командам.
+        Команды с isolated=True не прогреваются: они выполняются в другом процессе, и прогрев в этом процессе
+        не заполнил бы их кэш, а только импортировал бы сюда тяжелые модули"""
+        for key, command in self.commands.items():
+            if command.warmup is not None and not command.isolated:
+                scope = functools.partial(self.warmup_scope, command)
+                self.warmup.schedule(key, command.warmup, command.warmup_priority, scope)
+
+    @contextlib.contextmanager
+    def warmup_scope(self, command: Command):
+        """Прогрев выполняется от имени команды, поэтому CommandHelpers.cached заполняет тот же кэш, что и команда.
+        Пока он идет, память в простое не освобождается"""
+        with self.idle_policy.background():
+            token = _current_command.set(command.name)
+            try:
+                yield
+            finally:
+                _current_command.reset(token)
+
+    def show_warmup(self, args: list[str]):
+        """Выводим, какие команды прогреты и сколько это заняло. warm run прогревает их заново"""
+        if args[:1] == ["run"]:
+            self.warmup.reset()
+            self.start_warmup()
+            print("\nПрогрев запущен в фоне")
+        print()
+        for line in self.warmup.format_report():
+            print(line)
+        print()
+
+    def show_trace(self, args: list[str]):
+        """Выводим сводку по стадиям нажатий за последние N секунд (по умолчанию - за все время)
+        и сохраняем их в logs в формате Chrome trace"""
+        last = float(args[0]) if len(args) != 0 else None
+        print()
+        for line in Tracer.format_summary(last):
+            print(line)
+        path = os.path.join(get_scripts_path(), "logs", f"trace-{time.strftime('%Y%m%d-%H%M%S')}.json")
+        count = Tracer.export_chrome(path, last)
+        print(f"\nСтадий в файле: {count}. Откройте его в chrome://tracing или ui.perfetto.dev:\n{path}\n")
+
+    def release_caches(self):
+        KeyValueCache.close_all()
+        HttpCache.close_all()
+        AsyncHelper.close()
+        DBHelper.result_cache.invalidate()
+        for command in self.commands.values():
+            if isinstance(command.options, OptionsProvider):
+                command.options.invalidate()
+
     def console_mode(self, hotkeys: list[Hotkey]):
         """Запускаем скрипты в консольном режиме, без горячих клавиш"""
         OSHelper.clean_console_input()
         CommandHelpers.print_success("Консольные команды ждут вас!")
-        commands: list[Command] = [hotkey.command for hotkey in hotkeys]
-        commands_names = {command.name: command for command in commands}
         while True:
-            self.print_commands(commands)
-            args = input().strip().split()
+            commands_names = {hotkey.command.name: self.current(hotkey.command) for hotkey in hotkeys}
+            self.print_commands(list(commands_names.values()))
+            args = PromptBroker.shared().ask(background=True).strip().split()
             if len(args) == 0:
                 continue
             try:
                 if args[0] == 'exit':
-                    OSHelper.rerun_as_admin(True)
-                if len(args) == 1:
-                    Executor.try_execute(commands_names[args[0]])
-                elif len(args) == 2:
-                    Executor.try_execute(commands_names[args[0]], int(args[1]))
+                    self.restart()
+                    return
+                if args[0] in self.console_commands:
+                    self.console_commands[args[0]][1](args[1:])
+                elif len(args) == 1:
+                    self.execute(commands_names[args[0]])
                 else:
-                    CommandHelpers.print_error("У команды есть лишние аргументы")
+                    option_numbers = self.parse_option_numbers(args[1:])
+                    if len(option_numbers) == 1:
+                        self.execute(commands_names[args[0]], option_numbers[0])
+                    else:
+                        self.execute(commands_names[args[0]], option_numbers)
             except KeyError:
                 CommandHelpers.print_error("Команда не найдена")
             except ValueError:
                 CommandHelpers.print_error("Номер опции должен быть числом")
 
-    def add_hotkey(self, key: str, command: Command, option_number: int):
+    def show_log(self, args: list[str]):
+        """Выводим последние записи журнала команд или ищем по нему"""
+        if not CommandLog.is_enabled():
+            CommandHelpers.print_error("Журнал команд выключен")
+            return
+        query = " ".join(args)
+        entries = CommandLog.tail(int(query)) if query.isdigit() else CommandLog.search(query)
+        for entry in entries:
+            print(CommandLog.format(entry))
+        print(f"\nЗаписей: {len(entries)}, файл журнала: {CommandLog.path}\n")
+
+    @staticmethod
+    def parse_option_numbers(args: list[str]) -> list[int]:
+        """Номера опций из аргументов консольной команды: turn 3, turn 1 3 5 или turn 1,3,5"""
+        return [int(number) for number in " ".join(args).replace(",", " ").split()]
+
+    def execute(self, command: Command, option_number: int | list[int] | None = None) -> str:
+        """Выполняем команду через Executor"""
+        with self.idle_policy.activity():
+            return Executor.try_execute(command, option_number)
+
+    def execute_in_background(self, command: Command, option_number: int | None = None) -> str:
+        """Выполняем задачу планировщика через Executor - без stash_state и вывода в консоль"""
+        with self.idle_policy.activity():
+            return Executor.execute_in_background(command, option_number)
+
+    def add_hotkey(self, key: str, command: Command, option_number: int | list[int] | None):
         """Добавляем горячую клавишу на команду с определенными параметрами"""
-        keyboard.add_hotkey(key, lambda: Executor.try_execute(command, option_number))
+        Platform.current().add_hotkey(key, lambda: self.execute(self.current(command), option_number))
 
     def add_hotstring(self, short_string: str, string: str):
         """Добавляем горячую строку: если напечатать ее и нажать на пробел, подставится полная строка"""
-        keyboard.add_abbreviation(short_string, string)
+        Platform.current().add_abbreviation(short_string, string)
 
     def print_hotkeys(self, hotkeys: list[Hotkey]):
         """Выводим список горячих клавиш в режиме горячих клавиш"""
@@ -487,7 +1176,10 @@ class Runner:
         print(table_style.format("Комбо", "Описание команды", "Номер опции"))
         print()
         for hotkey in hotkeys:
-            print(table_style.format(hotkey.keyboard_key, hotkey.command.description, hotkey.option_number or ""))
+            option = hotkey.option_number
+            if isinstance(option, list):
+                option = ",".join(map(str, option))
+            print(table_style.format(hotkey.keyboard_key, hotkey.command.description, option or ""))
         print(table_style.format("alt+h", "Вывести список горячих клавиш в консоль", ""))
         print()
         print(table_style.format("alt+q", "Переключиться на консольный режим", ""))
@@ -499,21 +1191,21 @@ class Runner:
         print(table_style.format("Команда", "Описание"))
         for command in commands:
             print(table_style.format(f"{command.name}", f"{command.description}"))
+        for name, (description, _) in self.console_commands.items():
+            print(table_style.format(name, description))
         print(table_style.format("exit", "Вернуться в режим горячих клавиш"))
         print("\n ")
 
     def is_screen_locked(self) -> bool:
         """Определяем, что экран заблокирован по названию соответсвующего процесса"""
-        process_name = "LogonUI.exe"
-        outputall = subprocess.check_output("TASKLIST")
-        return process_name in str(outputall)
+        return Platform.current().is_screen_locked()
 
     def restart_after_lock(self):
         """При блокировке экрана скрипты перестают работать, но они автоматически перезапускаются"""
-        while not self.is_screen_locked():
-            time.sleep(15)
         while True:
-            time.sleep(2)
-            if not self.is_screen_locked():
-                print("Перезапуск после блокировки...\n")
-                OSHelper.rerun_as_admin(True)
+            while not self.is_screen_locked():
+                time.sleep(15)
+            while self.is_screen_locked():
+                time.sleep(2)
+            print("Перезапуск после блокировки...\n")
+            self.restart().join()
@@ -0,0 +1,189 @@
+"""
+Модуль с нагрузочным прогоном: синтетические нажатия горячих клавиш на FakePlatform через настоящий Runner
+
+Classes
+-------
+LoadReport
+    Датакласс с итогами прогона: пропускная способность, задержка до старта команды и хвосты задержек
+LoadGenerator
+    Поднимает Runner во временной папке, нажимает горячие клавиши и строки и замеряет задержки
+"""
+
+import collections
+import contextlib
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+
+from hotconsole.hotconsole import Command, Hotkey, Hotstring, Runner, _current_command, scripts_folder
+from hotconsole.logs import CommandLog
+from hotconsole.platform import FakePlatform, Platform
+from hotconsole.tracing import percentile
+
+
+@dataclass(slots=True)
+class LoadReport:
+    """Итоги нагрузочного прогона. Все времена - в секундах
+
+    Parameters
+    ----------
+    events: int
+        Сколько нажатий было сгенерировано
+    completed: int
+        Сколько нажатий обработано до конца
+    duration: float
+        Время от первого нажатия до обработки последнего
+    queue_delays: list[float]
+        Для каждого нажатия: от нажатия до старта функции команды (для горячих строк - до подстановки).
+        Сюда входят ожидание в очереди перехвата, stash_state и чтение конфига
+    latencies: list[float]
+        Для каждого нажатия: от нажатия до возврата обработчика
+    """
+
+    events: int
+    completed: int
+    duration: float
+    queue_delays: list[float] = field(default_factory=list)
+    latencies: list[float] = field(default_factory=list)
+
+    @property
+    def throughput(self) -> float:
+        """Обработанных нажатий в секунду"""
+        return self.completed / self.duration if self.duration > 0 else 0.0
+
+    @staticmethod
+    def percentile(values: list[float], percent: float) -> float:
+        return percentile(values, percent)
+
+    def format(self) -> list[str]:
+        """Строки отчета: пропускная способность и p50/p95/p99/max задержек в миллисекундах"""
+        lines = [
+            f"Нажатий: {self.events}, обработано: {self.completed} за {self.duration:.2f} с "
+            f"({self.throughput:.0f} в секунду)",
+        ]
+        table_style = "{0:<20} \t{1:>8} \t{2:>8} \t{3:>8} \t{4:>8}"
+        lines.append(table_style.format("Задержка, мс", "p50", "p95", "p99", "max"))
+        for title, values in (("До старта команды", self.queue_delays), ("До конца обработки", self.latencies)):
+            lines.append(table_style.format(
+                title, *(f"{self.percentile(values, percent) * 1000:.2f}" for percent in (50, 95, 99, 100))
+            ))
+        return lines
+
+
+class LoadGenerator:
+    """Нагрузочный прогон на любой ОС. Во временной папке создается data.json, в ней запускается настоящий Runner
+    с синтетическими командами и горячими строками, а перехват клавиатуры заменяется на FakePlatform.
+    Нажатия проходят весь путь горячей клавиши: поток перехвата, stash_state, чтение конфига, Executor, журнал команд.
+    На время прогона вывод команд подавляется, а журнал команд пишется во временную папку
+
+    Parameters
+    ----------
+    commands: int
+        Сколько синтетических команд с горячими клавишами создать
+    hotstrings: int
+        Сколько горячих строк создать
+    work: float
+        Сколько секунд выполняется каждая синтетическая команда
+    seed: int
+        Зерно для выбора нажатий - одинаковое зерно дает одинаковую последовательность
+    """
+
+    def __init__(self, commands: int = 8, hotstrings: int = 4, work: float = 0.0, seed: int = 0):
+        self.work = work
+        self.random = random.Random(seed)
+        self.hotkeys = [
+            Hotkey(f"ctrl+alt+{index}", Command(f"load{index}", f"Синтетическая команда {index}", self._work), None)
+            for index in range(commands)
+        ]
+        self.hotstrings = [
+            Hotstring(f"ld{index}", f"Строка {index}", f"синтетическая строка {index}") for index in range(hotstrings)
+        ]
+        self._starts: dict[str, collections.deque[float]] = collections.defaultdict(collections.deque)
+        self._lock = threading.Lock()
+
+    @property
+    def keys(self) -> list[str]:
+        """Что можно нажать: горячие клавиши и сокращения горячих строк"""
+        return [hotkey.keyboard_key for hotkey in self.hotkeys] + [hotstring.abbreviation for hotstring in self.hotstrings]
+
+    def run(self, events: int = 1000, rate: float | None = None) -> LoadReport:
+        """Нажимает events случайных клавиш и ждет их обработки.
+        rate - сколько нажатий в секунду, None - все нажатия сразу, пачкой
+
+        Parameters
+        ----------
+        events: int
+            Сколько нажатий сгенерировать
+        rate: float | None
+            Темп нажатий в секунду. Пачка показывает пропускную способность, темп - задержку под обычной нагрузкой
+        """
+        platform = FakePlatform(title="Hotconsole Load")
+        emitted: dict[str, collections.deque[float]] = collections.defaultdict(collections.deque)
+        dispatched: list[tuple[str, float, float, float]] = []
+        platform.on_dispatch = lambda *event: dispatched.append(event)
+        self._starts.clear()
+        previous_platform = Platform.use(platform)
+        previous_log = CommandLog.path
+        try:
+            with tempfile.TemporaryDirectory() as folder, open(os.devnull, "w", encoding="utf-8") as devnull:
+                self._write_config(folder)
+                with scripts_folder(folder), contextlib.redirect_stdout(devnull):
+                    runner = Runner(title=platform.title)
+                    runner.hotkeys = self.hotkeys
+                    runner.hotstrings = self.hotstrings
+                    runner.commands = {hotkey.command.name: hotkey.command for hotkey in self.hotkeys}
+                    runner.install_hooks()
+                    keys = self.keys
+                    start = time.perf_counter()
+                    for index in range(events):
+                        if rate is not None:
+                            delay = start + index / rate - time.perf_counter()
+                            if delay > 0:
+                                time.sleep(delay)
+                        key = self.random.choice(keys)
+                        now = time.perf_counter()
+                        emitted[key].append(now)
+                        platform.press(key, now)
+                    platform.join()
+                    duration = time.perf_counter() - start
+                    CommandLog.shutdown()
+        finally:
+            Platform.use(previous_platform)
+            CommandLog.path = None
+            if previous_log is not None:
+                CommandLog.setup(previous_log)
+        return self._report(events, duration, emitted, dispatched)
+
+    def _work(self, option_number: int | None = None):
+        """Функция синтетической команды: запоминает время старта и имитирует работу"""
+        started = time.perf_counter()
+        with self._lock:
+            self._starts[_current_command.get()].append(started)
+        if self.work > 0:
+            time.sleep(self.work)
+
+    def _report(
+            self, events: int, duration: float, emitted: dict[str, collections.deque[float]],
+            dispatched: list[tuple[str, float, float, float]],
+    ) -> LoadReport:
+        """Старты команд сопоставляются с нажатиями той же клавиши по порядку"""
+        report = LoadReport(events, len(dispatched), duration)
+        abbreviations = {hotstring.abbreviation for hotstring in self.hotstrings}
+        for hotkey in self.hotkeys:
+            presses = zip(emitted[hotkey.keyboard_key], self._starts[hotkey.command.name])
+            report.queue_delays.extend(started - pressed for pressed, started in presses)
+        for key, pressed, started, finished in dispatched:
+            if key in abbreviations:
+                report.queue_delays.append(started - pressed)
+            report.latencies.append(finished - pressed)
+        return report
+
+    @staticmethod
+    def _write_config(folder: str):
+        config = {"version": 1, "consoleMode": False, "refuseStartup": True}
+        with open(os.path.join(folder, "data.json"), "w", encoding="utf-8") as file:
+            file.write(json.dumps(config, indent=4))
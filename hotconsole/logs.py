@@ -0,0 +1,146 @@
+"""
+Модуль с журналом команд - пишет подробности в файл, чтобы в консоли оставалась только короткая сводка
+
+Classes
+-------
+JsonFormatter
+    Форматирует записи журнала в одну строку JSON
+CommandLog
+    Журнал команд: запись через фоновый поток в файл с ротацией, просмотр и поиск
+"""
+
+import atexit
+import collections
+import datetime
+import json
+import logging
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+
+class JsonFormatter(logging.Formatter):
+    """Одна запись - одна строка JSON: время, уровень, сообщение и поля команды"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": datetime.datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "message": record.getMessage(),
+        }
+        data.update(getattr(record, "fields", {}))
+        return json.dumps(data, ensure_ascii=False)
+
+
+class CommandLog:
+    """Журнал команд. Запись только кладет сообщение в очередь, а в файл его пишет фоновый поток,
+    поэтому команды не ждут диска. Файл ротируется по размеру и переживает перезапуск приложения"""
+
+    logger = logging.getLogger("hotconsole")
+    path: str | None = None
+    backup_count = 0
+    _listener: QueueListener | None = None
+    _at_exit = False
+
+    @classmethod
+    def setup(cls, path: str, max_bytes: int = 1024 * 1024, backup_count: int = 3):
+        """Включает журнал в указанном файле"""
+        cls.shutdown()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+        handler.setFormatter(JsonFormatter())
+        records: queue.SimpleQueue = queue.SimpleQueue()
+        cls._listener = QueueListener(records, handler)
+        cls._listener.start()
+        cls.logger.handlers = [QueueHandler(records)]
+        cls.logger.setLevel(logging.INFO)
+        cls.logger.propagate = False
+        cls.path = path
+        cls.backup_count = backup_count
+        if not cls._at_exit:
+            atexit.register(cls.shutdown)
+            cls._at_exit = True
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        return cls._listener is not None
+
+    @classmethod
+    def shutdown(cls):
+        """Дописывает очередь в файл и останавливает фоновый поток. Вызывается и перед перезапуском приложения"""
+        if cls._listener is None:
+            return
+        cls._listener.stop()
+        for handler in cls._listener.handlers:
+            handler.close()
+        cls._listener = None
+        cls.logger.handlers = []
+
+    @classmethod
+    def info(cls, message: str, **fields):
+        if cls.is_enabled():
+            cls.logger.info(message, extra={"fields": fields})
+
+    @classmethod
+    def record(
+            cls,
+            command: str,
+            option_number,
+            duration: float,
+            outcome: str,
+            message: str = "",
+            traceback: str | None = None,
+    ):
+        """Записывает результат выполнения команды: success, error или exception"""
+        if not cls.is_enabled():
+            return
+        fields = {"command": command, "option": option_number, "duration": round(duration, 3), "outcome": outcome}
+        if traceback is not None:
+            fields["traceback"] = traceback
+        level = logging.INFO if outcome == "success" else logging.ERROR
+        cls.logger.log(level, message, extra={"fields": fields})
+
+    @classmethod
+    def tail(cls, count: int = 20) -> list[dict]:
+        """Последние записи журнала"""
+        return cls.search("", count)
+
+    @classmethod
+    def search(cls, text: str, count: int = 20) -> list[dict]:
+        """Последние записи, в которых встречается текст (без учета регистра).
+        Испорченные строки (например, недописанные при аварийном выходе) пропускаются"""
+        if cls.path is None:
+            return []
+        text = text.lower()
+        found: collections.deque = collections.deque(maxlen=count)
+        for path in cls._files():
+            with open(path, "r", encoding="utf-8") as file:
+                for line in file:
+                    if text in line.lower():
+                        found.append(line)
+        entries = []
+        for line in found:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                continue
+        return entries
+
+    @classmethod
+    def format(cls, entry: dict) -> str:
+        """Короткая строка записи для консоли"""
+        line = f"{entry.get('time', '')} {entry.get('level', '')}"
+        if "command" in entry:
+            option = "" if entry.get("option") is None else f" {entry['option']}"
+            line += f" {entry['command']}{option}: {entry.get('outcome')} за {entry.get('duration')} с"
+        if entry.get("message"):
+            line += f" - {entry['message'].strip()}"
+        if entry.get("traceback"):
+            line += f"\n    {entry['traceback'].strip().splitlines()[-1]}"
+        return line
+
+    @classmethod
+    def _files(cls) -> list[str]:
+        """Файлы журнала от самого старого к текущему"""
+        paths = [f"{cls.path}.{index}" for index in range(cls.backup_count, 0, -1)] + [cls.path]
+        return [path for path in paths if os.path.exists(path)]
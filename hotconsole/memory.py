@@ -0,0 +1,322 @@
+"""
+Модуль для учета памяти приложения, которое весь день висит в автозагрузке, и ее освобождения в простое
+
+Classes
+-------
+MemoryUsage
+    Датакласс с памятью одной команды: сколько она добавила процессу и сколько заняла на пике
+MemoryTracker
+    Замеряет память процесса (RSS), разбивку tracemalloc по подсистемам и память каждой команды
+IdlePolicy
+    После простоя сбрасывает кэши, останавливает пул процессов и возвращает память системе
+"""
+
+import collections
+import contextlib
+import ctypes
+import gc
+import os
+import re
+import sys
+import threading
+import time
+import tracemalloc
+import traceback
+from dataclasses import dataclass
+from typing import Callable
+
+from hotconsole.worker import _memory_usage
+
+_PACKAGE_FOLDER = os.path.dirname(os.path.abspath(__file__))
+
+
+@dataclass(slots=True)
+class MemoryUsage:
+    """Память, которую заняла команда
+
+    Parameters
+    ----------
+    name: str
+        Название команды
+    runs: int
+        Сколько раз команда выполнялась с момента запуска приложения
+    rss_delta: int
+        На сколько байт изменилась память процесса (RSS) за последнее выполнение
+    retained: int
+        Сколько байт Python-объектов осталось после последнего выполнения (только при включенном tracemalloc)
+    peak: int
+        Самый большой прирост Python-объектов во время выполнения (только при включенном tracemalloc)
+    """
+
+    name: str
+    runs: int = 0
+    rss_delta: int = 0
+    retained: int = 0
+    peak: int = 0
+
+
+class MemoryTracker:
+    """Учет памяти. RSS замеряется всегда - это дешево. Разбивка по подсистемам и по объектам команд
+    требует tracemalloc, который замедляет выполнение, поэтому он включается только по запросу (mem trace).
+    Если команды выполняются одновременно, их замеры перекрываются"""
+
+    commands: dict[str, MemoryUsage] = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def rss() -> int:
+        """Память процесса в байтах (на Windows - рабочий набор)"""
+        return _memory_usage()
+
+    @classmethod
+    def start_tracing(cls, frames: int = 1):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    @classmethod
+    def stop_tracing(cls):
+        tracemalloc.stop()
+
+    @classmethod
+    def begin(cls) -> tuple[int, int]:
+        """Замер перед командой: RSS и объем Python-объектов"""
+        traced = 0
+        if tracemalloc.is_tracing():
+            traced = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        return cls.rss(), traced
+
+    @classmethod
+    def finish(cls, name: str, before: tuple[int, int]):
+        """Замер после команды - сравнивается с begin"""
+        rss_before, traced_before = before
+        rss = cls.rss()
+        with cls._lock:
+            usage = cls.commands.setdefault(name, MemoryUsage(name))
+            usage.runs += 1
+            usage.rss_delta = rss - rss_before
+            if tracemalloc.is_tracing():
+                current, peak = tracemalloc.get_traced_memory()
+                usage.retained = current - traced_before
+                usage.peak = max(usage.peak, peak - traced_before)
+
+    @classmethod
+    def subsystems(cls, scripts_path: str) -> dict[str, int]:
+        """Байты Python-объектов по подсистемам, от больших к меньшим. Пусто, если tracemalloc выключен"""
+        if not tracemalloc.is_tracing():
+            return {}
+        totals: collections.Counter[str] = collections.Counter()
+        for stat in tracemalloc.take_snapshot().statistics("filename"):
+            totals[cls.subsystem(stat.traceback[0].filename, scripts_path)] += stat.size
+        return dict(totals.most_common())
+
+    @staticmethod
+    def subsystem(filename: str, scripts_path: str) -> str:
+        """К чему относится файл: модуль hotconsole, скрипты пользователя, сторонняя библиотека или сам питон"""
+        if filename.startswith("<"):
+            return "python"
+        path = os.path.abspath(filename)
+        if path.startswith(_PACKAGE_FOLDER + os.sep):
+            return "hotconsole." + os.path.splitext(os.path.relpath(path, _PACKAGE_FOLDER))[0].replace(os.sep, ".")
+        parts = re.split(r"[\\/]", path)
+        if "site-packages" in parts:
+            index = parts.index("site-packages")
+            if index + 1 < len(parts):
+                return os.path.splitext(parts[index + 1])[0]
+        if path.startswith(os.path.abspath(scripts_path) + os.sep):
+            return "скрипты"
+        return "python"
+
+    @classmethod
+    def format_report(cls, scripts_path: str, limit: int = 10) -> list[str]:
+        """Строки для консольной команды mem"""
+        lines = [f"Память процесса: {cls.format_size(cls.rss())}"]
+        if not tracemalloc.is_tracing():
+            lines.append("Разбивка по подсистемам выключена - включите ее командой mem trace")
+        else:
+            current, peak = tracemalloc.get_traced_memory()
+            lines.append(f"Python-объекты: {cls.format_size(current)}, пик {cls.format_size(peak)}")
+            for name, size in list(cls.subsystems(scripts_path).items())[:limit]:
+                lines.append(f"    {name:<32} {cls.format_size(size)}")
+        with cls._lock:
+            usages = sorted(cls.commands.values(), key=lambda usage: -max(usage.rss_delta, usage.retained))
+        if len(usages) != 0:
+            table_style = "{0:<16} \t{1:<8} \t{2:<12} \t{3:<12} \t{4}"
+            lines.append("")
+            lines.append(table_style.format("Команда", "Запусков", "RSS", "Осталось", "Пик"))
+            for usage in usages[:limit]:
+                lines.append(table_style.format(
+                    usage.name,
+                    usage.runs,
+                    cls.format_size(usage.rss_delta, signed=True),
+                    cls.format_size(usage.retained, signed=True),
+                    cls.format_size(usage.peak),
+                ))
+        return lines
+
+    @staticmethod
+    def format_size(size: int, signed: bool = False) -> str:
+        sign = ("+" if size >= 0 else "-") if signed else ""
+        size = abs(size)
+        if size < 1024 * 1024:
+            return f"{sign}{size / 1024:.0f} КБ"
+        return f"{sign}{size / 1024 / 1024:.1f} МБ"
+
+    @staticmethod
+    def trim():
+        """Возвращает системе освободившиеся страницы: на Windows сжимает рабочий набор, на Linux - кучу malloc"""
+        try:
+            if sys.platform == "win32":
+                ctypes.windll.psapi.EmptyWorkingSet(ctypes.windll.kernel32.GetCurrentProcess())
+            else:
+                ctypes.CDLL("libc.so.6").malloc_trim(0)
+        except (OSError, AttributeError):
+            pass
+
+
+class IdlePolicy:
+    """Если idle_after секунд не выполнялось ни одной команды, по очереди вызывает зарегистрированные
+    освобождения (кэши, пул процессов), собирает мусор и возвращает память системе, а затем - то, что надо
+    сделать сразу после освобождения (например, поставить прогрев). Перед следующей командой вызываются
+    пробуждения - например, пул процессов запускается снова
+
+    Parameters
+    ----------
+    idle_after: float
+        Через сколько секунд без команд освобождать память
+    check_every: float
+        Как часто проверять простой
+    """
+
+    def __init__(self, idle_after: float = 900, check_every: float = 30):
+        self.idle_after = idle_after
+        self.check_every = check_every
+        self.releasers: dict[str, Callable[[], None]] = {}
+        self.wakers: list[Callable[[], None]] = []
+        self.after_release: list[Callable[[], None]] = []
+        self.is_idle = False
+        self.releases = 0
+        self.freed = 0
+        self._last_activity = time.monotonic()
+        self._running = 0
+        self._background = 0
+        self._woken = False
+        self._lock = threading.Lock()
+        self._release_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def on_idle(self, name: str, release: Callable[[], None]):
+        self.releasers[name] = release
+
+    def on_wake(self, wake: Callable[[], None]):
+        self.wakers.append(wake)
+
+    def on_released(self, callback: Callable[[], None]):
+        """callback вызывается после каждого завершенного освобождения, вне блокировки освобождения"""
+        self.after_release.append(callback)
+
+    @contextlib.contextmanager
+    def activity(self):
+        """Оборачивает выполнение команды: пока она идет, память не освобождается.
+        Идущее освобождение команда не ждет - оно остановится после текущего шага (см. release)"""
+        with self._lock:
+            self._running += 1
+            self._woken = True
+            was_idle = self.is_idle
+            self.is_idle = False
+        if was_idle:
+            self._call_all(self.wakers)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._last_activity = time.monotonic()
+
+    @contextlib.contextmanager
+    def background(self):
+        """Оборачивает фоновую работу, например прогрев. Пока она идет, память не освобождается,
+        но, в отличие от команды, она не будит приложение и не откладывает следующий простой"""
+        with self._release_lock, self._lock:
+            self._background += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._background -= 1
+
+    @property
+    def is_busy(self) -> bool:
+        """Выполняется ли сейчас команда"""
+        with self._lock:
+            return self._running != 0
+
+    def idle_for(self) -> float:
+        """Сколько секунд не было команд. 0 - если команда выполняется сейчас"""
+        with self._lock:
+            return 0.0 if self._running != 0 else time.monotonic() - self._last_activity
+
+    def release(self) -> int:
+        """Освобождает память сейчас и возвращает, на сколько байт уменьшилась память процесса.
+        Пока выполняется команда или прогрев, ничего не делает: они могут пользоваться кэшами и пулом.
+        Если команда началась посреди освобождения, оставшиеся шаги пропускаются, а уже освобожденное
+        возвращается пробуждениями - так нажатие не ждет, пока, например, остановится пул процессов"""
+        with self._release_lock:
+            with self._lock:
+                if self._running != 0 or self._background != 0:
+                    return 0
+                self._woken = False
+            before = MemoryTracker.rss()
+            released = 0
+            for release in list(self.releasers.values()):
+                if self._was_woken():
+                    break
+                self._call_all([release])
+                released += 1
+            if not self._was_woken():
+                gc.collect()
+                MemoryTracker.trim()
+            with self._lock:
+                completed = not self._woken
+                if completed:
+                    self.is_idle = True
+                    self.releases += 1
+                    self.freed = before - MemoryTracker.rss()
+        if completed:
+            self._call_all(self.after_release)
+            return self.freed
+        if released != 0:
+            self._call_all(self.wakers)
+        return 0
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, daemon=True, name="hotconsole-idle")
+            self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def format_status(self) -> str:
+        if self.is_idle:
+            return f"Простой: память освобождена ({MemoryTracker.format_size(self.freed)}), раз: {self.releases}"
+        idle_for = self.idle_for()
+        return f"Без команд {idle_for:.0f} с, память освободится через {max(self.idle_after - idle_for, 0):.0f} с"
+
+    def _was_woken(self) -> bool:
+        with self._lock:
+            return self._woken
+
+    def _loop(self):
+        while not self._stopped.wait(self.check_every):
+            if not self.is_idle and self.idle_for() >= self.idle_after:
+                self.release()
+
+    @staticmethod
+    def _call_all(callbacks):
+        for callback in list(callbacks):
+            try:
+                callback()
+            except Exception:
+                print(traceback.format_exc())
@@ -0,0 +1,175 @@
+"""
+Модуль с динамическими опциями команд - для больших списков, которые дорого строить заранее
+
+Classes
+-------
+OptionsProvider
+    Лениво получает список опций, кэширует его и обновляет в фоне
+OptionsPager
+    Выводит опции постранично и позволяет искать их по подстроке
+
+Constants
+---------
+DEFAULT_PAGE_SIZE
+    Сколько опций выводится на одной странице
+"""
+
+import threading
+import time
+from typing import Callable
+
+from hotconsole.prompts import PromptBroker
+
+DEFAULT_PAGE_SIZE = 20
+
+
+class OptionsProvider:
+    """Поставщик опций: получает список только при открытии вопроса, а не при старте приложения
+
+    Parameters
+    ----------
+    fetch: Callable[[], list]
+        Функция, которая возвращает актуальный список опций (строк или кортежей строк)
+    ttl: float
+        Сколько секунд кэш считается свежим. Устаревший кэш отдается сразу, а обновляется в фоне
+    page_size: int
+        Сколько опций выводить на одной странице
+    """
+
+    def __init__(self, fetch: Callable[[], list], ttl: float = 300, page_size: int = DEFAULT_PAGE_SIZE):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.page_size = page_size
+        self._items: list | None = None
+        self._shown: list | None = None
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def get(self) -> list:
+        """Возвращает опции: при первом вызове получает их, потом берет из кэша"""
+        with self._lock:
+            items = self._items
+            is_stale = time.monotonic() - self._fetched_at > self.ttl
+        if items is None:
+            items = self.refresh()
+        elif is_stale:
+            self.refresh_in_background()
+        self._shown = items
+        return items
+
+    def option(self, number: int):
+        """Опция по номеру (с единицы) из того списка, который последний раз видел пользователь"""
+        items = self._shown if self._shown is not None else self.get()
+        if number > len(items) or number < 1:
+            raise ValueError("Выбран некорректный вариант")
+        return items[number - 1]
+
+    def refresh(self) -> list:
+        """Синхронно получает свежий список опций"""
+        items = list(self.fetch())
+        with self._lock:
+            self._items = items
+            self._fetched_at = time.monotonic()
+        return items
+
+    def refresh_in_background(self):
+        """Обновляет кэш в отдельном потоке, если обновление еще не идет"""
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._refresh_quietly, daemon=True).start()
+
+    def invalidate(self):
+        """Сбрасывает кэш - при следующем вопросе опции получатся заново"""
+        with self._lock:
+            self._items = None
+            self._fetched_at = 0.0
+
+    def _refresh_quietly(self):
+        try:
+            self.refresh()
+        except Exception:
+            pass
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+
+class OptionsPager:
+    """Постраничный вывод опций с поиском по подстроке. Номера опций всегда соответствуют полному списку
+
+    Parameters
+    ----------
+    options: list
+        Полный список опций - строк или кортежей, у которых выводится второй элемент
+    page_size: int
+        Сколько опций выводить на одной странице
+    """
+
+    hint = 'Введите номер, текст для поиска, Enter - следующая страница, "-" - предыдущая, "*" - сбросить поиск'
+
+    def __init__(self, options: list, page_size: int = DEFAULT_PAGE_SIZE):
+        self.options = options
+        self.page_size = max(page_size, 1)
+        self.query = ""
+        self.page = 0
+        self._matches = list(range(len(options)))
+
+    @staticmethod
+    def title(option) -> str:
+        """Текст опции, который видит пользователь"""
+        if isinstance(option, tuple):
+            return str(option[1])
+        return str(option)
+
+    def pages_count(self) -> int:
+        return max((len(self._matches) + self.page_size - 1) // self.page_size, 1)
+
+    def search(self, query: str):
+        """Оставляет только опции, которые содержат подстроку (без учета регистра)"""
+        self.query = query.strip().lower()
+        self._matches = [
+            index for index, option in enumerate(self.options) if self.query in self.title(option).lower()
+        ]
+        self.page = 0
+
+    def current_page(self) -> list[tuple[int, str]]:
+        """Номера и тексты опций на текущей странице"""
+        start = self.page * self.page_size
+        return [(index + 1, self.title(self.options[index])) for index in self._matches[start:start + self.page_size]]
+
+    def print_page(self):
+        if self.query != "":
+            print(f'Поиск: "{self.query}", найдено: {len(self._matches)}')
+        for number, title in self.current_page():
+            print(f"{number}. {title}")
+        print(f"\nСтраница {self.page + 1}/{self.pages_count()}. {self.hint}")
+
+    def handle(self, answer: str) -> int | None:
+        """Обрабатывает ответ пользователя. Возвращает номер опции, если он выбран"""
+        answer = answer.strip()
+        if answer.isdigit():
+            number = int(answer)
+            if number > len(self.options) or number < 1:
+                raise ValueError("Выбран некорректный вариант")
+            return number
+        if answer == "":
+            self.page = (self.page + 1) % self.pages_count()
+        elif answer == "-":
+            self.page = (self.page - 1) % self.pages_count()
+        elif answer == "*":
+            self.search("")
+        else:
+            self.search(answer)
+        return None
+
+    def ask(self, timeout: float | None = None, default: int | None = None) -> int:
+        """Выводит страницы и спрашивает пользователя, пока он не выберет номер опции.
+        timeout и default действуют на каждую страницу"""
+        while True:
+            self.print_page()
+            number = self.handle(PromptBroker.shared().ask("", timeout, None if default is None else str(default)))
+            if number is not None:
+                return number
@@ -0,0 +1,94 @@
+"""
+Модуль для параллельного выполнения команды сразу для нескольких опций
+
+Classes
+-------
+ThreadOutput
+    Подменяет sys.stdout и собирает вывод каждого потока отдельно
+OptionResult
+    Датакласс с результатом выполнения команды для одной опции
+"""
+
+import contextvars
+import io
+import sys
+import threading
+from dataclasses import dataclass
+
+
+class ThreadOutput(io.TextIOBase):
+    """Обертка над sys.stdout: если поток включил перехват, его вывод копится в буфере, иначе печатается как обычно.
+    Буфер хранится в contextvars, поэтому вывод потоков, запущенных из копии контекста, попадает туда же"""
+
+    _lock = threading.Lock()
+    _buffer: contextvars.ContextVar[io.StringIO | None] = contextvars.ContextVar("output_buffer", default=None)
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    @classmethod
+    def install(cls) -> "ThreadOutput":
+        """Подменяет sys.stdout один раз на все приложение"""
+        with cls._lock:
+            if not isinstance(sys.stdout, ThreadOutput):
+                sys.stdout = ThreadOutput(sys.stdout)
+            return sys.stdout
+
+    @classmethod
+    def is_capturing(cls) -> bool:
+        """Перехватывается ли сейчас вывод текущего потока"""
+        return isinstance(sys.stdout, ThreadOutput) and cls._buffer.get() is not None
+
+    def start_capture(self):
+        self._buffer.set(io.StringIO())
+
+    def stop_capture(self) -> str:
+        buffer = self._buffer.get()
+        self._buffer.set(None)
+        return "" if buffer is None else buffer.getvalue()
+
+    def write(self, text: str) -> int:
+        buffer = self._buffer.get()
+        if buffer is not None:
+            return buffer.write(text)
+        return self.stream.write(text)
+
+    def flush(self):
+        if self._buffer.get() is None:
+            self.stream.flush()
+
+    @property
+    def encoding(self):
+        return getattr(self.stream, "encoding", "utf-8")
+
+    def isatty(self) -> bool:
+        return self.stream.isatty()
+
+
+@dataclass
+class OptionResult:
+    """Результат выполнения команды для одной опции
+
+    Parameters
+    ----------
+    option_number: int
+        Номер опции
+    title: str
+        Текст опции для сводки
+    output: str
+        Все, что команда вывела в консоль
+    error: str | None
+        Сообщение об ошибке. None - если команда выполнилась успешно
+    duration: float
+        Сколько секунд выполнялась команда
+    """
+
+    option_number: int
+    title: str
+    output: str = ""
+    error: str | None = None
+    duration: float = 0.0
+
+    @property
+    def is_success(self) -> bool:
+        return self.error is None
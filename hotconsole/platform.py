@@ -0,0 +1,361 @@
+"""
+Модуль с платформой - всем, что hotconsole делает через Windows: перехват клавиатуры, окна, процессы и службы
+
+Classes
+-------
+Platform
+    Интерфейс платформы и выбор текущей реализации
+WindowsPlatform
+    Реализация через keyboard, pywin32 и командную строку Windows (по умолчанию)
+FakePlatform
+    Платформа в памяти для тестов и нагрузочных прогонов на любой ОС
+"""
+
+import contextvars
+import ctypes
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+import traceback
+from typing import Callable, Iterable
+
+import keyboard
+
+from hotconsole.tracing import Tracer
+
+
+class Platform:
+    """Все обращения к ОС, от которых зависит работа приложения. Текущая платформа общая на процесс:
+    по умолчанию это WindowsPlatform, а в тестах и нагрузочных прогонах - FakePlatform"""
+
+    _current: "Platform | None" = None
+
+    @classmethod
+    def current(cls) -> "Platform":
+        if Platform._current is None:
+            Platform._current = WindowsPlatform()
+        return Platform._current
+
+    @classmethod
+    def use(cls, platform: "Platform") -> "Platform":
+        """Делает platform текущей и возвращает прежнюю"""
+        previous = cls.current()
+        Platform._current = platform
+        return previous
+
+    def add_hotkey(self, key: str, callback: Callable[[], None]):
+        """Привязывает callback к клавише. Обработчик выполняется внутри трассы нажатия (см. Tracer)"""
+        raise NotImplementedError
+
+    def add_abbreviation(self, abbreviation: str, text: str):
+        raise NotImplementedError
+
+    def unhook_all(self):
+        """Снимает все горячие клавиши и строки"""
+        raise NotImplementedError
+
+    def stash_state(self):
+        """Отпускает зажатые клавиши, чтобы команда не получила залипший alt или ctrl"""
+        raise NotImplementedError
+
+    def press_and_release(self, keys: str):
+        raise NotImplementedError
+
+    def set_english_layout(self):
+        raise NotImplementedError
+
+    def set_title(self, title: str):
+        raise NotImplementedError
+
+    def console_title(self) -> str:
+        raise NotImplementedError
+
+    def close_window(self, title: str):
+        raise NotImplementedError
+
+    def flash_window(self, title: str):
+        raise NotImplementedError
+
+    def switch_to_window(self, title: str):
+        """Выводит окно на передний план. Если не получилось - выбрасывает ошибку"""
+        raise NotImplementedError
+
+    def switch_to_console(self):
+        """Выводит на передний план окно консоли со скриптами"""
+        raise NotImplementedError
+
+    def run(self, args: list[str]) -> str:
+        """Выполняет консольную команду и возвращает ее вывод"""
+        raise NotImplementedError
+
+    def call(self, args: list[str]) -> int:
+        """Выполняет консольную команду и возвращает код выхода"""
+        raise NotImplementedError
+
+    def is_screen_locked(self) -> bool:
+        raise NotImplementedError
+
+    @staticmethod
+    def trigger_time(pressed: Iterable[float]) -> float | None:
+        """Время нажатия, вызвавшего горячую клавишу, в шкале perf_counter - от него считается трасса.
+        pressed - время событий (по time.time) зажатых сейчас клавиш: последнее из них и запустило горячую клавишу"""
+        pressed = list(pressed)
+        if len(pressed) == 0:
+            return None
+        return time.perf_counter() - max(time.time() - max(pressed), 0)
+
+
+class WindowsPlatform(Platform):
+    """Настоящая платформа. Модули pywin32 импортируются при первом обращении,
+    поэтому сам модуль можно импортировать и на других ОС"""
+
+    def add_hotkey(self, key: str, callback: Callable[[], None]):
+        keyboard.add_hotkey(key, lambda: self._run_hotkey(key, callback))
+
+    def add_abbreviation(self, abbreviation: str, text: str):
+        keyboard.add_abbreviation(abbreviation, text)
+
+    def unhook_all(self):
+        keyboard.unhook_all()
+
+    def stash_state(self):
+        keyboard.stash_state()
+
+    def press_and_release(self, keys: str):
+        keyboard.press_and_release(keys)
+
+    def set_english_layout(self):
+        import win32api
+
+        win32api.LoadKeyboardLayout("00000409", 1)
+
+    def set_title(self, title: str):
+        ctypes.windll.kernel32.SetConsoleTitleW(title)
+
+    def console_title(self) -> str:
+        GetConsoleTitle = ctypes.windll.kernel32.GetConsoleTitleW
+        GetConsoleTitle.restype = ctypes.c_uint
+        buffer_size = 100
+        title_buffer = ctypes.create_unicode_buffer(buffer_size)
+        GetConsoleTitle(title_buffer, buffer_size)
+        return title_buffer.value
+
+    def close_window(self, title: str):
+        import win32con
+        import win32gui
+
+        hwnd = win32gui.FindWindow(None, title)
+        win32gui.PostMessage(hwnd, win32con.WM_CLOSE, 0, 0)
+
+    def flash_window(self, title: str):
+        import win32gui
+
+        hwnd = win32gui.FindWindow(None, title)
+        win32gui.FlashWindow(hwnd, 1)
+
+    def switch_to_window(self, title: str):
+        import win32con
+        import win32gui
+
+        hwnd = win32gui.FindWindow(None, title)
+        if win32gui.IsIconic(hwnd):
+            win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
+        win32gui.SetForegroundWindow(hwnd)
+
+    def switch_to_console(self):
+        """Переключения окна само на себя не работает, поэтому приходится запускать новый скрипт в отдельном окне"""
+        import win32gui
+
+        console_title = self.console_title()
+        script = str(
+            f"""
+import ctypes
+import sys
+if not ctypes.windll.shell32.IsUserAnAdmin():
+    ctypes.windll.shell32.ShellExecuteW(None, 'runas', sys.executable, ' '.join(sys.argv), None, 1)
+    exit()
+import win32gui
+import win32con
+hwnd = win32gui.FindWindow(None, '{console_title}')
+if win32gui.IsIconic(hwnd):
+    win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
+win32gui.SetForegroundWindow(hwnd)"""
+        )
+        file_path = os.path.join(sys.path[0], "switcher.py")
+        with open(file_path, "w+", encoding="utf-8") as file:
+            file.writelines(script)
+        script_window_is_background = win32gui.FindWindow(None, console_title) != win32gui.GetForegroundWindow()
+        if script_window_is_background:
+            subprocess.call(f"python {file_path}", creationflags=subprocess.CREATE_NEW_CONSOLE)
+        os.remove(file_path)
+
+    def run(self, args: list[str]) -> str:
+        return subprocess.run(args, capture_output=True, check=True).stdout.decode("cp866")
+
+    def call(self, args: list[str]) -> int:
+        return subprocess.call(args)
+
+    def is_screen_locked(self) -> bool:
+        """Определяем, что экран заблокирован по названию соответсвующего процесса"""
+        return "LogonUI.exe" in self.run(["tasklist"])
+
+    def _run_hotkey(self, key: str, callback: Callable[[], None]):
+        """keyboard вызывает горячую клавишу раньше обработчиков keyboard.hook, поэтому время нажатия берется
+        из зажатых клавиш: их keyboard обновляет до вызова горячей клавиши"""
+        with keyboard._pressed_events_lock:
+            pressed = [event.time for event in keyboard._pressed_events.values()]
+        with Tracer.trace("hotkey", self.trigger_time(pressed), key=key):
+            callback()
+
+
+class FakePlatform(Platform):
+    """Платформа в памяти. Нажатия и горячие строки обрабатываются по очереди в одном потоке,
+    как это делает перехват клавиатуры в Windows: пока обработчик не вернулся, следующее нажатие ждет.
+    Зажатые клавиши хранятся, как в keyboard, со временем по time.time - по ним считается начало трассы.
+    Службы и процессы - таблицы в памяти, которые отдаются в формате sc queryex и tasklist
+
+    Parameters
+    ----------
+    services: dict[str, tuple[str, int]] | None
+        Службы: имя -> (состояние RUNNING или STOPPED, PID)
+    processes: list[str] | None
+        Имена запущенных процессов
+    title: str
+        Заголовок окна консоли
+    """
+
+    def __init__(
+            self, services: dict[str, tuple[str, int]] | None = None, processes: list[str] | None = None,
+            title: str = "",
+    ):
+        self.services = dict(services or {})
+        self.processes = list(processes or [])
+        self.title = title
+        self.foreground = title
+        self.hotkeys: dict[str, Callable[[], None]] = {}
+        self.abbreviations: dict[str, str] = {}
+        self.typed: list[str] = []
+        self.pressed: list[str] = []
+        self.commands: list[list[str]] = []
+        self.stashes = 0
+        self.locked = False
+        self.held: dict[str, float] = {}
+        self.on_dispatch: Callable[[str, float, float, float], None] | None = None
+        self._events: queue.Queue = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def press(self, key: str, emitted: float | None = None):
+        """Нажатие горячей клавиши или ввод горячей строки. Обработается в потоке перехвата,
+        который при первом нажатии запускается с копией контекста (например, папки со скриптами).
+        emitted - время нажатия по perf_counter. Без него клавиша зажимается сейчас, а время берется из зажатых"""
+        self._start()
+        if emitted is None:
+            self.key_down(key)
+        self._events.put((key, emitted))
+
+    def key_down(self, key: str, at: float | None = None):
+        """Зажимает клавишу, например shift. at - время события по time.time, по умолчанию - сейчас"""
+        with self._lock:
+            self.held[key] = at if at is not None else time.time()
+
+    def join(self):
+        """Ждет, пока все нажатия будут обработаны"""
+        self._events.join()
+
+    def add_hotkey(self, key: str, callback: Callable[[], None]):
+        with self._lock:
+            self.hotkeys[key] = callback
+
+    def add_abbreviation(self, abbreviation: str, text: str):
+        with self._lock:
+            self.abbreviations[abbreviation] = text
+
+    def unhook_all(self):
+        with self._lock:
+            self.hotkeys.clear()
+            self.abbreviations.clear()
+
+    def stash_state(self):
+        self.stashes += 1
+
+    def press_and_release(self, keys: str):
+        self.pressed.append(keys)
+
+    def set_english_layout(self):
+        pass
+
+    def set_title(self, title: str):
+        self.title = title
+
+    def console_title(self) -> str:
+        return self.title
+
+    def close_window(self, title: str):
+        if self.foreground == title:
+            self.foreground = ""
+
+    def flash_window(self, title: str):
+        pass
+
+    def switch_to_window(self, title: str):
+        self.foreground = title
+
+    def switch_to_console(self):
+        self.foreground = self.title
+
+    def run(self, args: list[str]) -> str:
+        self.commands.append(list(args))
+        if args[:2] == ["sc", "queryex"]:
+            return "".join(
+                f"\nSERVICE_NAME: {name}\n        STATE              : 0  {state}\n        PID                : {pid}\n"
+                for name, (state, pid) in self.services.items()
+            )
+        if args[:1] == ["tasklist"]:
+            return "\r\n".join(f"{name:<25} {index + 1000:>8} Console" for index, name in enumerate(self.processes))
+        return ""
+
+    def call(self, args: list[str]) -> int:
+        self.commands.append(list(args))
+        if args[:1] == ["sc"] and len(args) == 3 and args[2] in self.services:
+            state = "STOPPED" if args[1] == "stop" else "RUNNING"
+            self.services[args[2]] = (state, 0 if state == "STOPPED" else 4000 + len(self.commands))
+        return 0
+
+    def is_screen_locked(self) -> bool:
+        return self.locked
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                context = contextvars.copy_context()
+                self._thread = threading.Thread(
+                    target=context.run, args=(self._dispatch,), daemon=True, name="hotconsole-fake-hook"
+                )
+                self._thread.start()
+
+    def _dispatch(self):
+        while True:
+            key, emitted = self._events.get()
+            started = time.perf_counter()
+            try:
+                with self._lock:
+                    callback = self.hotkeys.get(key)
+                    text = self.abbreviations.get(key)
+                    if emitted is None:
+                        emitted = self.trigger_time(self.held.values()) or started
+                        self.held.pop(key, None)
+                if callback is not None:
+                    with Tracer.trace("hotkey", emitted, key=key):
+                        callback()
+                elif text is not None:
+                    self.typed.append(text)
+            except Exception:
+                print(traceback.format_exc())
+            finally:
+                if self.on_dispatch is not None:
+                    self.on_dispatch(key, emitted, started, time.perf_counter())
+                self._events.task_done()
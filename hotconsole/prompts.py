@@ -0,0 +1,272 @@
+"""
+Модуль с очередью вопросов пользователю - чтобы команды из разных потоков не спрашивали одновременно
+
+Classes
+-------
+PromptTimeoutError
+    Ошибка: пользователь не ответил за отведенное время, а ответа по умолчанию нет
+Prompt
+    Датакласс с одним вопросом: текст, ограничение по времени, ответ по умолчанию
+PromptBroker
+    Очередь вопросов и единственный поток, который выводит их и читает ответы из консоли
+"""
+
+import builtins
+import contextlib
+import contextvars
+import queue
+import threading
+import time
+from concurrent import futures
+from dataclasses import dataclass, field
+from typing import Callable
+
+from hotconsole.cancellation import CancellationToken, CommandTimeoutError
+
+
+class PromptTimeoutError(CommandTimeoutError):
+    """Пользователь не ответил за отведенное время, а ответа по умолчанию у вопроса нет"""
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self.stopped = True
+        Exception.__init__(self, f"Ответ не получен за {timeout:g} с")
+
+
+@dataclass
+class Prompt:
+    """Вопрос в очереди
+
+    Parameters
+    ----------
+    message: str
+        Текст, который выводится перед вводом - вместе со списком опций, если он есть
+    timeout: float | None
+        Сколько секунд ждать ответа с момента, как вопрос появился в консоли. None - без ограничения
+    default: str | None
+        Ответ, если время вышло. None - тогда команда получит PromptTimeoutError
+    background: bool
+        Фоновый вопрос (ввод консольной команды) уступает консоль любому другому вопросу
+    owner: int
+        Поток, который задал вопрос
+    is_grant: bool
+        Это не вопрос, а запрос потока на владение консолью (PromptBroker.session)
+    """
+
+    message: str = ""
+    timeout: float | None = None
+    default: str | None = None
+    background: bool = False
+    owner: int = field(default_factory=threading.get_ident)
+    is_grant: bool = False
+    future: futures.Future = field(default_factory=futures.Future, repr=False)
+
+
+class PromptBroker:
+    """Все вопросы пользователю проходят через одну очередь: консоль в каждый момент принадлежит одному вопросу,
+    а остальные ждут своей очереди. Вопросы выводит и ответы читает отдельный поток, поэтому вопрос с timeout
+    не держит поток команды дольше положенного, а брошенный вопрос не забирает ответ на следующий.
+    Несколько вопросов подряд (например, постраничный выбор опции) объединяются через session()
+
+    Parameters
+    ----------
+    reader: Callable[[str], str] | None
+        Чтение строки из консоли. По умолчанию - встроенный input
+    """
+
+    command_timeout: contextvars.ContextVar[float | None] = contextvars.ContextVar("prompt_timeout", default=None)
+
+    _shared: "PromptBroker | None" = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, reader: Callable[[str], str] | None = None):
+        self.reader = reader
+        self.answered = 0
+        self.timed_out = 0
+        self.abandoned = 0
+        self._queue: list[Prompt] = []
+        self._condition = threading.Condition()
+        self._lines: queue.Queue = queue.Queue()
+        self._reading = False
+        self._owner: int | None = None
+        self._depth = 0
+        self._thread: threading.Thread | None = None
+
+    @classmethod
+    def shared(cls) -> "PromptBroker":
+        """Общая очередь вопросов приложения"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def ask(self, message: str = "", timeout: float | None = None, default: str | None = None,
+            background: bool = False) -> str:
+        """Задает вопрос и ждет ответа. Если timeout не указан, берется promptTimeout из data.json
+        для текущей команды. Отмена команды по таймауту снимает ее вопрос из очереди"""
+        return self.wait(self.submit(message, timeout, default, background))
+
+    def ask_async(self, message: str = "", timeout: float | None = None, default: str | None = None) -> futures.Future:
+        """Ставит вопрос в очередь и сразу возвращает Future с ответом - команда может работать дальше"""
+        return self.submit(message, timeout, default).future
+
+    def submit(self, message: str = "", timeout: float | None = None, default: str | None = None,
+               background: bool = False) -> Prompt:
+        if timeout is None and not background:
+            timeout = self.command_timeout.get()
+        prompt = Prompt(message, timeout, default, background)
+        self._enqueue(prompt)
+        return prompt
+
+    def wait(self, prompt: Prompt) -> str | None:
+        """Ждет ответа короткими шагами, чтобы заметить отмену команды и не блокировать Ctrl+C"""
+        token = CancellationToken.current()
+        while True:
+            try:
+                return prompt.future.result(0.1)
+            except futures.TimeoutError:
+                if token is not None and token.is_cancelled:
+                    self.withdraw(prompt)
+                    token.raise_if_cancelled()
+
+    def withdraw(self, prompt: Prompt):
+        """Снимает вопрос: из очереди он убирается, а если уже выведен - поток чтения перестает его ждать"""
+        with self._condition:
+            if prompt in self._queue:
+                self._queue.remove(prompt)
+            if not prompt.future.cancel() and prompt.is_grant and self._owner == prompt.owner and self._depth == 0:
+                self._owner = None
+            self._condition.notify_all()
+
+    @contextlib.contextmanager
+    def session(self):
+        """Консоль принадлежит текущему потоку, пока он внутри блока: вопросы других потоков ждут.
+        Внутри можно выводить опции и задавать несколько вопросов подряд"""
+        ident = threading.get_ident()
+        with self._condition:
+            nested = self._owner == ident
+        if not nested:
+            grant = Prompt(is_grant=True)
+            self._enqueue(grant)
+            self.wait(grant)
+        with self._condition:
+            self._depth += 1
+        try:
+            yield self
+        finally:
+            with self._condition:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._owner = None
+                    self._condition.notify_all()
+
+    def pending(self) -> int:
+        """Сколько вопросов ждут своей очереди"""
+        with self._condition:
+            return len(self._queue)
+
+    def _enqueue(self, prompt: Prompt):
+        with self._condition:
+            self._queue.append(prompt)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, daemon=True, name="hotconsole-prompts")
+                self._thread.start()
+            self._condition.notify_all()
+
+    def _next(self) -> Prompt | None:
+        """Первый вопрос, который можно показать: если консолью владеет поток - только его вопросы"""
+        self._queue = [prompt for prompt in self._queue if not prompt.future.done()]
+        for index, prompt in enumerate(self._queue):
+            if self._owner is None or prompt.owner == self._owner:
+                return self._queue.pop(index)
+        return None
+
+    def _loop(self):
+        while True:
+            with self._condition:
+                prompt = self._next()
+                while prompt is None:
+                    self._condition.wait()
+                    prompt = self._next()
+                if prompt.is_grant:
+                    self._owner = prompt.owner
+                    if not self._resolve(prompt, None):
+                        self._owner = None
+                    continue
+            self._serve(prompt)
+
+    def _serve(self, prompt: Prompt):
+        deadline = None if prompt.timeout is None else time.monotonic() + prompt.timeout
+        self._drain()
+        self._read(prompt.message)
+        while not prompt.future.done():
+            remaining = 0.1 if deadline is None else min(deadline - time.monotonic(), 0.1)
+            if remaining <= 0:
+                self._expire(prompt)
+                return
+            try:
+                line = self._lines.get(timeout=remaining)
+            except queue.Empty:
+                if prompt.background and self._has_foreground():
+                    with self._condition:
+                        self._queue.append(prompt)
+                    return
+                continue
+            if isinstance(line, BaseException):
+                self._resolve(prompt, error=line)
+                return
+            if self._resolve(prompt, line):
+                self.answered += 1
+            return
+        self.abandoned += 1
+
+    def _expire(self, prompt: Prompt):
+        self.timed_out += 1
+        if prompt.default is None:
+            print("\nВремя на ответ вышло")
+            self._resolve(prompt, error=PromptTimeoutError(prompt.timeout))
+        else:
+            print(f"\nВремя на ответ вышло, выбрано: {prompt.default or 'пустой ответ'}")
+            self._resolve(prompt, prompt.default)
+
+    def _has_foreground(self) -> bool:
+        with self._condition:
+            return any(
+                not prompt.background and (self._owner is None or prompt.owner == self._owner)
+                for prompt in self._queue
+            )
+
+    def _read(self, message: str):
+        """Если прошлый input еще ждет строку (его вопрос брошен), новый не запускается - выводится только текст"""
+        if self._reading:
+            print(message, end="", flush=True)
+            return
+        self._reading = True
+        threading.Thread(target=self._read_line, args=(message,), daemon=True, name="hotconsole-input").start()
+
+    def _read_line(self, message: str):
+        try:
+            line = (self.reader or builtins.input)(message)
+        except BaseException as e:
+            line = e
+        self._reading = False
+        self._lines.put(line)
+
+    def _drain(self):
+        """Строки, набранные, пока никто не спрашивал, - ответы на брошенные вопросы"""
+        while True:
+            try:
+                self._lines.get_nowait()
+            except queue.Empty:
+                return
+
+    @staticmethod
+    def _resolve(prompt: Prompt, result: str | None = None, error: BaseException | None = None) -> bool:
+        try:
+            if error is not None:
+                prompt.future.set_exception(error)
+            else:
+                prompt.future.set_result(result)
+            return True
+        except futures.InvalidStateError:
+            return False
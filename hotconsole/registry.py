@@ -0,0 +1,159 @@
+"""
+Модуль с ленивым объявлением команд - модуль с реализацией импортируется только при первом выполнении
+
+Classes
+-------
+LazyCallable
+    Функция по адресу "модуль:функция", которая импортируется при первом вызове
+CommandRegistry
+    Команды и горячие клавиши из манифеста commands.json или точек входа пакетов - без импорта реализаций
+"""
+
+import importlib
+import importlib.metadata
+import json
+import os
+import sys
+import threading
+
+from hotconsole.hotconsole import Command, Hotkey, get_scripts_path
+from hotconsole.options import OptionsProvider
+
+
+class LazyCallable:
+    """Функция, объявленная адресом "модуль:функция" (или "модуль:Класс.метод").
+    Модуль импортируется при первом вызове, а найденная функция запоминается.
+    Объект можно передать в отдельный процесс: там модуль импортируется заново
+
+    Parameters
+    ----------
+    path: str
+        Адрес функции, например "commands.services:turn_service"
+    folder: str | None
+        Папка, из которой импортируется модуль. В хосте у каждого приложения она своя
+    """
+
+    _import_lock = threading.RLock()
+
+    def __init__(self, path: str, folder: str | None = None):
+        module, separator, function = path.partition(":")
+        if separator == "" or module == "" or function == "":
+            raise ValueError(f'Адрес команды должен быть в виде "модуль:функция": {path}')
+        self.path = path
+        self.folder = folder
+        self.__module__ = module
+        self.__name__ = function.rpartition(".")[2]
+        self._function = function
+        self._target = None
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._target is not None
+
+    def resolve(self):
+        """Импортирует модуль и возвращает функцию. Повторные вызовы берут ее из памяти"""
+        if self._target is None:
+            with self._import_lock:
+                if self._target is None:
+                    target = self._import()
+                    for name in self._function.split("."):
+                        target = getattr(target, name)
+                    self._target = target
+        return self._target
+
+    def __call__(self, *args, **kwargs):
+        return self.resolve()(*args, **kwargs)
+
+    def __reduce__(self):
+        return LazyCallable, (self.path, self.folder)
+
+    def __repr__(self):
+        return f"LazyCallable({self.path!r})"
+
+    def _import(self):
+        """Модуль ищется сначала в folder. Если одноименный модуль уже загружен из другой папки
+        (другое приложение в хосте), импортируется свой. Чужой модуль возвращается в sys.modules,
+        только если свой не импортировался - иначе повторные импорты и перезагрузка нашли бы чужой"""
+        if self.folder is None:
+            return importlib.import_module(self.__module__)
+        top = self.__module__.partition(".")[0]
+        loaded = sys.modules.get(top)
+        others = {}
+        if loaded is not None and not self._is_inside(loaded):
+            others = {name: sys.modules.pop(name) for name in list(sys.modules) if name.partition(".")[0] == top}
+        sys.path.insert(0, self.folder)
+        try:
+            return importlib.import_module(self.__module__)
+        finally:
+            sys.path.remove(self.folder)
+            for name, module in others.items():
+                sys.modules.setdefault(name, module)
+
+    def _is_inside(self, module) -> bool:
+        path = getattr(module, "__file__", None)
+        return path is None or os.path.abspath(path).startswith(os.path.abspath(self.folder) + os.sep)
+
+
+class CommandRegistry:
+    """Реестр команд, объявленных без импорта: название, описание и адрес функции.
+    Списки горячих клавиш и команд выводятся без импорта модулей, а модуль команды
+    импортируется при ее первом выполнении. Так запуск приложения со 100 командами не ждет тяжелых библиотек
+
+    Parameters
+    ----------
+    folder: str | None
+        Папка со скриптами, из которой импортируются модули команд. По умолчанию - папка текущего приложения
+
+    Attributes
+    ----------
+    commands: dict[str, Command]
+        Команды по названию
+    hotkeys: list[Hotkey]
+        Горячие клавиши из манифеста - их можно передать в Runner.run
+    """
+
+    def __init__(self, folder: str | None = None):
+        self.folder = folder or get_scripts_path()
+        self.commands: dict[str, Command] = {}
+        self.hotkeys: list[Hotkey] = []
+
+    def declare(
+            self,
+            name: str,
+            description: str,
+            execute: str,
+            options: list | str | None = None,
+            hotkeys: dict[str, int | list[int] | None] | None = None,
+            **fields,
+    ) -> Command:
+        """Объявляет команду. options - список опций или адрес функции, которая вернет их при вопросе.
+        hotkeys - горячие клавиши команды: клавиша -> номер опции или None.
+        warmup можно передать адресом функции - ее модуль импортируется только при прогреве.
+        Остальные поля (timeout, isolated, multi_options...) передаются в Command как есть"""
+        if isinstance(options, str):
+            options = OptionsProvider(LazyCallable(options, self.folder))
+        if isinstance(fields.get("warmup"), str):
+            fields["warmup"] = LazyCallable(fields["warmup"], self.folder)
+        command = Command(name, description, LazyCallable(execute, self.folder), options or [], **fields)
+        self.commands[name] = command
+        for key, option_number in (hotkeys or {}).items():
+            self.hotkeys.append(Hotkey(key, command, option_number))
+        return command
+
+    def load_manifest(self, path: str = "commands.json") -> "CommandRegistry":
+        """Объявляет команды из JSON-манифеста: массив объектов с полями declare.
+        Относительный путь считается от папки со скриптами"""
+        with open(os.path.join(self.folder, path), "r", encoding="utf-8") as file:
+            for entry in json.loads(file.read()):
+                self.declare(**entry)
+        return self
+
+    def load_entry_points(
+            self, group: str = "hotconsole.commands", descriptions: dict[str, str] | None = None
+    ) -> "CommandRegistry":
+        """Объявляет команды из точек входа установленных пакетов: название точки - название команды,
+        значение - адрес функции. Описание берется из descriptions, а если его там нет - название команды"""
+        descriptions = descriptions or {}
+        for entry_point in importlib.metadata.entry_points(group=group):
+            self.declare(entry_point.name, descriptions.get(entry_point.name, entry_point.name), entry_point.value)
+        return self
@@ -0,0 +1,131 @@
+"""
+Модуль для перезагрузки модулей с командами без перезапуска приложения
+
+Classes
+-------
+CommandReloader
+    Следит за файлами модулей из папки со скриптами, перезагружает измененные и пересобирает таблицу команд
+"""
+
+import dataclasses
+import importlib
+import os
+import sys
+import threading
+import traceback
+from typing import Callable
+
+
+class CommandReloader:
+    """Раз в interval секунд сверяет время изменения файлов модулей из папки со скриптами.
+    Если какой-то файл изменился, перезагружает его, а затем все модули с командами,
+    чтобы импорты вида from helpers import func тоже обновились. main.py не перезагружается.
+    Модуль, который появился после прошлой проверки (например, ленивая команда из реестра выполнилась впервые),
+    только запоминается - он и так свежий
+
+    Parameters
+    ----------
+    folder: str
+        Папка со скриптами - отслеживаются только модули из нее
+    interval: float
+        Как часто проверять файлы, в секундах
+    """
+
+    def __init__(self, folder: str, interval: float = 0.5):
+        self.folder = os.path.abspath(folder)
+        self.interval = interval
+        self._mtimes: dict[str, int] = {}
+        self._stopped = threading.Event()
+
+    def watch(self, commands: dict[str, object], on_reload: Callable[[dict[str, object]], None]):
+        """Запускает фоновый поток. После перезагрузки on_reload получает новую таблицу команд"""
+        self._mtimes = self._scan()
+
+        def loop():
+            current = commands
+            while not self._stopped.wait(self.interval):
+                reloaded = self.check(current)
+                if reloaded is not None:
+                    current = reloaded
+                    on_reload(current)
+
+        threading.Thread(target=loop, daemon=True, name="hotconsole-reload").start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def check(self, commands: dict[str, object]) -> dict[str, object] | None:
+        """Перезагружает измененные модули и возвращает новую таблицу команд.
+        None - если ничего не изменилось или модуль не удалось перезагрузить (тогда остаются старые команды)"""
+        mtimes = self._scan()
+        changed = sorted(
+            name for name, mtime in mtimes.items() if name in self._mtimes and self._mtimes[name] != mtime
+        )
+        self._mtimes = mtimes
+        if len(changed) == 0:
+            return None
+        command_modules = sorted({self._module_name(command) for command in commands.values()} & set(mtimes))
+        names = [name for name in changed if name not in command_modules] + command_modules
+        folders = self._import_folders(commands)
+        sys.path[:0] = folders
+        try:
+            for name in names:
+                importlib.reload(sys.modules[name])
+        except Exception:
+            print(traceback.format_exc())
+            print(f"Не удалось перезагрузить {', '.join(changed)}, команды остались прежними\n")
+            return None
+        finally:
+            for folder in folders:
+                sys.path.remove(folder)
+        return self.rebuild(commands, set(names))
+
+    def rebuild(self, commands: dict[str, object], reloaded: set[str]) -> dict[str, object]:
+        """Новая таблица команд: команда из перезагруженного модуля ищется в нем по названию,
+        а если она объявлена в другом месте (например, в main.py) - в ней заменяется только функция.
+        Ленивая функция из реестра пересоздается по своему адресу и найдет новую версию при вызове"""
+        rebuilt = {}
+        for name, command in commands.items():
+            module_name = self._module_name(command)
+            if module_name not in reloaded:
+                rebuilt[name] = command
+                continue
+            module = sys.modules[module_name]
+            declared = [
+                value for value in vars(module).values() if isinstance(value, type(command)) and value.name == command.name
+            ]
+            if len(declared) != 0:
+                rebuilt[name] = declared[0]
+                continue
+            if getattr(command.execute, "folder", None) is not None:
+                lazy_type, args = command.execute.__reduce__()
+                rebuilt[name] = dataclasses.replace(command, execute=lazy_type(*args))
+                continue
+            execute = getattr(module, command.execute.__name__, command.execute)
+            rebuilt[name] = dataclasses.replace(command, execute=execute)
+        return rebuilt
+
+    def _scan(self) -> dict[str, int]:
+        """Время изменения файлов всех загруженных модулей из папки со скриптами"""
+        mtimes = {}
+        for name, module in list(sys.modules.items()):
+            path = getattr(module, "__file__", None)
+            if name == "__main__" or path is None or not os.path.abspath(path).startswith(self.folder + os.sep):
+                continue
+            if "site-packages" in path:
+                continue
+            try:
+                mtimes[name] = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+        return mtimes
+
+    @staticmethod
+    def _import_folders(commands: dict[str, object]) -> list[str]:
+        """Папки ленивых команд: модули из них импортировались без папки в sys.path, а перезагрузка ищет их там"""
+        folders = {getattr(command.execute, "folder", None) for command in commands.values()}
+        return sorted(folder for folder in folders - {None} if folder not in sys.path)
+
+    @staticmethod
+    def _module_name(command) -> str | None:
+        return getattr(command.execute, "__module__", None)
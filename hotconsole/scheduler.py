@@ -0,0 +1,298 @@
+"""
+Модуль с планировщиком - выполняет команды по расписанию внутри уже запущенного приложения
+
+Classes
+-------
+IntervalTrigger
+    Запуск каждые N секунд
+CronTrigger
+    Запуск по расписанию в формате cron: минуты, часы, дни месяца, месяцы, дни недели
+OnceTrigger
+    Однократный запуск через N секунд или в указанное время
+Job
+    Датакласс с командой, ее расписанием и состоянием
+Scheduler
+    Один поток-таймер на все задачи: куча по времени следующего запуска
+"""
+
+import datetime
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable
+
+
+@dataclass
+class IntervalTrigger:
+    """Запуск каждые seconds секунд. Первый запуск - через seconds после прошлого, даже если он был до перезапуска"""
+
+    seconds: float
+
+    def next_run(self, now: datetime.datetime, last_run: datetime.datetime | None) -> datetime.datetime | None:
+        if last_run is None:
+            return now + datetime.timedelta(seconds=self.seconds)
+        return max(now, last_run + datetime.timedelta(seconds=self.seconds))
+
+    def __str__(self):
+        return f"каждые {self.seconds:g} с"
+
+
+@dataclass
+class CronTrigger:
+    """Расписание cron из пяти полей: минута, час, день месяца, месяц, день недели (0 и 7 - воскресенье).
+    Поддерживаются *, списки через запятую, диапазоны через дефис и шаг через /: "*/15 9-18 * * 1-5"
+    """
+
+    expression: str
+    _fields: list[set[int]] = field(init=False, repr=False)
+    _any_day: bool = field(init=False, repr=False)
+    _any_weekday: bool = field(init=False, repr=False)
+
+    _RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+    def __post_init__(self):
+        parts = self.expression.split()
+        if len(parts) != 5:
+            raise ValueError(f"В расписании cron должно быть 5 полей: {self.expression}")
+        self._fields = [self._parse(part, low, high) for part, (low, high) in zip(parts, self._RANGES)]
+        if 7 in self._fields[4]:
+            self._fields[4] = (self._fields[4] - {7}) | {0}
+        self._any_day = parts[2] == "*"
+        self._any_weekday = parts[4] == "*"
+
+    @staticmethod
+    def _parse(part: str, low: int, high: int) -> set[int]:
+        values = set()
+        for item in part.split(","):
+            item_range, _, step = item.partition("/")
+            if item_range == "*":
+                start, end = low, high
+            elif "-" in item_range:
+                start, end = map(int, item_range.split("-"))
+            else:
+                start = end = int(item_range)
+                if step != "":
+                    end = high
+            if start < low or end > high or start > end:
+                raise ValueError(f"Значение {item} вне диапазона {low}-{high}")
+            values.update(range(start, end + 1, int(step) if step != "" else 1))
+        return values
+
+    def matches_day(self, moment: datetime.datetime) -> bool:
+        """Как в cron: если заданы и день месяца, и день недели - подходит любой из них"""
+        day = moment.day in self._fields[2]
+        weekday = (moment.weekday() + 1) % 7 in self._fields[4]
+        if self._any_day or self._any_weekday:
+            return day and weekday
+        return day or weekday
+
+    def next_run(self, now: datetime.datetime, last_run: datetime.datetime | None) -> datetime.datetime | None:
+        minutes, hours, _, months, _ = self._fields
+        moment = now.replace(second=0, microsecond=0) + datetime.timedelta(minutes=1)
+        limit = now + datetime.timedelta(days=366 * 5)
+        while moment <= limit:
+            if moment.month not in months:
+                moment = (moment.replace(day=1) + datetime.timedelta(days=32)).replace(day=1, hour=0, minute=0)
+            elif not self.matches_day(moment):
+                moment = (moment + datetime.timedelta(days=1)).replace(hour=0, minute=0)
+            elif moment.hour not in hours:
+                moment = (moment + datetime.timedelta(hours=1)).replace(minute=0)
+            elif moment.minute not in minutes:
+                moment += datetime.timedelta(minutes=1)
+            else:
+                return moment
+        return None
+
+    def __str__(self):
+        return f"cron {self.expression}"
+
+
+@dataclass
+class OnceTrigger:
+    """Однократный запуск: через delay секунд после старта или в момент at. Если запуск уже был - больше не нужен"""
+
+    delay: float = 0
+    at: datetime.datetime | None = None
+
+    def next_run(self, now: datetime.datetime, last_run: datetime.datetime | None) -> datetime.datetime | None:
+        if last_run is not None:
+            return None
+        if self.at is not None:
+            return max(now, self.at)
+        return now + datetime.timedelta(seconds=self.delay)
+
+    def __str__(self):
+        return f"однократно {self.at:%d.%m %H:%M}" if self.at is not None else f"однократно через {self.delay:g} с"
+
+
+@dataclass
+class Job:
+    """Задача планировщика
+
+    Parameters
+    ----------
+    command: Command
+        Команда, которая выполняется через Executor
+    trigger: IntervalTrigger | CronTrigger | OnceTrigger
+        Расписание
+    option_number: int | None
+        Номер опции. У команды с опциями он обязателен - спросить его у пользователя некому
+    name: str
+        Название задачи. По умолчанию - название команды
+    app: str
+        Приложение, которому принадлежит задача (в хосте - папка приложения). Вместе с name дает key
+    """
+
+    command: object
+    trigger: IntervalTrigger | CronTrigger | OnceTrigger
+    option_number: int | None = None
+    name: str = ""
+    app: str = ""
+    next_run: datetime.datetime | None = None
+    last_run: datetime.datetime | None = None
+    last_outcome: str = ""
+    last_duration: float = 0.0
+    runs: int = 0
+    skipped: int = 0
+    running: bool = False
+
+    def __post_init__(self):
+        if self.name == "":
+            self.name = self.command.name
+
+    @property
+    def key(self) -> str:
+        """По нему хранится задача и время ее последнего запуска, поэтому одноименные задачи
+        разных приложений хоста не мешают друг другу"""
+        return f"{self.app}:{self.name}" if self.app != "" else self.name
+
+
+class Scheduler:
+    """Планировщик команд. Один поток ждет ближайшую задачу по куче, а сами команды выполняются
+    в небольшом пуле, чтобы долгая команда не задерживала остальные. Задача не запускается повторно,
+    пока не закончился ее прошлый запуск - такой запуск пропускается. Время последних запусков
+    сохраняется в файл и учитывается после перезапуска приложения
+
+    Parameters
+    ----------
+    execute: Callable
+        Как выполнить команду: execute(command, option_number) -> результат для журнала (success, error, ...)
+    state_path: str
+        Файл с временем последних запусков
+    workers: int
+        Сколько задач может выполняться одновременно
+    """
+
+    def __init__(self, execute: Callable, state_path: str, workers: int = 2):
+        self.execute = execute
+        self.state_path = state_path
+        self.jobs: dict[str, Job] = {}
+        self._heap: list[tuple[float, int, Job]] = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._pool = ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="hotconsole-job")
+        self._thread: threading.Thread | None = None
+        self._stopped = False
+
+    def add(self, job: Job) -> Job:
+        if job.command.has_options() and job.option_number is None:
+            raise ValueError(f"Для задачи {job.name} нужно указать номер опции")
+        with self._condition:
+            self.jobs[job.key] = job
+            if self._thread is not None:
+                self._schedule(job, datetime.datetime.now(), job.last_run)
+                self._condition.notify()
+        return job
+
+    def start(self):
+        """Загружает время прошлых запусков и запускает поток-таймер"""
+        state = self.load_state()
+        now = datetime.datetime.now()
+        with self._condition:
+            for job in self.jobs.values():
+                if job.key in state:
+                    job.last_run = datetime.datetime.fromisoformat(state[job.key])
+                self._schedule(job, now, job.last_run)
+        self._thread = threading.Thread(target=self._loop, daemon=True, name="hotconsole-scheduler")
+        self._thread.start()
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        self._pool.shutdown(wait=False)
+
+    def _schedule(self, job: Job, now: datetime.datetime, last_run: datetime.datetime | None):
+        job.next_run = job.trigger.next_run(now, last_run)
+        if job.next_run is not None:
+            heapq.heappush(self._heap, (job.next_run.timestamp(), next(self._counter), job))
+
+    def _loop(self):
+        with self._condition:
+            while not self._stopped:
+                if len(self._heap) == 0:
+                    self._condition.wait()
+                    continue
+                delay = self._heap[0][0] - time.time()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+                _, _, job = heapq.heappop(self._heap)
+                if self.jobs.get(job.key) is not job:
+                    continue
+                now = datetime.datetime.now()
+                if job.running:
+                    job.skipped += 1
+                else:
+                    job.running = True
+                    job.last_run = now
+                    self._pool.submit(self._run, job)
+                self._schedule(job, now, now)
+
+    def _run(self, job: Job):
+        start = time.monotonic()
+        try:
+            job.last_outcome = self.execute(job.command, job.option_number) or "success"
+        except Exception:
+            print(traceback.format_exc())
+            job.last_outcome = "exception"
+        finally:
+            job.last_duration = time.monotonic() - start
+            job.runs += 1
+            job.running = False
+            self.save_state()
+
+    def load_state(self) -> dict[str, str]:
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as file:
+                return json.loads(file.read())
+        except (OSError, ValueError):
+            return {}
+
+    def save_state(self):
+        with self._condition:
+            state = {job.key: job.last_run.isoformat() for job in self.jobs.values() if job.last_run is not None}
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        with open(self.state_path, "w", encoding="utf-8") as file:
+            file.write(json.dumps(state, indent=4, ensure_ascii=False))
+
+    def format_jobs(self) -> list[str]:
+        """Строки для консольной команды jobs"""
+        table_style = "{0:<12} \t{1:<24} \t{2:<16} \t{3:<16} \t{4}"
+        lines = [table_style.format("Задача", "Расписание", "Прошлый запуск", "Следующий", "Статус")]
+        for job in self.jobs.values():
+            last_run = f"{job.last_run:%d.%m %H:%M:%S}" if job.last_run is not None else "-"
+            next_run = f"{job.next_run:%d.%m %H:%M:%S}" if job.next_run is not None else "-"
+            status = "выполняется" if job.running else job.last_outcome or "ждет"
+            if job.last_outcome != "":
+                status += f" за {job.last_duration:.1f} с"
+            if job.skipped != 0:
+                status += f", пропущено наложений: {job.skipped}"
+            lines.append(table_style.format(job.name, str(job.trigger), last_run, next_run, status))
+        return lines
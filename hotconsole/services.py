@@ -0,0 +1,211 @@
+"""
+Модуль для отслеживания состояния служб Windows
+
+Classes
+-------
+ServiceState(Enum)
+    Состояние службы
+ServiceStatus
+    Датакласс с состоянием одной службы: состояние, PID, время последнего изменения
+ServiceMonitor
+    Фоновый опрос состояния всех служб одним вызовом sc queryex и общий кэш этих состояний
+
+Functions
+---------
+query_services
+    Источник данных по умолчанию - одна перечисляющая команда sc queryex для всех служб
+parse_sc_output
+    Разбирает вывод sc queryex
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import Callable
+
+from hotconsole.platform import Platform
+
+
+class ServiceState(Enum):
+    """Состояние службы"""
+
+    STOPPED = 1
+    RUNNING = 2
+
+
+@dataclass(frozen=True)
+class ServiceStatus:
+    """Состояние службы в кэше монитора
+
+    Parameters
+    ----------
+    name: str
+        Имя службы
+    raw_state: str
+        Состояние из вывода sc: RUNNING, STOPPED, START_PENDING и т.д.
+    pid: int
+        PID процесса службы, 0 - если она не запущена
+    changed_at: float
+        Когда монитор заметил последнее изменение (time.monotonic)
+    """
+
+    name: str
+    raw_state: str
+    pid: int
+    changed_at: float
+
+    @property
+    def state(self) -> ServiceState | None:
+        """Состояние для ServiceState. None - для промежуточных состояний (запускается, останавливается)"""
+        return ServiceState.__members__.get(self.raw_state)
+
+
+def parse_sc_output(output: str) -> dict[str, tuple[str, int]]:
+    """Имя службы -> (состояние, PID) из вывода sc queryex. Названия полей у sc не переводятся"""
+    services: dict[str, tuple[str, int]] = {}
+    name = None
+    state = ""
+    for line in output.splitlines():
+        key, _, value = line.partition(":")
+        key = key.strip().upper()
+        value = value.strip()
+        if key == "SERVICE_NAME":
+            name = value
+            state = ""
+        elif key == "STATE" and name is not None:
+            state = value.split()[-1] if value != "" else ""
+        elif key == "PID" and name is not None:
+            services[name] = (state, int(value) if value.isdigit() else 0)
+    return services
+
+
+def query_services() -> dict[str, tuple[str, int]]:
+    """Состояние всех служб за один запуск sc"""
+    return parse_sc_output(Platform.current().run(["sc", "queryex", "type=", "service", "state=", "all"]))
+
+
+class ServiceMonitor:
+    """Опрашивает состояние всех служб одним вызовом источника и хранит результат в памяти.
+    Пока никто не ждет изменений, интервал опроса растет до max_interval, а когда команда ждет
+    запуска или остановки службы - опрос идет каждые min_interval секунд.
+    Ожидание построено на событии: команда просыпается сразу после опроса, в котором состояние изменилось
+
+    Parameters
+    ----------
+    source: Callable[[], dict[str, tuple[str, int]]]
+        Источник данных: имя службы -> (состояние, PID). По умолчанию - sc queryex. В тестах - таблица в памяти
+    min_interval: float
+        Интервал опроса, пока кто-то ждет изменения состояния
+    max_interval: float
+        Самый долгий интервал опроса в простое
+    """
+
+    _shared: "ServiceMonitor | None" = None
+    _shared_lock = threading.Lock()
+
+    def __init__(
+            self,
+            source: Callable[[], dict[str, tuple[str, int]]] = query_services,
+            min_interval: float = 0.5,
+            max_interval: float = 10,
+    ):
+        self.source = source
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.refreshed_at: float | None = None
+        self._statuses: dict[str, ServiceStatus] = {}
+        self._condition = threading.Condition()
+        self._refresh_lock = threading.Lock()
+        self._waiters = 0
+        self._interval = min_interval
+        self._thread: threading.Thread | None = None
+
+    @classmethod
+    def shared(cls) -> "ServiceMonitor":
+        """Общий монитор приложения, с которым работает OSHelper"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def refresh(self):
+        """Опрашивает источник и будит всех, кто ждет изменения состояния"""
+        with self._refresh_lock:
+            table = self.source()
+            now = time.monotonic()
+            changed = False
+            statuses = {}
+            for name, (raw_state, pid) in table.items():
+                old = self._statuses.get(name.lower())
+                if old is not None and (old.raw_state, old.pid) == (raw_state, pid):
+                    statuses[name.lower()] = old
+                else:
+                    statuses[name.lower()] = ServiceStatus(name, raw_state, pid, now)
+                    changed = changed or old is not None
+            with self._condition:
+                self._statuses = statuses
+                self.refreshed_at = now
+                self._interval = self.min_interval if changed else min(self._interval * 2, self.max_interval)
+                self._condition.notify_all()
+
+    def status(self, service: str, max_age: float | None = None) -> ServiceStatus | None:
+        """Состояние службы из кэша. Если кэш старше max_age секунд - сначала опрашивает источник.
+        None - если такой службы нет"""
+        if self.refreshed_at is None or (max_age is not None and time.monotonic() - self.refreshed_at > max_age):
+            self.refresh()
+        self.start()
+        return self._statuses.get(service.lower())
+
+    def statuses(self) -> list[ServiceStatus]:
+        """Все службы из последнего опроса"""
+        if self.refreshed_at is None:
+            self.refresh()
+        return list(self._statuses.values())
+
+    def has_state(self, service: str, target_state: ServiceState, max_age: float | None = None) -> bool:
+        status = self.status(service, max_age)
+        if status is None:
+            raise ValueError(f"Служба {service} не найдена")
+        return status.state == target_state
+
+    def wait_for(self, service: str, target_state: ServiceState, timeout: float) -> bool:
+        """Ждет, пока служба перейдет в состояние target_state. False - если не дождались за timeout секунд"""
+        deadline = time.monotonic() + timeout
+        self.start()
+        with self._condition:
+            self._waiters += 1
+            self._interval = self.min_interval
+            self._condition.notify_all()
+            try:
+                while True:
+                    status = self._statuses.get(service.lower())
+                    if status is not None and status.state == target_state:
+                        return True
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    self._condition.wait(remaining)
+            finally:
+                self._waiters -= 1
+
+    def start(self):
+        """Запускает фоновый опрос, если он еще не запущен"""
+        with self._condition:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, daemon=True, name="hotconsole-services")
+                self._thread.start()
+
+    def _loop(self):
+        while True:
+            with self._condition:
+                interval = self.min_interval if self._waiters != 0 else self._interval
+                refreshed_at = self.refreshed_at
+            if refreshed_at is None or time.monotonic() - refreshed_at >= interval:
+                try:
+                    self.refresh()
+                except Exception:
+                    time.sleep(self.max_interval)
+                continue
+            with self._condition:
+                self._condition.wait(max(refreshed_at + interval - time.monotonic(), 0.01))
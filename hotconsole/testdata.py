@@ -0,0 +1,180 @@
+"""
+Модуль для массовой генерации тестовых данных: реквизиты с валидными контрольными числами и случайные строки
+
+Classes
+-------
+DataGenerator
+    Генерирует пачки ИНН, КПП, ОГРН, ОГРНИП, СНИЛС и строк. С seed результат повторяется от запуска к запуску
+DataWriter
+    Потоково пишет записи в CSV, JSONL или таблицу SQLite
+"""
+
+import csv
+import itertools
+import json
+import operator
+import random
+import string
+from typing import Callable, Iterable, Iterator
+
+from hotconsole.helpers import DBHelper, InnGenerator
+
+
+class DataGenerator:
+    """Генератор тестовых данных. Случайные символы берутся из буфера байт за один вызов randbytes,
+    а не по одному через random.choice, поэтому миллионы значений получаются за секунды
+
+    Parameters
+    ----------
+    seed: int | None
+        Зерно генератора: с одним и тем же seed получаются одни и те же данные
+    """
+
+    _snils_weights = (9, 8, 7, 6, 5, 4, 3, 2, 1)
+    _digit_values = bytes((index - ord("0")) % 256 for index in range(256))
+    _ogrn_prefixes = "15"
+
+    def __init__(self, seed: int | None = None):
+        self.random = random.Random(seed)
+
+    def chars(self, length: int, count: int = 1, alphabet: str = string.ascii_lowercase) -> list[str]:
+        """count случайных строк длины length из символов alphabet (не больше 256 символов)"""
+        text = self._random_text(length * count, alphabet)
+        return [text[index:index + length] for index in range(0, length * count, length)]
+
+    def digits(self, length: int, count: int = 1) -> list[str]:
+        return self.chars(length, count, string.digits)
+
+    def inn_ul(self, count: int = 1) -> list[str]:
+        """ИНН юрлиц: 10 цифр, последняя - контрольная"""
+        weights = InnGenerator._control_nums_ul
+        return [inn + self._control_digit(weights, inn) for inn in self._with_region(9, count)]
+
+    def inn_fl(self, count: int = 1) -> list[str]:
+        """ИНН физлиц и ИП: 12 цифр, две последние - контрольные"""
+        first, second = InnGenerator._control_nums_fl
+        result = []
+        for inn in self._with_region(10, count):
+            inn += self._control_digit(first, inn)
+            result.append(inn + self._control_digit(second, inn))
+        return result
+
+    def kpp(self, count: int = 1) -> list[str]:
+        """КПП: код налоговой (4 цифры), причина постановки на учет (01 - по месту нахождения) и номер (3 цифры)"""
+        return [code[:4] + "01" + code[4:] for code in self._with_region(7, count)]
+
+    def ogrn(self, count: int = 1) -> list[str]:
+        """ОГРН юрлиц: 13 цифр, контрольная - остаток от деления первых 12 на 11"""
+        prefixes = self.chars(1, count, self._ogrn_prefixes)
+        return [
+            number + str(int(number) % 11 % 10)
+            for number in (prefix + body for prefix, body in zip(prefixes, self.digits(11, count)))
+        ]
+
+    def ogrnip(self, count: int = 1) -> list[str]:
+        """ОГРНИП: 15 цифр, начинается с 3, контрольная - остаток от деления первых 14 на 13"""
+        return [number + str(int(number) % 13 % 10) for number in ("3" + body for body in self.digits(13, count))]
+
+    def snils(self, count: int = 1) -> list[str]:
+        """СНИЛС: 9 цифр номера и 2 контрольные. Номера до 001-001-998 не используются, поэтому не генерируются"""
+        result = []
+        for number in self.digits(9, count):
+            if number <= "001001998":
+                number = "1" + number[1:]
+            total = self._weighted_sum(self._snils_weights, number)
+            control = total if total < 100 else total % 101 % 100
+            result.append(f"{number}{control:02d}")
+        return result
+
+    @staticmethod
+    def format_snils(snils: str) -> str:
+        """СНИЛС в виде 123-456-789 01"""
+        return f"{snils[:3]}-{snils[3:6]}-{snils[6:9]} {snils[9:]}"
+
+    def records(
+            self, count: int, schema: dict[str, Callable[[int], list]], batch_size: int = 10_000
+    ) -> Iterator[dict]:
+        """Записи по схеме "колонка - генератор пачки", например {"inn": generator.inn_ul}.
+        Генерируются пачками по batch_size, поэтому в памяти не держится весь объем"""
+        for start in range(0, count, batch_size):
+            size = min(batch_size, count - start)
+            columns = {name: generate(size) for name, generate in schema.items()}
+            for values in zip(*columns.values()):
+                yield dict(zip(columns, values))
+
+    def _with_region(self, length: int, count: int) -> list[str]:
+        """Цифры, у которых первые две (код региона) не 00"""
+        regions = self.chars(1, count, string.digits[1:])
+        return [
+            number if number[:2] != "00" else "0" + region + number[2:]
+            for number, region in zip(self.digits(length, count), regions)
+        ]
+
+    def _random_text(self, size: int, alphabet: str) -> str:
+        """Строка из size случайных символов. Байты из буфера сразу переводятся в символы через bytes.translate,
+        а байты, которые дали бы перекос в распределении, отбрасываются"""
+        if not 0 < len(alphabet) <= 256:
+            raise ValueError("В алфавите должно быть от 1 до 256 символов")
+        is_ascii = alphabet.isascii()
+        positions = [index % len(alphabet) for index in range(256)]
+        table = bytes(ord(alphabet[position]) for position in positions) if is_ascii else bytes(positions)
+        rejected = bytes(range(256 - 256 % len(alphabet), 256))
+        chunks = []
+        collected = 0
+        while collected < size:
+            missing = size - collected
+            chunk = self.random.randbytes(missing + missing // 8 + 16).translate(table, rejected)[:missing]
+            chunks.append(chunk)
+            collected += len(chunk)
+        data = b"".join(chunks)
+        return data.decode("ascii") if is_ascii else "".join(alphabet[index] for index in data)
+
+    @classmethod
+    def _control_digit(cls, weights: tuple[int, ...], digits: str) -> str:
+        """Контрольная цифра ИНН по тем же весам, что и в InnGenerator"""
+        return str(cls._weighted_sum(weights, digits) % 11 % 10)
+
+    @classmethod
+    def _weighted_sum(cls, weights: tuple[int, ...], digits: str) -> int:
+        return sum(map(operator.mul, weights, digits.encode("ascii").translate(cls._digit_values)))
+
+
+class DataWriter:
+    """Потоковая запись сгенерированных записей: файл пишется по мере генерации"""
+
+    @staticmethod
+    def to_csv(path: str, records: Iterable[dict], delimiter: str = ";") -> int:
+        """Пишет записи в CSV с заголовком. Возвращает количество записей"""
+        iterator = iter(records)
+        first = next(iterator, None)
+        if first is None:
+            return 0
+        with open(path, "w", encoding="utf-8", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=list(first), delimiter=delimiter)
+            writer.writeheader()
+            count = 0
+            for batch in DataWriter._batches(itertools.chain([first], iterator)):
+                writer.writerows(batch)
+                count += len(batch)
+        return count
+
+    @staticmethod
+    def to_jsonl(path: str, records: Iterable[dict]) -> int:
+        """Пишет записи в JSON Lines: одна запись - одна строка"""
+        count = 0
+        with open(path, "w", encoding="utf-8") as file:
+            for batch in DataWriter._batches(records):
+                file.write("".join(json.dumps(record, ensure_ascii=False) + "\n" for record in batch))
+                count += len(batch)
+        return count
+
+    @staticmethod
+    def to_sqlite(db_path: str, table: str, records: Iterable[dict], batch_size: int = 10_000) -> int:
+        """Вставляет записи в таблицу SQLite через DBHelper. Таблица создается, если ее нет"""
+        return DBHelper.insert_many(db_path, table, records, batch_size)
+
+    @staticmethod
+    def _batches(records: Iterable[dict], size: int = 10_000) -> Iterator[list[dict]]:
+        iterator = iter(records)
+        while batch := list(itertools.islice(iterator, size)):
+            yield batch
@@ -0,0 +1,202 @@
+"""
+Модуль с трассировкой горячих клавиш: на что уходит время от нажатия до старта команды
+
+Classes
+-------
+Span
+    Датакласс с одной стадией обработки нажатия: название, начало и конец
+Tracer
+    Собирает стадии нажатий в кольцевой буфер, выгружает их в формате Chrome trace и считает перцентили
+
+Functions
+---------
+percentile
+    Перцентиль методом ближайшего ранга
+
+Constants
+---------
+STAGES
+    Стадии обработки нажатия в порядке выполнения - в этом порядке они выводятся в сводке
+"""
+
+import collections
+import contextlib
+import contextvars
+import itertools
+import json
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+
+STAGES = [
+    "hook", "host_queue", "stash_state", "config", "options", "switch_to_script_window", "switch_to_window", "command"
+]
+
+
+def percentile(values: list[float], percent: float) -> float:
+    """Перцентиль методом ближайшего ранга. Для пустого списка - 0"""
+    if len(values) == 0:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered), math.ceil(percent / 100 * len(ordered))) - 1)
+    return ordered[index]
+
+
+@dataclass(slots=True)
+class Span:
+    """Стадия обработки нажатия. Время - по time.perf_counter, в секундах
+
+    Parameters
+    ----------
+    trace_id: int
+        Номер нажатия: у всех стадий одного нажатия он общий
+    name: str
+        Название стадии, например stash_state или command
+    start: float
+        Начало стадии
+    end: float
+        Конец стадии
+    thread: int
+        Поток, в котором выполнялась стадия
+    args: dict
+        Подробности для просмотра в Chrome, например название команды
+    """
+
+    trace_id: int
+    name: str
+    start: float
+    end: float
+    thread: int = 0
+    args: dict = field(default_factory=dict)
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+class Tracer:
+    """Трассировка нажатий. Платформа начинает трассу в обработчике горячей клавиши от времени события клавиатуры,
+    а Executor и хелперы отмечают свои стадии. Стадии вне трассы (консольный режим, расписание) не записываются.
+    Хранятся последние 20000 стадий - запись стоит два вызова perf_counter, поэтому трассировка включена всегда"""
+
+    _spans: collections.deque[Span] = collections.deque(maxlen=20000)
+    _ids = itertools.count(1)
+    _trace: contextvars.ContextVar[int | None] = contextvars.ContextVar("trace", default=None)
+    _lock = threading.Lock()
+
+    @classmethod
+    @contextlib.contextmanager
+    def trace(cls, name: str = "hotkey", started: float | None = None, **args):
+        """Трасса одного нажатия - стадия name от события клавиатуры до выхода из обработчика.
+        started - время события по perf_counter: от него до входа в обработчик записывается стадия hook"""
+        trace_id = next(cls._ids)
+        entered = time.perf_counter()
+        token = cls._trace.set(trace_id)
+        try:
+            yield trace_id
+        finally:
+            cls._trace.reset(token)
+            thread = threading.get_ident()
+            begin = entered if started is None else min(started, entered)
+            cls._append(Span(trace_id, name, begin, time.perf_counter(), thread, args))
+            if started is not None:
+                cls._append(Span(trace_id, "hook", begin, entered, thread))
+
+    @classmethod
+    @contextlib.contextmanager
+    def span(cls, name: str, **args):
+        """Стадия текущей трассы. Вне трассы ничего не записывает"""
+        trace_id = cls._trace.get()
+        if trace_id is None:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            cls._append(Span(trace_id, name, start, time.perf_counter(), threading.get_ident(), args))
+
+    @classmethod
+    def record(cls, name: str, start: float, end: float, **args):
+        """Стадия с уже известными началом и концом - например, ожидание в очереди другого потока"""
+        trace_id = cls._trace.get()
+        if trace_id is not None:
+            cls._append(Span(trace_id, name, start, end, threading.get_ident(), args))
+
+    @classmethod
+    def spans(cls, last: float | None = None) -> list[Span]:
+        """Стадии, начавшиеся за последние last секунд. None - все, что есть в буфере"""
+        with cls._lock:
+            spans = list(cls._spans)
+        if last is None:
+            return spans
+        since = time.perf_counter() - last
+        return [span for span in spans if span.start >= since]
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._spans.clear()
+
+    @classmethod
+    def to_chrome(cls, last: float | None = None) -> dict:
+        """Стадии в формате Chrome trace event - файл открывается в chrome://tracing или ui.perfetto.dev"""
+        pid = os.getpid()
+        events = [
+            {
+                "name": span.name,
+                "cat": "hotconsole",
+                "ph": "X",
+                "ts": round(span.start * 1_000_000, 1),
+                "dur": round(span.duration * 1_000_000, 1),
+                "pid": pid,
+                "tid": span.thread,
+                "args": {"trace": span.trace_id, **span.args},
+            }
+            for span in cls.spans(last)
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    @classmethod
+    def export_chrome(cls, path: str, last: float | None = None) -> int:
+        """Записывает стадии за последние last секунд в файл и возвращает их число"""
+        trace = cls.to_chrome(last)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(json.dumps(trace, ensure_ascii=False))
+        return len(trace["traceEvents"])
+
+    @classmethod
+    def summary(cls, last: float | None = None) -> dict[str, list[float]]:
+        """Длительности по стадиям. Отдельно - key_to_command: от нажатия до старта команды"""
+        spans = cls.spans(last)
+        durations: dict[str, list[float]] = collections.defaultdict(list)
+        starts: dict[int, float] = {}
+        for span in spans:
+            durations[span.name].append(span.duration)
+            starts[span.trace_id] = min(span.start, starts.get(span.trace_id, span.start))
+        for span in spans:
+            if span.name == "command":
+                durations["key_to_command"].append(span.start - starts[span.trace_id])
+        order = STAGES + ["key_to_command", "hotkey"]
+        return dict(sorted(durations.items(), key=lambda item: (
+            order.index(item[0]) if item[0] in order else len(order), item[0]
+        )))
+
+    @classmethod
+    def format_summary(cls, last: float | None = None) -> list[str]:
+        """Строки сводки: число и p50/p95/p99/max каждой стадии в миллисекундах"""
+        table_style = "{0:<24} \t{1:>6} \t{2:>8} \t{3:>8} \t{4:>8} \t{5:>8}"
+        lines = [table_style.format("Стадия, мс", "Раз", "p50", "p95", "p99", "max")]
+        for name, values in cls.summary(last).items():
+            lines.append(table_style.format(
+                name, len(values), *(f"{percentile(values, percent) * 1000:.2f}" for percent in (50, 95, 99, 100))
+            ))
+        return lines
+
+    @classmethod
+    def _append(cls, span: Span):
+        with cls._lock:
+            cls._spans.append(span)
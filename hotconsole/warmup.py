@@ -0,0 +1,150 @@
+"""
+Модуль с прогревом команд: импорты, соединения и кэши готовятся в фоне, пока пользователь не нажимает клавиши
+
+Classes
+-------
+WarmupResult
+    Датакласс с итогом прогрева одной команды
+Warmup
+    Очередь прогревов с приоритетами и ограничением числа одновременных прогревов
+"""
+
+import contextlib
+import contextvars
+import itertools
+import queue
+import threading
+import time
+import traceback
+from dataclasses import dataclass
+from typing import Callable, ContextManager
+
+from hotconsole.logs import CommandLog
+
+
+@dataclass(slots=True)
+class WarmupResult:
+    """Итог прогрева команды
+
+    Parameters
+    ----------
+    name: str
+        Название команды
+    duration: float
+        Сколько секунд занял прогрев
+    error: str | None
+        Суть ошибки, если прогрев не удался. Команда все равно выполнится - просто без прогрева
+    """
+
+    name: str
+    duration: float = 0.0
+    error: str | None = None
+
+
+class Warmup:
+    """Фоновый прогрев. Прогревы выполняются по приоритету (больший - раньше) не больше чем в workers потоках.
+    Пока выполняется команда, прогревы остаются в очереди, поэтому прогрев не отнимает
+    время у горячих клавиш. Уже начатый прогрев не прерывается - долгие прогревы лучше делить на несколько команд
+
+    Parameters
+    ----------
+    workers: int
+        Сколько прогревов выполняется одновременно
+    is_busy: Callable[[], bool]
+        Выполняется ли сейчас команда. Пока да, новые прогревы не начинаются
+    pause: float
+        Как часто проверять, закончилась ли команда
+    """
+
+    def __init__(self, workers: int = 2, is_busy: Callable[[], bool] = lambda: False, pause: float = 0.05):
+        self.workers = workers
+        self.is_busy = is_busy
+        self.pause = pause
+        self.results: dict[str, WarmupResult] = {}
+        self._queue: queue.PriorityQueue = queue.PriorityQueue()
+        self._queued: set[str] = set()
+        self._order = itertools.count()
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._done = threading.Condition(self._lock)
+
+    def schedule(
+            self,
+            name: str,
+            warmup: Callable[[], None],
+            priority: int = 0,
+            scope: Callable[[], ContextManager] = contextlib.nullcontext,
+    ) -> bool:
+        """Ставит прогрев в очередь, если команда еще не прогрета и не ждет прогрева, и возвращает, поставлен ли он.
+        Прогрев выполнится в копии текущего контекста внутри scope()
+
+        Parameters
+        ----------
+        name: str
+            Название команды
+        warmup: Callable[[], None]
+            Функция прогрева
+        priority: int
+            Чем больше, тем раньше выполнится прогрев
+        scope: Callable[[], ContextManager]
+            Контекст прогрева - например, название команды для CommandHelpers.cached
+        """
+        with self._lock:
+            if name in self.results or name in self._queued:
+                return False
+            self._queued.add(name)
+            context = contextvars.copy_context()
+            self._queue.put((-priority, next(self._order), name, warmup, scope, context))
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._loop, daemon=True, name="hotconsole-warmup")
+                self._threads.append(thread)
+                thread.start()
+        return True
+
+    def reset(self):
+        """Забывает, какие команды прогреты: после освобождения памяти их надо прогревать заново"""
+        with self._lock:
+            self.results.clear()
+
+    def join(self, timeout: float | None = None) -> bool:
+        """Ждет, пока очередь опустеет. Возвращает False, если не дождался за timeout"""
+        with self._done:
+            return self._done.wait_for(lambda: len(self._queued) == 0, timeout)
+
+    def format_report(self) -> list[str]:
+        """Строки для консольной команды warm"""
+        with self._lock:
+            results = list(self.results.values())
+            waiting = len(self._queued)
+        lines = [f"Прогрето команд: {len(results)}, в очереди: {waiting}"]
+        for result in sorted(results, key=lambda result: -result.duration):
+            status = "ошибка: " + result.error if result.error is not None else "готово"
+            lines.append(f"    {result.name:<24} {result.duration:>7.2f} с    {status}")
+        return lines
+
+    def _loop(self):
+        while True:
+            item = self._queue.get()
+            if self.is_busy():
+                self._queue.put(item)
+                time.sleep(self.pause)
+                continue
+            _, _, name, warmup, scope, context = item
+            result = context.run(self._warm, name, warmup, scope)
+            with self._done:
+                self.results[name] = result
+                self._queued.discard(name)
+                self._done.notify_all()
+
+    @staticmethod
+    def _warm(name: str, warmup: Callable[[], None], scope: Callable[[], ContextManager]) -> WarmupResult:
+        result = WarmupResult(name)
+        start = time.monotonic()
+        try:
+            with scope():
+                warmup()
+        except Exception:
+            result.error = traceback.format_exc().strip().splitlines()[-1]
+        result.duration = time.monotonic() - start
+        CommandLog.info(f"Прогрев {name}", duration=round(result.duration, 3), error=result.error)
+        return result
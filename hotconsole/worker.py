@@ -0,0 +1,353 @@
+"""
+Модуль для выполнения команд в отдельном процессе, который можно принудительно остановить
+
+Дочерний процесс запускается через python -c, а не через multiprocessing, чтобы в нем повторно
+не выполнялся main.py пользователя (вместе с Runner().run). Связь с ним - через multiprocessing.connection
+
+Classes
+-------
+WorkerProcess
+    Дочерний процесс, который выполняет команды по запросу основного приложения
+WorkerPool
+    Пул заранее запущенных процессов с уже импортированными модулями команд
+RemoteTraceback
+    Traceback из дочернего процесса, который прикрепляется к ошибке как причина
+
+Functions
+---------
+main
+    Точка входа дочернего процесса
+"""
+
+import asyncio
+import contextlib
+import importlib
+import inspect
+import io
+import os
+import pickle
+import queue
+import subprocess
+import sys
+import threading
+import traceback
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Callable
+
+from hotconsole.cancellation import CommandTimeoutError
+from hotconsole.parallel import ThreadOutput
+
+BOOTSTRAP = "from hotconsole.worker import main; main()"
+
+
+class RemoteTraceback(Exception):
+    """Traceback из процесса команды, который показывается как причина ошибки"""
+
+    def __str__(self):
+        return "\n" + self.args[0]
+
+
+class WorkerProcess:
+    """Дочерний процесс для команд. Сам процесс и импорты в нем переживают несколько запусков команд
+
+    Parameters
+    ----------
+    preload: list[str]
+        Модули, которые импортируются сразу при запуске процесса
+    start_timeout: float
+        Сколько секунд ждать, пока процесс запустится и подключится
+    """
+
+    def __init__(self, preload: list[str] | None = None, start_timeout: float = 30):
+        self.preload = preload or []
+        self.start_timeout = start_timeout
+        self.executions = 0
+        self.generation = 0
+        self.process: subprocess.Popen | None = None
+        self.connection: Connection | None = None
+
+    @classmethod
+    def run_once(cls, execute: Callable, option_number, timeout: float | None, scripts_path: str):
+        """Запускает команду в новом процессе и завершает его"""
+        _check_picklable(execute)
+        worker = cls()
+        try:
+            worker.start()
+            return worker.execute(execute, option_number, timeout, scripts_path)
+        finally:
+            worker.stop()
+
+    def start(self):
+        authkey = os.urandom(16)
+        with Listener(("127.0.0.1", 0), authkey=authkey) as listener:
+            host, port = listener.address
+            self.process = subprocess.Popen([sys.executable, "-c", BOOTSTRAP, host, str(port), authkey.hex()])
+            accepted: list[Connection] = []
+            thread = threading.Thread(target=lambda: accepted.append(listener.accept()), daemon=True)
+            thread.start()
+            thread.join(self.start_timeout)
+        if len(accepted) == 0:
+            self.kill()
+            raise RuntimeError("Не удалось запустить процесс для команды")
+        self.connection = accepted[0]
+        self.connection.send({"sys_path": sys.path, "preload": self.preload})
+
+    def is_alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def execute(self, execute: Callable, option_number, timeout: float | None, scripts_path: str):
+        """Выполняет команду в процессе. По истечении timeout процесс убивается.
+        Если вывод текущего потока перехватывается, процесс присылает свой вывод, и он печатается здесь"""
+        _check_picklable(execute)
+        if self.connection is None:
+            raise RuntimeError("Процесс для команды не запущен")
+        self.executions += 1
+        try:
+            self.connection.send((execute, option_number, scripts_path, ThreadOutput.is_capturing()))
+            if not self.connection.poll(timeout):
+                self.kill()
+                raise CommandTimeoutError(timeout or 0)
+            is_success, payload, remote_traceback, output = self.connection.recv()
+        except (EOFError, OSError):
+            self.kill()
+            raise RuntimeError(f"Процесс команды неожиданно завершился с кодом {self.process.returncode}") from None
+        if output != "":
+            print(output, end="")
+        if not is_success:
+            raise payload from RemoteTraceback(remote_traceback)
+        return payload
+
+    def memory_usage(self) -> int:
+        """Сколько байт памяти занимает процесс. 0 - если узнать не удалось"""
+        if self.connection is None or not self.is_alive():
+            return 0
+        try:
+            self.connection.send("memory")
+            if self.connection.poll(5):
+                return self.connection.recv()
+        except (EOFError, OSError):
+            pass
+        return 0
+
+    def stop(self):
+        """Просит процесс завершиться, а если он не отвечает - убивает"""
+        if self.connection is not None:
+            try:
+                self.connection.send(None)
+            except OSError:
+                pass
+            self.connection.close()
+            self.connection = None
+        if self.process is not None:
+            try:
+                self.process.wait(5)
+            except subprocess.TimeoutExpired:
+                self.kill()
+
+    def kill(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+class WorkerPool:
+    """Пул заранее запущенных процессов для команд с isolated=True.
+    Процессы стартуют в фоне и сразу импортируют модули команд, поэтому команда запускается почти так же быстро,
+    как в основном процессе. Процесс заменяется новым после max_executions запусков, при превышении max_memory,
+    а также если он упал или был убит по таймауту
+
+    Parameters
+    ----------
+    size: int
+        Сколько процессов держать наготове
+    preload: list[str]
+        Модули, которые импортируются в каждом процессе заранее
+    max_executions: int
+        После скольких команд процесс перезапускается
+    max_memory: int
+        При каком объеме памяти в байтах процесс перезапускается
+    """
+
+    def __init__(
+            self,
+            size: int = 2,
+            preload: list[str] | None = None,
+            max_executions: int = 100,
+            max_memory: int = 300 * 1024 * 1024,
+    ):
+        self.size = max(size, 1)
+        self.preload = preload or []
+        self.max_executions = max_executions
+        self.max_memory = max_memory
+        self._idle: queue.Queue[WorkerProcess | None] = queue.Queue()
+        self._closed = False
+        self._generation = 0
+        for _ in range(self.size):
+            self._spawn_in_background()
+
+    def execute(self, execute: Callable, option_number, timeout: float | None, scripts_path: str):
+        """Выполняет команду в свободном процессе пула. Если все заняты - ждет освобождения"""
+        _check_picklable(execute)
+        worker = self._idle.get()
+        if worker is None or not worker.is_alive():
+            worker = WorkerProcess(self.preload)
+            worker.generation = self._generation
+            try:
+                worker.start()
+            except Exception:
+                self._spawn_in_background()
+                raise
+        try:
+            return worker.execute(execute, option_number, timeout, scripts_path)
+        finally:
+            self._release(worker)
+
+    def recycle(self):
+        """Заменяет все процессы новыми - например, после перезагрузки модулей с командами.
+        Занятые процессы заменятся, когда закончат команду"""
+        self._generation += 1
+        while not self._idle.empty():
+            worker = self._idle.get_nowait()
+            if worker is not None:
+                threading.Thread(target=worker.stop, daemon=True).start()
+            self._spawn_in_background()
+
+    def shutdown(self):
+        """Останавливает все свободные процессы. Занятые остановятся после выполнения команды.
+        Командам, которые уже ждут процесс из этого пула, отдается None: они запустят процесс сами"""
+        self._closed = True
+        while not self._idle.empty():
+            worker = self._idle.get_nowait()
+            if worker is not None:
+                worker.stop()
+        for _ in range(self.size):
+            self._idle.put(None)
+
+    def _release(self, worker: WorkerProcess):
+        if self._closed:
+            worker.stop()
+        elif not worker.is_alive():
+            self._spawn_in_background()
+        elif self._is_worn_out(worker):
+            threading.Thread(target=worker.stop, daemon=True).start()
+            self._spawn_in_background()
+        else:
+            self._idle.put(worker)
+
+    def _is_worn_out(self, worker: WorkerProcess) -> bool:
+        """Процесс пора заменить: устарел после recycle, выполнил max_executions команд или занял много памяти"""
+        if worker.generation != self._generation or worker.executions >= self.max_executions:
+            return True
+        return worker.memory_usage() > self.max_memory
+
+    def _spawn_in_background(self):
+        threading.Thread(target=self._spawn, daemon=True, name="hotconsole-worker-spawn").start()
+
+    def _spawn(self):
+        """Запускает процесс и кладет его в очередь. Если не получилось - кладет None,
+        чтобы команда попробовала запустить процесс сама и показала ошибку"""
+        worker = WorkerProcess(self.preload)
+        worker.generation = self._generation
+        try:
+            worker.start()
+        except Exception:
+            worker = None
+        if self._closed and worker is not None:
+            worker.stop()
+            return
+        self._idle.put(worker)
+
+
+def main():
+    """Точка входа дочернего процесса: подключается к приложению и выполняет присланные команды"""
+    host, port, authkey = sys.argv[1], int(sys.argv[2]), bytes.fromhex(sys.argv[3])
+    connection = Client((host, port), authkey=authkey)
+    setup = connection.recv()
+    sys.path[:] = setup["sys_path"]
+    from hotconsole.hotconsole import scripts_folder
+
+    for module in setup["preload"]:
+        try:
+            importlib.import_module(module)
+        except Exception:
+            traceback.print_exc()
+    while True:
+        try:
+            request = connection.recv()
+        except EOFError:
+            break
+        if request is None:
+            break
+        if request == "memory":
+            connection.send(_memory_usage())
+            continue
+        execute, option_number, scripts_path, capture = request
+        output = io.StringIO()
+        with scripts_folder(scripts_path), contextlib.redirect_stdout(output if capture else sys.stdout):
+            try:
+                result = execute(option_number)
+                if inspect.iscoroutine(result):
+                    result = asyncio.run(result)
+                response = (True, result, None)
+            except BaseException as e:
+                response = (False, *_picklable_exception(e))
+        sys.stdout.flush()
+        connection.send((*response, output.getvalue()))
+    connection.close()
+
+
+def _check_picklable(execute: Callable):
+    if getattr(execute, "__module__", None) == "__main__":
+        raise TypeError("Команду для отдельного процесса надо объявить в отдельном модуле, а не в main.py")
+    try:
+        pickle.dumps(execute)
+    except Exception as e:
+        raise TypeError("Команду для отдельного процесса надо объявить функцией на уровне модуля") from e
+
+
+def _picklable_exception(exception: BaseException) -> tuple[Exception, str]:
+    """Ошибка, которую можно передать между процессами, и текст traceback дочернего процесса.
+    sys.exit и другие не-Exception ошибки превращаются в RuntimeError, чтобы не завершить основное приложение"""
+    remote_traceback = "".join(traceback.format_exception(exception))
+    if isinstance(exception, Exception):
+        try:
+            pickle.loads(pickle.dumps(exception))
+            return exception, remote_traceback
+        except Exception:
+            pass
+    return RuntimeError(f"{type(exception).__name__}: {exception}"), remote_traceback
+
+
+def _memory_usage() -> int:
+    """Память текущего процесса в байтах: на Windows через WinAPI, на Linux - через /proc"""
+    try:
+        if sys.platform == "win32":
+            import ctypes
+            from ctypes import wintypes
+
+            class ProcessMemoryCounters(ctypes.Structure):
+                _fields_ = [
+                    ("cb", wintypes.DWORD),
+                    ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t),
+                    ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t),
+                    ("PeakPagefileUsage", ctypes.c_size_t),
+                ]
+
+            counters = ProcessMemoryCounters()
+            counters.cb = ctypes.sizeof(counters)
+            handle = ctypes.windll.kernel32.GetCurrentProcess()
+            ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb)
+            return counters.WorkingSetSize
+        with open("/proc/self/statm", "r", encoding="utf-8") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        return 0
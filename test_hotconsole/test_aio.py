@@ -0,0 +1,99 @@
+import asyncio
+import sqlite3
+import time
+
+import pytest
+import requests
+
+from hotconsole import hotconsole
+from hotconsole.aio import AsyncHelper, CommandLoop, is_coroutine_function
+from hotconsole.cancellation import CommandTimeoutError
+from hotconsole.platform import FakePlatform, Platform
+
+
+@pytest.fixture
+def executor(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(Platform, "_current", FakePlatform())
+    monkeypatch.setattr(hotconsole.OSHelper, "extract_whole_json", lambda _: {
+        "version": 1, "consoleMode": False, "refuseStartup": False
+    })
+    return hotconsole.Executor
+
+
+class TestCommandLoop:
+    def test_run_keeps_context(self, tmp_path):
+        loop = CommandLoop()
+
+        async def folder():
+            await asyncio.sleep(0)
+            return hotconsole.get_scripts_path()
+
+        try:
+            with hotconsole.scripts_folder(str(tmp_path)):
+                assert loop.run(folder()) == str(tmp_path)
+            with pytest.raises(ValueError):
+                loop.run(asyncio.to_thread(int, "не число"))
+        finally:
+            loop.stop()
+        assert not loop.is_running
+
+    def test_timeout_cancels_task(self):
+        loop = CommandLoop()
+        cancelled = []
+
+        async def hang():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        try:
+            with pytest.raises(CommandTimeoutError) as error:
+                loop.run(hang(), timeout=0.1)
+            assert error.value.stopped and cancelled == [True]
+        finally:
+            loop.stop()
+
+
+class TestAsyncCommand:
+    def test_concurrent_io_in_one_command(self, executor, tmp_path):
+        db_path = str(tmp_path / "db.db")
+        with sqlite3.connect(db_path) as connection:
+            connection.execute("create table shifts (number integer)")
+            connection.execute("insert into shifts values (7)")
+        results = []
+
+        async def execute(option_number):
+            start = time.monotonic()
+            rows, *_ = await asyncio.gather(
+                AsyncHelper.query(db_path, "select number from shifts"),
+                *(AsyncHelper.run(time.sleep, 0.2) for _ in range(3)),
+            )
+            results.append((option_number, rows, time.monotonic() - start, hotconsole._current_command.get()))
+
+        command = hotconsole.Command("shift", "Проверить смену", execute)
+        assert is_coroutine_function(command.execute)
+        assert executor.try_execute(command, 1) == "success"
+        (option_number, rows, duration, name), = results
+        assert (option_number, rows, name) == (1, [(7,)], "shift")
+        assert duration < 0.5
+
+    def test_exception_mapping(self, executor, capsys):
+        async def execute(_):
+            raise requests.ConnectionError()
+
+        command = hotconsole.Command("api", "Запросить кассу", execute)
+        assert executor.try_execute(command, None) == "exception"
+        assert "Нет связи с сервером" in capsys.readouterr().out
+
+    def test_timeout_and_error_result(self, executor, capsys):
+        async def hang(_):
+            await asyncio.sleep(10)
+
+        async def fail(_):
+            return "Касса не ответила"
+
+        assert executor.try_execute(hotconsole.Command("hang", "Ждать", hang, timeout=0.1), None) == "timeout"
+        assert executor.try_execute(hotconsole.Command("fail", "Проверить", fail), None) == "error"
+        assert "Касса не ответила" in capsys.readouterr().out
@@ -0,0 +1,157 @@
+import json
+import sqlite3
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from hotconsole import hotconsole
+from hotconsole.cache import HttpCache, KeyValueCache, QueryCache
+from hotconsole.helpers import DBHelper, RequestsHelper
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = KeyValueCache(str(tmp_path / "cache.db"), max_entries=3, evict_every=1)
+    yield cache
+    cache.close()
+
+
+class TestKeyValueCache:
+    def test_namespaces_and_ttl(self, cache: KeyValueCache):
+        cache.set("tills", [1, 2], namespace="first")
+        cache.set("tills", {"id": 3}, namespace="second", ttl=0.05)
+        assert cache.get("tills", "first") == [1, 2]
+        assert cache.get("tills", "second") == {"id": 3}
+        time.sleep(0.1)
+        assert cache.get("tills", "second", "нет") == "нет"
+
+    def test_lru_eviction(self, cache: KeyValueCache):
+        for key in ("a", "b", "c"):
+            cache.set(key, key)
+            time.sleep(0.01)
+        cache.get("a")
+        cache.set("d", "d")
+        assert cache.get("b") is None
+        assert [cache.get(key) for key in ("a", "c", "d")] == ["a", "c", "d"]
+        assert cache.stats()["entries"] == 3
+
+    def test_get_or_set_calls_producer_once(self, cache: KeyValueCache):
+        calls = []
+        producer = lambda: calls.append(1) or "значение"
+        assert cache.get_or_set("key", producer) == "значение"
+        assert cache.get_or_set("key", producer) == "значение"
+        assert len(calls) == 1
+
+    def test_persists_between_instances(self, tmp_path):
+        path = str(tmp_path / "cache.db")
+        first = KeyValueCache(path)
+        first.set("version", 2)
+        first.close()
+        second = KeyValueCache(path)
+        assert second.get("version") == 2
+        second.close()
+
+
+class TestCachedHelper:
+    def test_cached_is_namespaced_by_command(self, tmp_path, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setattr(hotconsole.OSHelper, "extract_whole_json", lambda _: {"version": 1, "consoleMode": False, "refuseStartup": False})
+        results = []
+
+        def execute(option_number):
+            results.append(hotconsole.CommandHelpers.cached("key", 60, lambda: option_number))
+
+        with hotconsole.scripts_folder(str(tmp_path)):
+            for name, number in (("first", 1), ("first", 2), ("second", 3)):
+                hotconsole.Executor.try_execute(hotconsole.Command(name, "Команда", execute), number)
+            hotconsole.CommandHelpers.cache().close()
+        assert results == [1, 1, 3]
+
+
+class ReferenceHandler(BaseHTTPRequestHandler):
+    requests_count = 0
+    cache_control = "no-cache"
+
+    def do_GET(self):
+        ReferenceHandler.requests_count += 1
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.send_header("Cache-Control", self.cache_control)
+            self.end_headers()
+            return
+        body = json.dumps({"tills": [1, 2, 3]}).encode()
+        self.send_response(200)
+        self.send_header("ETag", '"v1"')
+        self.send_header("Cache-Control", self.cache_control)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    ReferenceHandler.requests_count = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ReferenceHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/tills"
+    server.shutdown()
+    server.server_close()
+
+
+class TestHttpCache:
+    def test_revalidation_with_etag(self, tmp_path, server, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setattr(ReferenceHandler, "cache_control", "no-cache")
+        cache = HttpCache(str(tmp_path / "http.db"))
+        with requests.Session() as session:
+            for _ in range(3):
+                assert RequestsHelper.do_get_request(session, server, cache) == {"tills": [1, 2, 3]}
+        assert ReferenceHandler.requests_count == 3
+        assert (cache.stats()["misses"], cache.stats()["revalidations"]) == (1, 2)
+        cache.close()
+
+    def test_max_age_skips_request(self, tmp_path, server, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setattr(ReferenceHandler, "cache_control", "max-age=60")
+        cache = HttpCache(str(tmp_path / "http.db"))
+        with requests.Session() as session:
+            for _ in range(3):
+                assert RequestsHelper.do_get_request(session, server, cache)["tills"] == [1, 2, 3]
+        assert ReferenceHandler.requests_count == 1
+        assert cache.stats()["hits"] == 2
+        cache.close()
+
+    def test_max_age_parsing(self):
+        assert HttpCache.max_age("public, max-age=300") == 300
+        assert HttpCache.max_age("no-cache, max-age=300") == 0
+        assert HttpCache.max_age("") == 0
+
+
+class TestQueryCache:
+    def test_select_is_cached_until_db_changes(self, tmp_path, monkeypatch: pytest.MonkeyPatch):
+        db_path = str(tmp_path / "till.db")
+        with sqlite3.connect(db_path) as con:
+            con.execute("CREATE TABLE receipts (id INTEGER, total REAL)")
+            con.execute("INSERT INTO receipts VALUES (1, 100.5)")
+        monkeypatch.setattr(DBHelper, "result_cache", QueryCache())
+        query = "SELECT total FROM receipts WHERE id = ?"
+
+        assert DBHelper.connect_and_execute_query(db_path, query, (1,), use_cache=True) == [(100.5,)]
+        assert DBHelper.connect_and_execute_query(db_path, query, (1,), use_cache=True) == [(100.5,)]
+        assert DBHelper.connect_and_execute_query(db_path, query, (2,), use_cache=True) == []
+        stats = DBHelper.result_cache.stats()
+        assert (stats["hits"], stats["misses"]) == (1, 2)
+        assert stats["bytes_saved"] > 0
+
+        DBHelper.connect_and_execute_query(db_path, "UPDATE receipts SET total = 200 WHERE id = 1")
+        assert DBHelper.connect_and_execute_query(db_path, query, (1,), use_cache=True) == [(200.0,)]
+
+    def test_memory_bound(self, tmp_path):
+        cache = QueryCache(max_bytes=QueryCache.estimate_size([(1,)]) * 2)
+        for number in range(5):
+            cache.get_or_execute(str(tmp_path / "a.db"), "SELECT ?", (number,), lambda: [(1,)])
+        assert cache.stats()["entries"] == 2
+        assert cache.size <= cache.max_bytes
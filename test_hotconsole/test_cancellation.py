@@ -0,0 +1,141 @@
+import os
+import sys
+import time
+from unittest import mock
+
+import pytest
+
+from hotconsole import hotconsole
+from hotconsole.cancellation import CancellationToken, CommandTimeoutError, TimeoutRunner
+from hotconsole.parallel import ThreadOutput
+from hotconsole.worker import WorkerPool, WorkerProcess
+
+
+def cooperative(option_number):
+    for _ in range(100):
+        hotconsole.CommandHelpers.sleep(0.05)
+    return "Не должно дойти"
+
+
+def hanging(option_number):
+    time.sleep(60)
+
+
+def exiting(option_number):
+    sys.exit(3)
+
+
+def successful(option_number):
+    return f"pid {os.getpid()}, опция {option_number}"
+
+
+def printing(option_number):
+    print(f"Вывод опции {option_number}")
+    return os.getpid()
+
+
+class TestTimeoutRunner:
+    def test_result_and_errors_pass_through(self):
+        assert TimeoutRunner.run_in_thread(lambda number: number * 2, 4, 1) == 8
+        with pytest.raises(ZeroDivisionError):
+            TimeoutRunner.run_in_thread(lambda number: number / 0, 4, 1)
+
+    def test_cooperative_cancellation(self):
+        start = time.monotonic()
+        with pytest.raises(CommandTimeoutError) as error:
+            TimeoutRunner.run_in_thread(cooperative, None, 0.2)
+        assert error.value.stopped
+        assert time.monotonic() - start < 1
+
+    def test_command_ignores_cancellation(self):
+        with pytest.raises(CommandTimeoutError) as error:
+            TimeoutRunner.run_in_thread(lambda _: time.sleep(1), None, 0.1, grace=0.1)
+        assert not error.value.stopped
+
+    def test_token_outside_command(self):
+        assert CancellationToken.current() is None
+        hotconsole.CommandHelpers.check_cancelled()
+
+
+class TestWorkerProcess:
+    def test_run_in_other_process(self):
+        result = WorkerProcess.run_once(successful, 2, 30, os.getcwd())
+        assert result.endswith("опция 2")
+        assert result != successful(2)
+
+    def test_forced_termination(self):
+        start = time.monotonic()
+        with pytest.raises(CommandTimeoutError):
+            WorkerProcess.run_once(hanging, None, 1, os.getcwd())
+        assert time.monotonic() - start < 30
+
+    def test_sys_exit_does_not_leak(self):
+        with pytest.raises(RuntimeError) as error:
+            WorkerProcess.run_once(exiting, None, 30, os.getcwd())
+        assert "SystemExit" in str(error.value)
+
+    def test_lambda_is_rejected(self):
+        with pytest.raises(TypeError):
+            WorkerProcess().execute(lambda _: None, None, 1, os.getcwd())
+
+
+class TestWorkerPool:
+    def test_workers_are_reused_and_recycled(self):
+        pool = WorkerPool(size=1, max_executions=2)
+        try:
+            first = pool.execute(successful, 1, 30, os.getcwd())
+            second = pool.execute(successful, 2, 30, os.getcwd())
+            third = pool.execute(successful, 3, 30, os.getcwd())
+        finally:
+            pool.shutdown()
+        assert first.split(",")[0] == second.split(",")[0]
+        assert third.split(",")[0] != first.split(",")[0]
+
+    def test_killed_worker_is_replaced(self):
+        pool = WorkerPool(size=1)
+        try:
+            with pytest.raises(CommandTimeoutError):
+                pool.execute(hanging, None, 1, os.getcwd())
+            assert pool.execute(successful, 1, 30, os.getcwd()).endswith("опция 1")
+        finally:
+            pool.shutdown()
+
+    def test_output_is_sent_back_when_captured(self, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setattr(sys, "stdout", sys.stdout)
+        output = ThreadOutput.install()
+        pool = WorkerPool(size=1)
+        try:
+            output.start_capture()
+            pid = pool.execute(printing, 7, 30, os.getcwd())
+            captured = output.stop_capture()
+        finally:
+            pool.shutdown()
+        assert pid != os.getpid()
+        assert captured == "Вывод опции 7\n"
+
+    def test_pool_restarts_register_one_exit_handler(self, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setattr(hotconsole.Executor, "_pool_at_exit", False)
+        runner = hotconsole.Runner.__new__(hotconsole.Runner)
+        commands = [hotconsole.Command("turn", "Команда", printing, isolated=True)]
+        with mock.patch.object(hotconsole, "WorkerPool") as pool_type, mock.patch("atexit.register") as register:
+            for _ in range(3):
+                runner.start_worker_pool(commands)
+                runner.stop_worker_pool()
+        register.assert_called_once_with(hotconsole.Executor.stop_pool)
+        assert pool_type.return_value.shutdown.call_count == 3
+        assert hotconsole.Executor.pool is None
+
+
+class TestExecutorTimeout:
+    def test_timeout_from_command_or_config(self):
+        config = hotconsole.Config(version=1, consoleMode=False, refuseStartup=False, commandTimeout=30)
+        command = hotconsole.Command("turn", "Перезапустить", lambda _: None)
+        assert hotconsole.Executor.get_timeout(command, config) == 30
+        command.timeout = 5
+        assert hotconsole.Executor.get_timeout(command, config) == 5
+
+    def test_timeout_is_own_outcome(self):
+        error = CommandTimeoutError(5)
+        assert hotconsole.Executor.get_outcome(error) == "timeout"
+        assert hotconsole.Executor.get_exception_message(error) == "Команда выполнялась дольше 5 с и была остановлена"
+        assert hotconsole.Executor.get_outcome(ValueError()) == "exception"
@@ -0,0 +1,57 @@
+import json
+from unittest import mock
+
+import pytest
+
+from hotconsole.deps import DependencyManager
+from hotconsole.helpers import OSHelper
+
+
+@pytest.fixture
+def manager(tmp_path):
+    (tmp_path / "requirements.txt").write_text("pytest~=8.3.2  # тесты\n-r other.txt\nabsent-package>=1\n", "utf-8")
+    return DependencyManager(str(tmp_path))
+
+
+class TestDependencyManager:
+    def test_requirement_names(self, manager: DependencyManager):
+        assert manager.requirement_names() == ["pytest", "absent-package"]
+
+    def test_not_satisfied_without_state(self, manager: DependencyManager):
+        assert not manager.is_satisfied()
+
+    @mock.patch("subprocess.check_call")
+    def test_skip_pip_when_nothing_changed(self, check_call: mock.MagicMock, manager: DependencyManager):
+        manager.installed_versions = lambda: {"pytest": "8.3.2", "absent-package": "1.0"}
+        assert manager.ensure()
+        check_call.assert_called_once()
+        assert not manager.ensure()
+        check_call.assert_called_once()
+
+    def test_changed_requirements_or_versions(self, manager: DependencyManager, tmp_path):
+        manager.installed_versions = lambda: {"pytest": "8.3.2", "absent-package": "1.0"}
+        manager.save_state()
+        assert manager.is_satisfied()
+        manager.installed_versions = lambda: {"pytest": "8.3.3", "absent-package": "1.0"}
+        assert not manager.is_satisfied()
+        (tmp_path / "requirements.txt").write_text("pytest\n", "utf-8")
+        manager.installed_versions = lambda: {"pytest": "8.3.3"}
+        assert not manager.is_satisfied()
+
+    @mock.patch("subprocess.check_call")
+    @mock.patch("subprocess.call", return_value=0)
+    def test_install_from_wheelhouse(self, call: mock.MagicMock, check_call: mock.MagicMock, manager, tmp_path):
+        (tmp_path / "wheelhouse").mkdir()
+        manager.install()
+        assert "--no-index" in call.call_args.args[0]
+        check_call.assert_not_called()
+        assert "hash" in json.loads((tmp_path / ".hotconsole-deps.json").read_text("utf-8"))
+
+
+class TestInstallLibrariesBat:
+    def test_rewrite_only_changed_bat(self, tmp_path):
+        assert OSHelper.write_install_libraries_bat(str(tmp_path), "install-libs.bat")
+        assert not OSHelper.write_install_libraries_bat(str(tmp_path), "install-libs.bat")
+        (tmp_path / "install-libs.bat").write_text("old", "utf-8")
+        assert OSHelper.write_install_libraries_bat(str(tmp_path), "install-libs.bat")
+        assert "wheelhouse" in (tmp_path / "install-libs.bat").read_text("utf-8")
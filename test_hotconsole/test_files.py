@@ -0,0 +1,114 @@
+import os
+import time
+from unittest import mock
+
+from hotconsole.files import FolderDeleter, FolderSync
+
+
+def make_tree(root, files_count: int = 5):
+    nested = root / "a" / "b"
+    nested.mkdir(parents=True)
+    for index in range(files_count):
+        (root / f"{index}.txt").write_bytes(b"x" * 10)
+        (nested / f"{index}.dll").write_bytes(b"y" * 10)
+    return root
+
+
+class TestFolderDeleter:
+    def test_delete_tree(self, tmp_path):
+        root = make_tree(tmp_path / "install")
+        progress = mock.Mock()
+        report = FolderDeleter(workers=4, on_progress=progress).delete(str(root))
+        assert not root.exists()
+        assert report.is_success
+        assert (report.files, report.folders, report.size) == (10, 3, 100)
+        progress.assert_called_once_with(10, 10)
+
+    def test_retry_only_locked_files(self, tmp_path):
+        root = make_tree(tmp_path / "install")
+        locked = str(root / "0.txt")
+        attempts = []
+        remove = os.remove
+
+        def flaky_remove(path):
+            attempts.append(path)
+            if path == locked and attempts.count(locked) < 3:
+                raise OSError("Файл занят")
+            remove(path)
+
+        with mock.patch("os.remove", flaky_remove):
+            report = FolderDeleter(backoff=0).delete(str(root))
+        assert report.is_success
+        assert not root.exists()
+        assert len(attempts) == 12
+
+    def test_report_failed_files(self, tmp_path):
+        root = make_tree(tmp_path / "install", 1)
+        locked = str(root / "0.txt")
+        remove = os.remove
+
+        def locked_remove(path):
+            if path == locked:
+                raise OSError("Файл занят")
+            remove(path)
+
+        with mock.patch("os.remove", locked_remove):
+            report = FolderDeleter(retries=2, backoff=0).delete(str(root))
+        assert report.failed == [locked]
+        assert report.files == 1
+        assert os.path.exists(locked)
+
+    def test_delete_in_background(self, tmp_path):
+        root = make_tree(tmp_path / "install")
+        done = mock.Mock()
+        thread = FolderDeleter().delete_in_background(str(root), done)
+        assert not root.exists()
+        thread.join(5)
+        assert os.listdir(tmp_path) == []
+        assert done.call_args.args[0].files == 10
+
+    def test_delete_in_background_without_folder(self, tmp_path):
+        assert FolderDeleter().delete_in_background(str(tmp_path / "absent")) is None
+
+
+class TestFolderSync:
+    def test_first_sync_copies_everything(self, tmp_path):
+        source = make_tree(tmp_path / "build", 2)
+        report = FolderSync().sync(str(source), str(tmp_path / "install"))
+        assert report.is_success
+        assert len(report.copied) == 4
+        assert (tmp_path / "install" / "a" / "b" / "1.dll").read_bytes() == b"y" * 10
+
+    def test_second_sync_copies_only_diff(self, tmp_path):
+        source = make_tree(tmp_path / "build", 2)
+        target = tmp_path / "install"
+        FolderSync().sync(str(source), str(target))
+        (source / "0.txt").write_bytes(b"changed")
+        (source / "new.txt").write_bytes(b"new")
+        (source / "a" / "b" / "1.dll").unlink()
+        report = FolderSync().sync(str(source), str(target))
+        assert sorted(report.copied) == ["0.txt", "new.txt"]
+        assert report.deleted == [os.path.join("a", "b", "1.dll")]
+        assert report.unchanged == 2
+        assert (target / "0.txt").read_bytes() == b"changed"
+        assert not (target / "a" / "b" / "1.dll").exists()
+
+    def test_hash_skips_rebuilt_but_equal_files(self, tmp_path):
+        source = make_tree(tmp_path / "build", 1)
+        target = tmp_path / "install"
+        FolderSync(use_hash=True).sync(str(source), str(target))
+        later = time.time_ns() + 10 ** 9
+        os.utime(source / "0.txt", ns=(later, later))
+        with mock.patch("shutil.copy2") as copy:
+            report = FolderSync(use_hash=True).sync(str(source), str(target))
+        copy.assert_not_called()
+        assert report.unchanged == 2
+        assert FolderSync(use_hash=True)._scan(str(target))["0.txt"][1] == later
+
+    def test_without_hash_copies_rebuilt_files(self, tmp_path):
+        source = make_tree(tmp_path / "build", 1)
+        target = tmp_path / "install"
+        FolderSync().sync(str(source), str(target))
+        later = time.time_ns() + 10 ** 9
+        os.utime(source / "0.txt", ns=(later, later))
+        assert FolderSync().sync(str(source), str(target)).copied == ["0.txt"]
@@ -0,0 +1,117 @@
+import dataclasses
+import os
+import sys
+from unittest import mock
+
+import pytest
+
+from hotconsole import hotconsole
+from hotconsole.host import Host
+
+MAIN = """
+from hotconsole.hotconsole import Command, Hotkey, Runner, get_config_path
+from commands import execute
+
+Runner(title="{title}").run([Hotkey("{key}", Command("{name}", "Команда", execute), None)])
+"""
+
+COMMANDS = """
+from hotconsole.hotconsole import get_config_path
+
+def execute(option_number):
+    print(get_config_path())
+"""
+
+ISOLATED_MAIN = """
+from hotconsole.hotconsole import Command, Hotkey, Runner
+from commands import where
+
+Runner(title="{title}").run([Hotkey("{key}", Command("{name}", "Команда", where, isolated=True), None)])
+"""
+
+ISOLATED_COMMANDS = """
+def where(option_number):
+    return __file__
+"""
+
+
+@pytest.fixture
+def make_host(tmp_path, monkeypatch: pytest.MonkeyPatch):
+    """Хост из двух приложений first и second. names - названия их команд, по умолчанию совпадают с папками"""
+    monkeypatch.setattr(hotconsole.Init, "init_or_update_config", lambda *_: None)
+    monkeypatch.setattr(hotconsole.Init, "add_to_startup", lambda *_: None)
+    monkeypatch.setattr(hotconsole.OSHelper, "set_title", lambda *_: None)
+    monkeypatch.setattr(hotconsole.CommandLog, "setup", lambda *_: None)
+    hosts = []
+    folders = []
+
+    def make(names: tuple[str, str] = ("first", "second"), main: str = MAIN, commands: str = COMMANDS) -> Host:
+        for title, key, name in zip(("first", "second"), ("alt+1", "alt+2"), names):
+            folder = tmp_path / title
+            folder.mkdir()
+            (folder / "main.py").write_text(main.format(title=title, key=key, name=name), encoding="utf-8")
+            (folder / "commands.py").write_text(commands, encoding="utf-8")
+            folders.append(str(folder))
+        hosts.append(Host(folders))
+        return hosts[-1]
+
+    yield make
+    for host in hosts:
+        host.pool.shutdown()
+    for folder in folders:
+        if folder in sys.path:
+            sys.path.remove(folder)
+
+
+@pytest.fixture
+def host(make_host) -> Host:
+    return make_host()
+
+
+class TestHost:
+    def test_load_apps_with_same_module_names(self, host: Host):
+        for app in host.apps:
+            host.load_app(app)
+        first, second = host.apps
+        assert (first.title, second.title) == ("first", "second")
+        assert first.hotkeys[0].keyboard_key == "alt+1"
+        assert first.modules["commands"] is not second.modules["commands"]
+        assert "commands" not in sys.modules
+        assert hotconsole.Runner.registrar is None
+
+    def test_execute_in_app_folder(self, host: Host):
+        host.load_apps([], [])
+        command = host.apps[1].hotkeys[0].command
+        with mock.patch.object(hotconsole.Executor, "try_execute", lambda *_: print(hotconsole.get_config_path())):
+            with mock.patch("builtins.print") as mock_print:
+                host.execute(command)
+        mock_print.assert_called_once_with(os.path.join(host.apps[1].folder, "data.json"))
+        assert hotconsole.get_config_path() == hotconsole.CONFIG_PATH
+
+    @mock.patch("hotconsole.hotconsole.CommandHelpers.print_error")
+    def test_print_conflicts(self, mock_print_error: mock.MagicMock, host: Host):
+        command = hotconsole.Command("turn", "Команда", lambda _: None)
+        host.print_conflicts([hotconsole.Hotkey("alt+1", command, 1), hotconsole.Hotkey("alt+1", command, 2)])
+        mock_print_error.assert_called_once()
+        assert "alt+1" in mock_print_error.call_args.args[0]
+
+    def test_same_command_names_after_reload(self, make_host):
+        host = make_host(("turn", "turn"))
+        hotkeys, _ = host.load_apps([], [])
+        host.commands = host.command_table(hotkeys)
+        first, second = (hotkey.command for hotkey in hotkeys)
+        assert set(host.commands) == {f"{app.folder}:turn" for app in host.apps}
+        reloaded = dataclasses.replace(second)
+        host.commands[f"{host.apps[1].folder}:turn"] = reloaded
+        assert host.current(second) is reloaded and host.current(first) is first
+        with mock.patch.object(hotconsole.Executor, "try_execute", lambda *_: hotconsole.get_config_path()):
+            assert host.execute(host.current(second)) == os.path.join(host.apps[1].folder, "data.json")
+            assert host.execute(first) == os.path.join(host.apps[0].folder, "data.json")
+
+    def test_isolated_command_runs_from_its_app(self, make_host):
+        host = make_host(main=ISOLATED_MAIN, commands=ISOLATED_COMMANDS)
+        hotkeys, _ = host.load_apps([], [])
+        host.commands = host.command_table(hotkeys)
+        for app, hotkey in zip(host.apps, hotkeys):
+            with host.app_folder(hotkey.command):
+                assert hotconsole.Executor.call(hotkey.command, None, 60) == os.path.join(app.folder, "commands.py")
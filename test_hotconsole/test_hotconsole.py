@@ -2,10 +2,12 @@ import json
 import os
 import pytest
 import sqlite3
+import threading
 from unittest import mock
 
 from hotconsole import hotconsole
 from hotconsole.helpers import InnGenerator, DBHelper, OSHelper
+from hotconsole.platform import FakePlatform, Platform
 
 
 class TestOSHelper:
@@ -97,6 +99,37 @@ class TestDBHelper:
         mock_cursor.fetchall.assert_not_called()
 
 
+class TestDBSnapshots:
+    def test_snapshot_restore_and_retention(self, tmp_path):
+        db_path = str(tmp_path / "db.db")
+        with sqlite3.connect(db_path) as con:
+            con.execute("CREATE TABLE receipts (id INTEGER PRIMARY KEY, data TEXT)")
+            con.executemany("INSERT INTO receipts (data) VALUES (?)", [("x" * 1000,) for _ in range(200)])
+        progress = []
+
+        snapshot = DBHelper.snapshot(db_path, pages=10, progress=lambda copied, total: progress.append(copied))
+        assert len(progress) > 1 and progress == sorted(progress)
+        DBHelper.connect_and_execute_query(db_path, "DELETE FROM receipts")
+        assert DBHelper.connect_and_execute_query(snapshot, "SELECT COUNT(*) FROM receipts") == [(200,)]
+
+        DBHelper.restore_snapshot(snapshot, db_path)
+        assert DBHelper.connect_and_execute_query(db_path, "SELECT COUNT(*) FROM receipts") == [(200,)]
+
+        for _ in range(3):
+            DBHelper.snapshot(db_path, keep=2, pause=0)
+        snapshots = DBHelper.list_snapshots(db_path)
+        assert len(snapshots) == 2 and snapshot not in snapshots
+
+    def test_snapshots_of_databases_in_one_folder(self, tmp_path):
+        db_path, old_path = str(tmp_path / "db.db"), str(tmp_path / "db-old.db")
+        for path in (db_path, old_path):
+            sqlite3.connect(path).close()
+        old_snapshots = [DBHelper.snapshot(old_path, pause=0) for _ in range(2)]
+        snapshots = [DBHelper.snapshot(db_path, keep=1, pause=0) for _ in range(2)]
+        assert DBHelper.list_snapshots(db_path) == snapshots[1:]
+        assert DBHelper.list_snapshots(old_path) == old_snapshots
+
+
 class TestCommandHelpers:
     @mock.patch("builtins.print")
     def test_print_one_option(self, mock_print: mock.MagicMock):
@@ -152,6 +185,54 @@ class TestIni:
         )
 
 
+class TestRunnerRestart:
+    def test_restart_reinstalls_hooks_in_process(self, monkeypatch: pytest.MonkeyPatch):
+        platform = FakePlatform()
+        monkeypatch.setattr(Platform, "_current", platform)
+        threads = []
+        unhook_all = platform.unhook_all
+        monkeypatch.setattr(platform, "unhook_all", lambda: threads.append(threading.current_thread()) or unhook_all())
+        runner = self.get_runner()
+        runner.install_hooks()
+        platform.add_hotkey("alt+9", lambda: None)
+        with mock.patch.object(OSHelper, "rerun_as_admin") as mock_rerun:
+            runner.restart().join(5)
+        mock_rerun.assert_not_called()
+        assert threads[0] is not threading.current_thread()
+        assert set(platform.hotkeys) == {"alt+1", "alt+h", "alt+q"}
+        assert platform.abbreviations == {"адр": "Москва"}
+
+    def test_rerun_when_warm_restart_fails(self, monkeypatch: pytest.MonkeyPatch):
+        platform = FakePlatform()
+        monkeypatch.setattr(Platform, "_current", platform)
+        monkeypatch.setattr(platform, "unhook_all", mock.Mock(side_effect=OSError))
+        with mock.patch.object(OSHelper, "rerun_as_admin") as mock_rerun:
+            self.get_runner().restart().join(5)
+        mock_rerun.assert_called_once_with(True)
+
+    def test_exit_from_console_mode_reinstalls_hooks(self, monkeypatch: pytest.MonkeyPatch):
+        platform = FakePlatform()
+        monkeypatch.setattr(Platform, "_current", platform)
+        monkeypatch.setattr(OSHelper, "clean_console_input", lambda: None)
+        monkeypatch.setattr(hotconsole.PromptBroker, "ask", lambda *args, **kwargs: "exit")
+        runner = self.get_runner()
+        runner.console_commands = {}
+        restarts = []
+        restart = runner.restart
+        monkeypatch.setattr(runner, "restart", lambda: restarts.append(restart()))
+        with mock.patch.object(OSHelper, "rerun_as_admin") as mock_rerun:
+            runner.console_mode(runner.hotkeys)
+            restarts[0].join(5)
+        mock_rerun.assert_not_called()
+        assert set(platform.hotkeys) == {"alt+1", "alt+h", "alt+q"}
+
+    def get_runner(self) -> hotconsole.Runner:
+        runner = hotconsole.Runner.__new__(hotconsole.Runner)
+        runner.hotkeys = [hotconsole.Hotkey("alt+1", hotconsole.Command("turn", "Команда", lambda _: None), None)]
+        runner.hotstrings = [hotconsole.Hotstring("адр", "Адрес", "Москва")]
+        return runner
+
+
 class TestJsonMethods:
     def test_get_from_json_file_success(self):
         file_path = self.get_file_path()
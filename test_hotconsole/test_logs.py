@@ -0,0 +1,76 @@
+import os
+from unittest import mock
+
+import pytest
+
+from hotconsole import hotconsole
+from hotconsole.logs import CommandLog
+from hotconsole.platform import FakePlatform, Platform
+
+
+@pytest.fixture
+def log(tmp_path):
+    CommandLog.setup(str(tmp_path / "logs" / "hotconsole.log"), max_bytes=400, backup_count=2)
+    yield CommandLog
+    CommandLog.shutdown()
+    CommandLog.path = None
+
+
+class TestCommandLog:
+    def test_disabled_log_does_nothing(self):
+        CommandLog.record("turn", 1, 0.1, "success")
+        assert CommandLog.tail() == []
+
+    def test_record_and_tail(self, log):
+        log.record("turn", 3, 1.23456, "success")
+        log.record("db", None, 0.5, "exception", "Нет связи", "Traceback\nConnectionError: boom")
+        log.shutdown()
+        first, second = log.tail()
+        assert (first["command"], first["option"], first["duration"], first["outcome"]) == ("turn", 3, 1.235, "success")
+        assert second["level"] == "ERROR"
+        assert log.format(second).endswith("ConnectionError: boom")
+
+    def test_rotation_and_search(self, log):
+        for index in range(20):
+            log.record(f"command{index}", None, 0, "success")
+        log.shutdown()
+        assert os.path.exists(f"{log.path}.1")
+        assert [entry["command"] for entry in log.search("command1")][-1] == "command19"
+        assert len(log.tail(3)) == 3
+
+    def test_corrupt_lines_are_skipped(self, log):
+        log.record("turn", 1, 0.1, "success")
+        log.shutdown()
+        with open(log.path, "a", encoding="utf-8") as file:
+            file.write('{"command": "db", "outc\n')
+        assert [entry["command"] for entry in log.tail()] == ["turn"]
+
+    def test_exit_handler_is_registered_once(self, tmp_path, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setattr(CommandLog, "_at_exit", False)
+        with mock.patch("atexit.register") as register:
+            for index in range(3):
+                CommandLog.setup(str(tmp_path / f"hotconsole{index}.log"))
+        CommandLog.shutdown()
+        CommandLog.path = None
+        register.assert_called_once_with(CommandLog.shutdown)
+
+
+class TestExecutorLog:
+    @mock.patch("builtins.print")
+    def test_exception_is_logged_and_shortened(self, mock_print: mock.MagicMock, log, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setattr(Platform, "_current", FakePlatform())
+        monkeypatch.setattr(hotconsole.OSHelper, "extract_whole_json", lambda _: {
+            "version": 1, "consoleMode": False, "refuseStartup": False
+        })
+
+        def execute(_):
+            raise RuntimeError("Служба зависла")
+
+        hotconsole.Executor.try_execute(hotconsole.Command("turn", "Перезапустить", execute), 2)
+        log.shutdown()
+        entry = log.tail()[-1]
+        assert (entry["command"], entry["option"], entry["outcome"]) == ("turn", 2, "exception")
+        assert "Traceback" in entry["traceback"]
+        printed = [call.args[0] for call in mock_print.call_args_list if call.args]
+        assert "RuntimeError: Служба зависла" in printed
+        assert not any("Traceback" in str(line) for line in printed)
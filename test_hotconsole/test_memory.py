@@ -0,0 +1,117 @@
+import os
+import threading
+import time
+import tracemalloc
+
+import hotconsole
+from hotconsole.memory import IdlePolicy, MemoryTracker
+
+PACKAGE_FOLDER = os.path.dirname(os.path.abspath(hotconsole.__file__))
+
+
+class TestMemoryTracker:
+    def test_subsystem(self, tmp_path):
+        scripts = str(tmp_path)
+        assert MemoryTracker.subsystem(os.path.join(PACKAGE_FOLDER, "cache.py"), scripts) == "hotconsole.cache"
+        library = os.path.join("C:\\", "Python311", "Lib", "site-packages", "requests", "sessions.py")
+        assert MemoryTracker.subsystem(library, scripts) == "requests"
+        assert MemoryTracker.subsystem(os.path.join(scripts, "commands.py"), scripts) == "скрипты"
+        assert MemoryTracker.subsystem("<frozen importlib._bootstrap>", scripts) == "python"
+
+    def test_command_usage(self, tmp_path):
+        MemoryTracker.start_tracing()
+        try:
+            before = MemoryTracker.begin()
+            kept = [bytes(1024) for _ in range(1000)]
+            MemoryTracker.finish("fill", before)
+            usage = MemoryTracker.commands["fill"]
+            assert usage.runs == 1
+            assert usage.retained >= 1000 * 1024
+            assert usage.peak >= usage.retained
+            report = "\n".join(MemoryTracker.format_report(str(tmp_path)))
+            assert "fill" in report and "Python-объекты" in report
+            del kept
+        finally:
+            tracemalloc.stop()
+            MemoryTracker.commands.pop("fill", None)
+        assert MemoryTracker.rss() > 0
+
+
+class TestIdlePolicy:
+    def test_release_and_wake(self):
+        calls = []
+        policy = IdlePolicy(idle_after=60)
+        policy.on_idle("кэши", lambda: calls.append("release"))
+        policy.on_wake(lambda: calls.append("wake"))
+        policy.on_released(lambda: calls.append("released"))
+        policy.release()
+        assert policy.is_idle and policy.releases == 1
+        with policy.activity():
+            assert calls == ["release", "released", "wake"]
+            assert policy.release() == 0
+        assert calls == ["release", "released", "wake"]
+        assert not policy.is_idle
+
+    def test_background_work_blocks_release_without_waking(self):
+        calls = []
+        policy = IdlePolicy(idle_after=60)
+        policy.on_idle("кэши", lambda: calls.append("release"))
+        policy.on_wake(lambda: calls.append("wake"))
+        policy.release()
+        with policy.background():
+            assert policy.release() == 0 and not policy.is_busy
+        assert calls == ["release"] and policy.is_idle
+        policy.release()
+        assert calls == ["release", "release"]
+
+    def test_activity_does_not_wait_for_release(self):
+        calls = []
+        releasing = threading.Event()
+        pressed = threading.Event()
+        policy = IdlePolicy(idle_after=60)
+
+        def stop_pool():
+            calls.append("пул процессов")
+            releasing.set()
+            assert pressed.wait(2)
+
+        policy.on_idle("пул процессов", stop_pool)
+        policy.on_idle("кэши", lambda: calls.append("кэши"))
+        policy.on_wake(lambda: calls.append("wake"))
+        policy.on_released(lambda: calls.append("released"))
+        release = threading.Thread(target=policy.release)
+        release.start()
+        assert releasing.wait(2)
+        started = time.perf_counter()
+        with policy.activity():
+            assert time.perf_counter() - started < 0.5
+            pressed.set()
+            release.join(2)
+        assert calls == ["пул процессов", "wake"]
+        assert not policy.is_idle and policy.releases == 0
+
+    def test_releases_after_inactivity(self):
+        released = threading.Event()
+        policy = IdlePolicy(idle_after=0.1, check_every=0.02)
+        policy.on_idle("кэши", released.set)
+        with policy.activity():
+            policy.start()
+            time.sleep(0.2)
+            assert not released.is_set()
+        try:
+            assert released.wait(2)
+            deadline = time.monotonic() + 2
+            while not policy.is_idle and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert "освобождена" in policy.format_status()
+        finally:
+            policy.stop()
+
+    def test_failed_release_does_not_stop_others(self, capsys):
+        calls = []
+        policy = IdlePolicy()
+        policy.on_idle("пул процессов", lambda: 1 / 0)
+        policy.on_idle("кэши", lambda: calls.append("release"))
+        policy.release()
+        assert calls == ["release"]
+        assert "ZeroDivisionError" in capsys.readouterr().out
@@ -0,0 +1,70 @@
+import time
+from unittest import mock
+
+import pytest
+
+from hotconsole import hotconsole
+from hotconsole.options import OptionsPager, OptionsProvider
+
+
+class TestOptionsProvider:
+    def test_fetch_only_on_first_get(self):
+        fetch = mock.Mock(return_value=["Касса 1", "Касса 2"])
+        provider = OptionsProvider(fetch)
+        fetch.assert_not_called()
+        assert provider.get() == ["Касса 1", "Касса 2"]
+        assert provider.get() == ["Касса 1", "Касса 2"]
+        fetch.assert_called_once()
+
+    def test_stale_cache_refreshes_in_background(self):
+        fetch = mock.Mock(side_effect=[["Старая"], ["Новая"]])
+        provider = OptionsProvider(fetch, ttl=0)
+        assert provider.get() == ["Старая"]
+        assert provider.get() == ["Старая"]
+        for _ in range(100):
+            if fetch.call_count == 2 and not provider._refreshing:
+                break
+            time.sleep(0.01)
+        assert provider.get() == ["Новая"]
+
+    def test_option_from_shown_list(self):
+        provider = OptionsProvider(lambda: [("db1", "База 1"), ("db2", "База 2")])
+        provider.get()
+        assert provider.option(2) == ("db2", "База 2")
+        with pytest.raises(ValueError):
+            provider.option(3)
+
+    def test_command_wraps_callable_options(self):
+        command = hotconsole.Command("db", "Выбрать базу", lambda _: None, lambda: ["База"])
+        assert isinstance(command.options, OptionsProvider)
+        assert command.has_options()
+        assert not hotconsole.Command("db", "Выбрать базу", lambda _: None).has_options()
+
+
+class TestOptionsPager:
+    def test_pages_and_search(self):
+        pager = OptionsPager([f"Касса {i}" for i in range(1, 26)], page_size=10)
+        assert pager.pages_count() == 3
+        assert pager.current_page()[0] == (1, "Касса 1")
+        assert pager.handle("") is None
+        assert pager.current_page()[0] == (11, "Касса 11")
+        assert pager.handle("-") is None
+        assert pager.page == 0
+        assert pager.handle("касса 2") is None
+        assert [number for number, _ in pager.current_page()] == [2, 20, 21, 22, 23, 24, 25]
+        assert pager.handle("*") is None
+        assert pager.pages_count() == 3
+
+    def test_number_keeps_original_numbering(self):
+        pager = OptionsPager([("a", "Альфа"), ("b", "Бета")])
+        pager.handle("бета")
+        assert pager.current_page() == [(2, "Бета")]
+        assert pager.handle("2") == 2
+        with pytest.raises(ValueError):
+            pager.handle("3")
+
+    @mock.patch("builtins.print")
+    def test_ask_until_number(self, _, monkeypatch: pytest.MonkeyPatch):
+        answers = iter(["Бета", "2"])
+        monkeypatch.setattr("builtins.input", lambda *_: next(answers))
+        assert OptionsPager(["Альфа", "Бета"]).ask() == 2
@@ -0,0 +1,87 @@
+import sys
+import threading
+import time
+from unittest import mock
+
+import pytest
+
+from hotconsole import hotconsole
+from hotconsole.parallel import ThreadOutput
+
+
+class TestThreadOutput:
+    def test_capture_only_current_thread(self):
+        output = ThreadOutput(mock.Mock())
+        output.start_capture()
+        output.write("в буфер")
+        thread = threading.Thread(target=lambda: output.write("в консоль"))
+        thread.start()
+        thread.join()
+        assert output.stop_capture() == "в буфер"
+        output.stream.write.assert_called_once_with("в консоль")
+
+
+class TestExecuteForOptions:
+    @pytest.fixture(autouse=True)
+    def restore_stdout(self):
+        stdout = sys.stdout
+        yield
+        sys.stdout = stdout
+
+    def test_options_run_concurrently(self):
+        def execute(option_number):
+            time.sleep(0.2)
+            print(f"Касса {option_number} перезапущена")
+
+        command = hotconsole.Command("turn", "Перезапустить", execute, ["1", "2", "3"], parallelism=3)
+        with mock.patch.object(hotconsole.Executor, "print_summary") as print_summary:
+            start = time.monotonic()
+            hotconsole.Executor.execute_for_options(command, [1, 2, 3, 3])
+            assert time.monotonic() - start < 0.5
+        results = print_summary.call_args.args[1]
+        assert [result.option_number for result in results] == [1, 2, 3]
+        assert results[1].output == "Касса 2 перезапущена\n"
+        assert all(result.is_success for result in results)
+
+    def test_errors_are_collected_per_option(self):
+        def execute(option_number):
+            if option_number == 2:
+                raise hotconsole.requests.ConnectionError()
+            return "Служба не остановилась" if option_number == 3 else None
+
+        command = hotconsole.Command("turn", "Перезапустить", execute, [("a", "Касса A"), ("b", "Касса B"), ("c", "C")])
+        with mock.patch.object(hotconsole.Executor, "print_summary") as print_summary:
+            hotconsole.Executor.execute_for_options(command, [1, 2, 3])
+        results = print_summary.call_args.args[1]
+        assert results[0].is_success
+        assert results[1].title == "Касса B"
+        assert results[1].error == "Нет связи с сервером"
+        assert "Traceback" in results[1].output
+        assert results[2].error == "Служба не остановилась"
+
+    @pytest.mark.parametrize("option_numbers", [[1, 4], [0], []])
+    def test_option_numbers_are_checked(self, option_numbers):
+        execute = mock.Mock(return_value=None)
+        command = hotconsole.Command("turn", "Перезапустить", execute, ["1", "2", "3"], multi_options=True)
+        with pytest.raises(ValueError):
+            hotconsole.Executor.execute_for_options(command, option_numbers)
+        execute.assert_not_called()
+
+    def test_empty_selection_is_asked_again(self, monkeypatch: pytest.MonkeyPatch, capsys):
+        answers = iter([[], [2, 3]])
+        monkeypatch.setattr(hotconsole.OSHelper, "switch_to_script_window", lambda: None)
+        monkeypatch.setattr(hotconsole.OSHelper, "input_number_array", lambda **_: next(answers))
+        assert hotconsole.CommandHelpers.ask_option_numbers_from_one(["1", "2", "3"]) == [2, 3]
+        assert "Выберите хотя бы один вариант" in capsys.readouterr().out
+
+
+class TestParseOptionNumbers:
+    @pytest.mark.parametrize(
+        "args, expected", [(["3"], [3]), (["1", "3", "5"], [1, 3, 5]), (["1,3,5"], [1, 3, 5]), (["1,", "3"], [1, 3])]
+    )
+    def test_parse(self, args, expected):
+        assert hotconsole.Runner.parse_option_numbers(args) == expected
+
+    def test_parse_error(self):
+        with pytest.raises(ValueError):
+            hotconsole.Runner.parse_option_numbers(["1,f"])
@@ -0,0 +1,71 @@
+import pytest
+
+from hotconsole.helpers import OSHelper
+from hotconsole.loadgen import LoadGenerator, LoadReport
+from hotconsole.logs import CommandLog
+from hotconsole.platform import FakePlatform, Platform
+from hotconsole.services import ServiceMonitor, ServiceState
+
+
+@pytest.fixture
+def platform(monkeypatch: pytest.MonkeyPatch):
+    fake = FakePlatform(
+        services={"KonturMarket": ("RUNNING", 4120), "Spooler": ("STOPPED", 0)},
+        processes=["notepad.exe", "LogonUI.exe"],
+        title="Hotconsole Scripts",
+    )
+    monkeypatch.setattr(ServiceMonitor, "_shared", ServiceMonitor(min_interval=0.01, max_interval=0.05))
+    previous = Platform.use(fake)
+    yield fake
+    Platform.use(previous)
+
+
+class TestFakePlatform:
+    def test_services(self, platform):
+        assert OSHelper.try_rerun_service("KonturMarket", timeout=2)
+        assert ["sc", "stop", "KonturMarket"] in platform.commands
+        assert ["sc", "start", "KonturMarket"] in platform.commands
+        assert OSHelper.try_start_service("Spooler", timeout=2)
+        statuses = OSHelper.get_service_statuses(["Spooler", "Absent"])
+        assert statuses["Spooler"].state == ServiceState.RUNNING and statuses["Absent"] is None
+
+    def test_processes_and_windows(self, platform):
+        assert OSHelper.kill_process_by_name("notepad.exe")
+        assert platform.commands[-1] == ["taskkill", "/f", "/t", "/PID", "1000"]
+        assert not OSHelper.kill_process_by_name("calc.exe")
+        OSHelper.switch_to_window("Блокнот")
+        assert platform.foreground == "Блокнот"
+        assert OSHelper.get_current_console_title() == "Hotconsole Scripts"
+
+    def test_dispatch_in_one_thread(self, platform, capsys):
+        calls = []
+        platform.add_hotkey("alt+1", lambda: calls.append("alt+1"))
+        platform.add_hotkey("alt+2", lambda: 1 / 0)
+        platform.add_abbreviation("githot", "https://github.com/Vecheren/hotconsole")
+        for key in ["alt+1", "alt+2", "githot", "alt+1", "alt+3"]:
+            platform.press(key)
+        platform.join()
+        assert calls == ["alt+1", "alt+1"]
+        assert platform.typed == ["https://github.com/Vecheren/hotconsole"]
+        assert "ZeroDivisionError" in capsys.readouterr().out
+        platform.unhook_all()
+        assert platform.hotkeys == {} and platform.abbreviations == {}
+
+
+class TestLoadGenerator:
+    def test_run(self):
+        previous = Platform.current()
+        report = LoadGenerator(commands=3, hotstrings=2, seed=3).run(200)
+        assert report.events == report.completed == 200
+        assert len(report.queue_delays) == len(report.latencies) == 200
+        assert all(delay >= 0 for delay in report.queue_delays)
+        assert report.throughput > 0
+        assert len(report.format()) == 4
+        assert Platform.current() is previous and not CommandLog.is_enabled()
+
+    def test_percentile(self):
+        values = [float(value) for value in range(1, 101)]
+        assert LoadReport.percentile(values, 50) == 50
+        assert LoadReport.percentile(values, 99) == 99
+        assert LoadReport.percentile(values, 100) == 100
+        assert LoadReport.percentile([], 95) == 0
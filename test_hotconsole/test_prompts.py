@@ -0,0 +1,109 @@
+import queue
+import threading
+import time
+
+import pytest
+
+from hotconsole.cancellation import CommandTimeoutError, TimeoutRunner
+from hotconsole.prompts import PromptBroker, PromptTimeoutError
+
+
+class FakeConsole:
+    """Консоль, в которой ответы вводит тест: каждая строка из answers - один ответ"""
+
+    def __init__(self):
+        self.answers: queue.Queue = queue.Queue()
+        self.messages: list[str] = []
+
+    def __call__(self, message: str) -> str:
+        self.messages.append(message)
+        return self.answers.get()
+
+
+@pytest.fixture
+def console() -> FakeConsole:
+    return FakeConsole()
+
+
+@pytest.fixture
+def broker(console: FakeConsole) -> PromptBroker:
+    return PromptBroker(console)
+
+
+class TestPromptBroker:
+    def test_concurrent_prompts_are_queued(self, broker: PromptBroker, console: FakeConsole):
+        answers = {}
+        threads = [
+            threading.Thread(target=lambda name=name: answers.update({name: broker.ask(name)}))
+            for name in ("first", "second")
+        ]
+        for thread in threads:
+            thread.start()
+            time.sleep(0.05)
+        time.sleep(0.1)
+        assert console.messages == ["first"]
+        console.answers.put("1")
+        console.answers.put("2")
+        for thread in threads:
+            thread.join(5)
+        assert answers == {"first": "1", "second": "2"}
+        assert console.messages == ["first", "second"]
+
+    def test_timeout_returns_default(self, broker: PromptBroker, console: FakeConsole):
+        start = time.monotonic()
+        assert broker.ask("Номер?", timeout=0.2, default="3") == "3"
+        with pytest.raises(PromptTimeoutError):
+            broker.ask("Номер?", timeout=0.2)
+        assert time.monotonic() - start < 2
+        assert broker.timed_out == 2
+
+    def test_late_answer_goes_to_shown_prompt(self, broker: PromptBroker, console: FakeConsole, capsys):
+        assert broker.ask("Первый", timeout=0.1, default="") == ""
+        future = broker.ask_async("Второй")
+        time.sleep(0.1)
+        console.answers.put("ответ")
+        assert future.result(5) == "ответ"
+        assert console.messages == ["Первый"]
+        assert "Второй" in capsys.readouterr().out
+
+    def test_session_keeps_console(self, broker: PromptBroker, console: FakeConsole):
+        other = {}
+        with broker.session():
+            thread = threading.Thread(target=lambda: other.update(answer=broker.ask("чужой")))
+            thread.start()
+            console.answers.put("a")
+            assert broker.ask("свой 1") == "a"
+            console.answers.put("b")
+            assert broker.ask("свой 2") == "b"
+        console.answers.put("c")
+        thread.join(5)
+        assert other == {"answer": "c"}
+        assert console.messages == ["свой 1", "свой 2", "чужой"]
+
+    def test_background_prompt_yields(self, broker: PromptBroker, console: FakeConsole):
+        background = broker.submit("> ", background=True)
+        time.sleep(0.05)
+        answer = broker.ask_async("Номер?")
+        time.sleep(0.3)
+        console.answers.put("5")
+        assert answer.result(5) == "5"
+        console.answers.put("turn")
+        assert broker.wait(background) == "turn"
+
+    def test_cancelled_command_withdraws_prompt(self, monkeypatch: pytest.MonkeyPatch, console: FakeConsole):
+        broker = PromptBroker(console)
+        monkeypatch.setattr(PromptBroker, "_shared", broker)
+        start = time.monotonic()
+        with pytest.raises(CommandTimeoutError):
+            TimeoutRunner.run_in_thread(lambda _: PromptBroker.shared().ask("Номер?"), None, 0.2, grace=2)
+        assert time.monotonic() - start < 2
+        time.sleep(0.2)
+        assert broker.pending() == 0
+
+    def test_command_timeout_from_context(self, broker: PromptBroker):
+        token = PromptBroker.command_timeout.set(0.1)
+        try:
+            with pytest.raises(PromptTimeoutError):
+                broker.ask("Номер?")
+        finally:
+            PromptBroker.command_timeout.reset(token)
@@ -0,0 +1,109 @@
+import json
+import os
+import pickle
+import sys
+
+import pytest
+
+from hotconsole.hotconsole import Runner
+from hotconsole.registry import CommandRegistry, LazyCallable
+from hotconsole.reload import CommandReloader
+
+MODULE = "lazy_registry_commands"
+
+
+@pytest.fixture
+def scripts(tmp_path):
+    (tmp_path / f"{MODULE}.py").write_text(
+        "CALLS = []\n"
+        "\n"
+        "def turn(option_number):\n"
+        "    CALLS.append(option_number)\n"
+        "    return f'turn {option_number}'\n"
+        "\n"
+        "def cashboxes():\n"
+        "    return ['Касса 1', 'Касса 2']\n",
+        encoding="utf-8",
+    )
+    manifest = [
+        {
+            "name": "turn",
+            "description": "Переключить службу",
+            "execute": f"{MODULE}:turn",
+            "options": f"{MODULE}:cashboxes",
+            "hotkeys": {"alt+t": None, "alt+1": 1},
+            "timeout": 30,
+        }
+    ]
+    (tmp_path / "commands.json").write_text(json.dumps(manifest, ensure_ascii=False), encoding="utf-8")
+    yield tmp_path
+    sys.modules.pop(MODULE, None)
+
+
+class TestCommandRegistry:
+    def test_manifest_does_not_import(self, scripts, capsys):
+        registry = CommandRegistry(str(scripts)).load_manifest()
+        command = registry.commands["turn"]
+        assert command.timeout == 30
+        keys = [(hotkey.keyboard_key, hotkey.option_number) for hotkey in registry.hotkeys]
+        assert keys == [("alt+t", None), ("alt+1", 1)]
+        runner = Runner.__new__(Runner)
+        runner.console_commands = {}
+        runner.print_hotkeys(registry.hotkeys)
+        runner.print_commands(list(registry.commands.values()))
+        assert "Переключить службу" in capsys.readouterr().out
+        assert MODULE not in sys.modules
+        assert not command.execute.is_loaded
+
+    def test_imports_on_first_call(self, scripts):
+        command = CommandRegistry(str(scripts)).load_manifest().commands["turn"]
+        assert command.options.get() == ["Касса 1", "Касса 2"]
+        assert command.execute(2) == "turn 2"
+        function = command.execute.resolve()
+        assert command.execute(1) == "turn 1"
+        assert command.execute.resolve() is function
+        assert sys.modules[MODULE].CALLS == [2, 1]
+        assert command.execute.__module__ == MODULE
+        assert command.execute.__name__ == "turn"
+
+    def test_pickle_keeps_only_path(self, scripts):
+        execute = LazyCallable(f"{MODULE}:turn", str(scripts))
+        execute(1)
+        restored = pickle.loads(pickle.dumps(execute))
+        assert restored.path == execute.path and not restored.is_loaded
+
+    def test_invalid_path(self):
+        with pytest.raises(ValueError):
+            LazyCallable("commands.turn")
+
+    def test_lazy_warmup(self, scripts):
+        command = CommandRegistry(str(scripts)).declare(
+            "cashboxes", "Кассы", f"{MODULE}:turn", warmup=f"{MODULE}:cashboxes", warmup_priority=2
+        )
+        assert isinstance(command.warmup, LazyCallable) and not command.warmup.is_loaded
+        assert command.warmup() == ["Касса 1", "Касса 2"]
+
+    def test_lazy_module_is_not_reloaded_on_first_import(self, scripts):
+        commands = CommandRegistry(str(scripts)).load_manifest().commands
+        reloader = CommandReloader(str(scripts))
+        reloader._mtimes = reloader._scan()
+        assert commands["turn"].execute(1) == "turn 1"
+        assert reloader.check(commands) is None
+        assert sys.modules[MODULE].CALLS == [1]
+
+        path = scripts / f"{MODULE}.py"
+        stat = path.stat()
+        path.write_text(path.read_text("utf-8").replace("f'turn", "f'new"), "utf-8")
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert str(scripts) not in sys.path
+        reloaded = reloader.check(commands)
+        assert reloaded["turn"].execute(2) == "new 2"
+        assert str(scripts) not in sys.path
+
+    def test_own_module_replaces_foreign_one(self, scripts, tmp_path_factory):
+        other = tmp_path_factory.mktemp("other")
+        (other / f"{MODULE}.py").write_text("def turn(option_number):\n    return 'other'\n", encoding="utf-8")
+        assert LazyCallable(f"{MODULE}:turn", str(other))(1) == "other"
+        own = LazyCallable(f"{MODULE}:turn", str(scripts))
+        assert own(1) == "turn 1"
+        assert sys.modules[MODULE].turn is own.resolve()
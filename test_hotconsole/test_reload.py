@@ -0,0 +1,62 @@
+import os
+import sys
+
+import pytest
+
+from hotconsole import hotconsole
+from hotconsole.reload import CommandReloader
+
+COMMANDS = """
+from hotconsole.hotconsole import Command
+
+
+def execute(option_number):
+    return "{result}"
+
+
+turn = Command("turn", "{description}", execute)
+"""
+
+
+@pytest.fixture
+def scripts(tmp_path):
+    (tmp_path / "reloadable_commands.py").write_text(COMMANDS.format(result="old", description="Старая"), "utf-8")
+    sys.path.insert(0, str(tmp_path))
+    yield tmp_path
+    sys.path.remove(str(tmp_path))
+    sys.modules.pop("reloadable_commands", None)
+
+
+class TestCommandReloader:
+    def test_reload_changed_module(self, scripts):
+        import reloadable_commands
+
+        in_main = hotconsole.Command("push", "Из main.py", reloadable_commands.execute)
+        commands = {"turn": reloadable_commands.turn, "push": in_main}
+        reloader = CommandReloader(str(scripts))
+        reloader._mtimes = reloader._scan()
+        assert reloader.check(commands) is None
+
+        self.rewrite(scripts, COMMANDS.format(result="new", description="Новая"))
+        reloaded = reloader.check(commands)
+        assert reloaded["turn"].description == "Новая"
+        assert reloaded["turn"].execute(None) == "new"
+        assert reloaded["push"].description == "Из main.py"
+        assert reloaded["push"].execute(None) == "new"
+        assert commands["turn"].execute(None) == "old"
+
+    def test_broken_module_keeps_old_commands(self, scripts):
+        import reloadable_commands
+
+        commands = {"turn": reloadable_commands.turn}
+        reloader = CommandReloader(str(scripts))
+        reloader._mtimes = reloader._scan()
+        self.rewrite(scripts, "def execute(:\n")
+        assert reloader.check(commands) is None
+        assert commands["turn"].execute(None) == "old"
+
+    def rewrite(self, scripts, text: str):
+        path = scripts / "reloadable_commands.py"
+        stat = path.stat()
+        path.write_text(text, "utf-8")
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
@@ -0,0 +1,123 @@
+import datetime
+import threading
+import time
+
+import pytest
+
+from hotconsole import hotconsole
+from hotconsole.logs import CommandLog
+from hotconsole.platform import FakePlatform, Platform
+from hotconsole.scheduler import CronTrigger, IntervalTrigger, Job, OnceTrigger, Scheduler
+
+
+class TestTriggers:
+    def test_interval_continues_after_restart(self):
+        now = datetime.datetime(2024, 1, 1, 12, 0)
+        trigger = IntervalTrigger(60)
+        assert trigger.next_run(now, None) == now + datetime.timedelta(seconds=60)
+        assert trigger.next_run(now, now - datetime.timedelta(seconds=20)) == now + datetime.timedelta(seconds=40)
+        assert trigger.next_run(now, now - datetime.timedelta(hours=1)) == now
+
+    def test_cron(self):
+        trigger = CronTrigger("*/15 9-18 * * 1-5")
+        friday_evening = datetime.datetime(2024, 3, 1, 18, 50)
+        assert trigger.next_run(friday_evening, None) == datetime.datetime(2024, 3, 4, 9, 0)
+        assert trigger.next_run(datetime.datetime(2024, 3, 4, 9, 0), None) == datetime.datetime(2024, 3, 4, 9, 15)
+        assert CronTrigger("0 3 1 * *").next_run(friday_evening, None) == datetime.datetime(2024, 4, 1, 3, 0)
+
+    def test_cron_errors(self):
+        with pytest.raises(ValueError):
+            CronTrigger("* * *")
+        with pytest.raises(ValueError):
+            CronTrigger("61 * * * *")
+
+    def test_once(self):
+        now = datetime.datetime(2024, 1, 1, 12, 0)
+        assert OnceTrigger(5).next_run(now, None) == now + datetime.timedelta(seconds=5)
+        assert OnceTrigger(5).next_run(now, now) is None
+
+
+class TestScheduler:
+    def test_jobs_run_without_overlap_and_state_is_saved(self, tmp_path):
+        calls = []
+        release = threading.Event()
+
+        def execute(command, option_number):
+            calls.append((command.name, option_number))
+            release.wait(5)
+            return "success"
+
+        state_path = str(tmp_path / "jobs.json")
+        scheduler = Scheduler(execute, state_path)
+        command = hotconsole.Command("clean", "Почистить логи", lambda _: None)
+        job = scheduler.add(Job(command, IntervalTrigger(0.05)))
+        scheduler.start()
+        time.sleep(0.5)
+        release.set()
+        time.sleep(0.1)
+        scheduler.stop()
+        assert calls[0] == ("clean", None)
+        assert job.skipped > 0
+        assert job.last_outcome == "success"
+        assert Scheduler(execute, state_path).load_state()["clean"] == job.last_run.isoformat()
+
+    def test_option_is_required(self, tmp_path):
+        scheduler = Scheduler(lambda *_: None, str(tmp_path / "jobs.json"))
+        command = hotconsole.Command("turn", "Перезапустить", lambda _: None, ["Включить", "Выключить"])
+        with pytest.raises(ValueError):
+            scheduler.add(Job(command, OnceTrigger()))
+        scheduler.add(Job(command, OnceTrigger(), 2))
+
+    def test_once_is_not_repeated_after_restart(self, tmp_path):
+        calls = []
+        state_path = str(tmp_path / "jobs.json")
+        command = hotconsole.Command("migrate", "Мигрировать", lambda _: None)
+        for _ in range(2):
+            scheduler = Scheduler(lambda *args: calls.append(args), state_path)
+            scheduler.add(Job(command, OnceTrigger()))
+            scheduler.start()
+            time.sleep(0.2)
+            scheduler.stop()
+        assert len(calls) == 1
+
+    def test_same_job_names_from_different_apps(self, tmp_path):
+        state_path = str(tmp_path / "jobs.json")
+        scheduler = Scheduler(lambda *_: None, state_path)
+        first = scheduler.add(Job(hotconsole.Command("clean", "Почистить", lambda _: None), OnceTrigger(), app="app1"))
+        second = scheduler.add(Job(hotconsole.Command("clean", "Почистить", lambda _: None), OnceTrigger(), app="app2"))
+        scheduler.start()
+        time.sleep(0.2)
+        scheduler.stop()
+        assert first.runs == second.runs == 1
+        assert set(scheduler.load_state()) == {"app1:clean", "app2:clean"}
+
+
+class TestBackgroundExecution:
+    def test_job_skips_stash_state_and_banners(self, tmp_path, monkeypatch: pytest.MonkeyPatch, capsys):
+        platform = FakePlatform()
+        monkeypatch.setattr(Platform, "_current", platform)
+        monkeypatch.setattr(hotconsole.OSHelper, "extract_whole_json", lambda _: {
+            "version": 1, "consoleMode": False, "refuseStartup": False
+        })
+        names = []
+
+        def fail(_):
+            names.append(hotconsole._current_command.get())
+            raise RuntimeError("нет связи")
+
+        CommandLog.setup(str(tmp_path / "hotconsole.log"))
+        try:
+            assert hotconsole.Executor.execute_in_background(hotconsole.Command("sync", "Синхронизировать", fail)) == (
+                "exception"
+            )
+            command = hotconsole.Command("clean", "Почистить", lambda _: None)
+            assert hotconsole.Executor.execute_in_background(command) == "success"
+            CommandLog.shutdown()
+            entries = CommandLog.tail(2)
+        finally:
+            CommandLog.shutdown()
+            CommandLog.path = None
+        assert platform.stashes == 0 and capsys.readouterr().out == ""
+        assert names == ["sync"]
+        assert [(entry["command"], entry["outcome"]) for entry in entries] == [("sync", "exception"), ("clean", "success")]
+        assert "RuntimeError: нет связи" in entries[0]["traceback"]
@@ -0,0 +1,77 @@
+import threading
+import time
+from unittest import mock
+
+import pytest
+
+from hotconsole.helpers import OSHelper
+from hotconsole.services import ServiceMonitor, ServiceState, parse_sc_output
+
+SC_OUTPUT = """
+SERVICE_NAME: KonturMarket
+DISPLAY_NAME: Контур.Маркет
+        TYPE               : 10  WIN32_OWN_PROCESS
+        STATE              : 4  RUNNING
+                                (STOPPABLE, NOT_PAUSABLE, ACCEPTS_SHUTDOWN)
+        WIN32_EXIT_CODE    : 0  (0x0)
+        PID                : 4120
+        FLAGS              :
+
+SERVICE_NAME: Spooler
+DISPLAY_NAME: Диспетчер печати
+        TYPE               : 110  WIN32_OWN_PROCESS  (interactive)
+        STATE              : 1  STOPPED
+        PID                : 0
+"""
+
+
+class FakeServices:
+    """Таблица служб в памяти вместо sc queryex"""
+
+    def __init__(self):
+        self.table = {"KonturMarket": ("RUNNING", 4120), "Spooler": ("STOPPED", 0)}
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return dict(self.table)
+
+
+class TestServiceMonitor:
+    def test_parse_sc_output(self):
+        assert parse_sc_output(SC_OUTPUT) == {"KonturMarket": ("RUNNING", 4120), "Spooler": ("STOPPED", 0)}
+
+    def test_many_services_from_one_query(self):
+        services = FakeServices()
+        monitor = ServiceMonitor(services, max_interval=60)
+        assert monitor.status("konturmarket").pid == 4120
+        assert monitor.status("Spooler").state == ServiceState.STOPPED
+        assert monitor.status("Absent") is None
+        assert services.calls == 1
+        with pytest.raises(ValueError):
+            monitor.has_state("Absent", ServiceState.RUNNING)
+
+    def test_wait_for_state_change(self):
+        services = FakeServices()
+        monitor = ServiceMonitor(services, min_interval=0.02)
+        monitor.refresh()
+        before = monitor.status("Spooler").changed_at
+        threading.Timer(0.1, lambda: services.table.update(Spooler=("RUNNING", 777))).start()
+        start = time.monotonic()
+        assert monitor.wait_for("Spooler", ServiceState.RUNNING, 5)
+        assert time.monotonic() - start < 1
+        assert monitor.status("Spooler").changed_at > before
+        assert not monitor.wait_for("KonturMarket", ServiceState.STOPPED, 0.1)
+
+    def test_change_service_state_waits_on_monitor(self, monkeypatch: pytest.MonkeyPatch):
+        services = FakeServices()
+        monkeypatch.setattr(ServiceMonitor, "_shared", ServiceMonitor(services, min_interval=0.02))
+
+        def sc(args):
+            services.table["KonturMarket"] = ("STOPPED", 0)
+
+        with mock.patch("subprocess.call", side_effect=sc) as mock_call:
+            assert OSHelper.try_stop_service("KonturMarket", timeout=5)
+            assert OSHelper.try_stop_service("KonturMarket", timeout=5)
+        mock_call.assert_called_once_with(["sc", "stop", "KonturMarket"])
+        assert OSHelper.get_service_statuses(["Spooler", "Absent"])["Absent"] is None
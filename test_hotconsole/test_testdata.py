@@ -0,0 +1,64 @@
+import json
+import sqlite3
+
+import pytest
+
+from hotconsole.helpers import InnGenerator
+from hotconsole.testdata import DataGenerator, DataWriter
+
+
+class TestDataGenerator:
+    def test_seed_repeats_data(self):
+        assert DataGenerator(42).inn_ul(100) == DataGenerator(42).inn_ul(100)
+        assert DataGenerator(42).chars(8, 10) != DataGenerator(43).chars(8, 10)
+
+    def test_chars(self):
+        strings = DataGenerator(1).chars(7, 1000, "абв")
+        assert len(strings) == 1000
+        assert all(len(value) == 7 and set(value) <= set("абв") for value in strings)
+        with pytest.raises(ValueError):
+            DataGenerator().chars(1, 1, "")
+
+    def test_inn_control_numbers(self):
+        generator = DataGenerator(7)
+        for inn in generator.inn_ul(200):
+            assert len(inn) == 10 and InnGenerator._get_controls_inn_ul(inn) == inn[-1]
+        for inn in generator.inn_fl(200):
+            assert len(inn) == 12 and InnGenerator._get_controls_inn_fl(inn) == inn[-2:]
+
+    def test_ogrn_and_ogrnip(self):
+        generator = DataGenerator(3)
+        for ogrn in generator.ogrn(200):
+            assert len(ogrn) == 13 and ogrn[0] in "15" and int(ogrn[:-1]) % 11 % 10 == int(ogrn[-1])
+        for ogrnip in generator.ogrnip(200):
+            assert len(ogrnip) == 15 and ogrnip[0] == "3" and int(ogrnip[:-1]) % 13 % 10 == int(ogrnip[-1])
+
+    def test_snils(self):
+        assert DataGenerator.format_snils("11223344595") == "112-233-445 95"
+        for snils in DataGenerator(5).snils(500):
+            total = sum(int(digit) * weight for digit, weight in zip(snils[:9], range(9, 0, -1)))
+            expected = total if total < 100 else (0 if total % 101 == 100 else total % 101)
+            assert int(snils[9:]) == expected
+
+    def test_kpp(self):
+        assert all(len(kpp) == 9 and kpp[4:6] == "01" for kpp in DataGenerator(1).kpp(100))
+
+
+class TestDataWriter:
+    def test_stream_to_files_and_sqlite(self, tmp_path):
+        generator = DataGenerator(11)
+        schema = {"inn": generator.inn_ul, "kpp": generator.kpp, "name": lambda count: generator.chars(10, count)}
+
+        assert DataWriter.to_csv(str(tmp_path / "data.csv"), generator.records(25, schema, batch_size=10)) == 25
+        lines = (tmp_path / "data.csv").read_text("utf-8").splitlines()
+        assert lines[0] == "inn;kpp;name" and len(lines) == 26
+
+        assert DataWriter.to_jsonl(str(tmp_path / "data.jsonl"), generator.records(5, schema)) == 5
+        first = json.loads((tmp_path / "data.jsonl").read_text("utf-8").splitlines()[0])
+        assert list(first) == ["inn", "kpp", "name"]
+
+        db_path = str(tmp_path / "data.db")
+        sqlite3.connect(db_path).close()
+        assert DataWriter.to_sqlite(db_path, "orgs", generator.records(30, schema), batch_size=7) == 30
+        with sqlite3.connect(db_path) as con:
+            assert con.execute('SELECT COUNT(*) FROM "orgs"').fetchone() == (30,)
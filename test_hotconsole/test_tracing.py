@@ -0,0 +1,85 @@
+import json
+import time
+
+import keyboard
+import pytest
+
+from hotconsole import hotconsole
+from hotconsole.helpers import OSHelper
+from hotconsole.memory import IdlePolicy
+from hotconsole.platform import FakePlatform, Platform, WindowsPlatform
+from hotconsole.tracing import Tracer
+
+
+@pytest.fixture
+def platform(monkeypatch: pytest.MonkeyPatch):
+    fake = FakePlatform(title="Hotconsole Scripts")
+    monkeypatch.setattr(Platform, "_current", fake)
+    monkeypatch.setattr(hotconsole.OSHelper, "extract_whole_json", lambda _: {
+        "version": 1, "consoleMode": False, "refuseStartup": False
+    })
+    Tracer.clear()
+    yield fake
+    Tracer.clear()
+
+
+class TestTracer:
+    def test_hotkey_stages(self, platform, tmp_path):
+        def execute(_):
+            OSHelper.switch_to_script_window()
+            OSHelper.switch_to_window("Блокнот")
+
+        runner = hotconsole.Runner.__new__(hotconsole.Runner)
+        runner.idle_policy = IdlePolicy()
+        runner.commands = {}
+        runner.add_hotkey("alt+1", hotconsole.Command("notepad", "Открыть блокнот", execute), 2)
+        platform.press("alt+1", time.perf_counter() - 0.05)
+        platform.join()
+
+        spans = {span.name: span for span in Tracer.spans()}
+        stages = {"hotkey", "hook", "stash_state", "config", "command", "switch_to_script_window", "switch_to_window"}
+        assert stages <= set(spans)
+        assert len({span.trace_id for span in spans.values()}) == 1
+        assert spans["hook"].duration >= 0.05
+        assert spans["switch_to_window"].duration >= 0.5
+        assert spans["command"].args == {"command": "notepad", "option": 2}
+        assert spans["hook"].end <= spans["stash_state"].start <= spans["config"].start <= spans["command"].start
+
+        summary = Tracer.summary()
+        assert list(summary)[:3] == ["hook", "stash_state", "config"]
+        assert summary["key_to_command"][0] >= 0.05
+        assert "key_to_command" in "\n".join(Tracer.format_summary())
+
+        path = tmp_path / "trace.json"
+        assert Tracer.export_chrome(str(path)) == len(Tracer.spans())
+        events = json.loads(path.read_text(encoding="utf-8"))["traceEvents"]
+        assert {event["ph"] for event in events} == {"X"}
+        assert all(event["dur"] >= 0 for event in events)
+        assert Tracer.spans(last=0) == []
+
+    def test_spans_outside_trace_are_skipped(self, platform):
+        with Tracer.span("config"):
+            pass
+        Tracer.record("host_queue", 0, 1)
+        assert Tracer.spans() == []
+
+    def test_hook_stage_starts_at_triggering_key(self, platform):
+        runner = hotconsole.Runner.__new__(hotconsole.Runner)
+        runner.idle_policy = IdlePolicy()
+        runner.commands = {}
+        runner.add_hotkey("alt+1", hotconsole.Command("notepad", "Открыть блокнот", lambda _: None), None)
+        platform.key_down("alt", time.time() - 5)
+        platform.press("alt+1")
+        platform.join()
+        summary = Tracer.summary()
+        assert summary["hook"][0] < 1 and summary["key_to_command"][0] < 1
+
+    def test_windows_hotkey_uses_newest_pressed_event(self, platform, monkeypatch: pytest.MonkeyPatch):
+        pressed = {
+            56: keyboard.KeyboardEvent(keyboard.KEY_DOWN, 56, "alt", time.time() - 5),
+            2: keyboard.KeyboardEvent(keyboard.KEY_DOWN, 2, "1", time.time()),
+        }
+        monkeypatch.setattr(keyboard, "_pressed_events", pressed)
+        WindowsPlatform()._run_hotkey("alt+1", lambda: None)
+        hook = [span for span in Tracer.spans() if span.name == "hook"]
+        assert len(hook) == 1 and hook[0].duration < 1
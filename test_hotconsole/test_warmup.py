@@ -0,0 +1,99 @@
+import threading
+import time
+
+import pytest
+
+from hotconsole import hotconsole
+from hotconsole.memory import IdlePolicy
+from hotconsole.platform import FakePlatform, Platform
+from hotconsole.warmup import Warmup
+
+
+class TestWarmup:
+    def test_priority_and_concurrency(self):
+        busy = threading.Event()
+        busy.set()
+        order = []
+        running = []
+        peak = []
+        lock = threading.Lock()
+
+        def warm(name):
+            def warmup():
+                with lock:
+                    order.append(name)
+                    running.append(name)
+                    peak.append(len(running))
+                time.sleep(0.05)
+                with lock:
+                    running.remove(name)
+            return warmup
+
+        warmup = Warmup(workers=2, is_busy=busy.is_set, pause=0.01)
+        for name, priority in (("db", 0), ("api", 5), ("report", -1), ("cache", 5)):
+            assert warmup.schedule(name, warm(name), priority)
+        assert not warmup.schedule("db", warm("db"))
+        time.sleep(0.05)
+        assert order == []
+        busy.clear()
+        assert warmup.join(2)
+        assert set(order[:2]) == {"api", "cache"} and order[-1] == "report"
+        assert max(peak) == 2
+        assert not warmup.schedule("db", warm("db"))
+        warmup.reset()
+        assert warmup.schedule("db", warm("db")) and warmup.join(2)
+
+    def test_failed_warmup_is_reported(self):
+        warmup = Warmup()
+        warmup.schedule("api", lambda: 1 / 0)
+        assert warmup.join(2)
+        assert "ZeroDivisionError" in warmup.results["api"].error
+        assert "ошибка: ZeroDivisionError" in "\n".join(warmup.format_report())
+
+
+class TestRunnerWarmup:
+    def test_warmup_fills_command_cache(self, tmp_path, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setattr(Platform, "_current", FakePlatform())
+        monkeypatch.setattr(hotconsole.OSHelper, "extract_whole_json", lambda _: {
+            "version": 1, "consoleMode": False, "refuseStartup": False
+        })
+        warmups = []
+
+        def warmup():
+            warmups.append(hotconsole._current_command.get())
+            hotconsole.CommandHelpers.cached("token", 60, lambda: "прогрет")
+
+        def execute(_):
+            results.append(hotconsole.CommandHelpers.cached("token", 60, lambda: "холодный"))
+
+        results = []
+        runner = hotconsole.Runner.__new__(hotconsole.Runner)
+        runner.idle_after = 60
+        runner.idle_policy = IdlePolicy(idle_after=60, check_every=60)
+        runner.warmup = Warmup(is_busy=lambda: runner.idle_policy.is_busy)
+        runner.commands = {"login": hotconsole.Command("login", "Войти", execute, warmup=warmup, warmup_priority=1)}
+        with hotconsole.scripts_folder(str(tmp_path)):
+            try:
+                runner.start_idle_policy()
+                runner.start_warmup()
+                assert runner.warmup.join(2)
+                runner.execute(runner.commands["login"], None)
+                assert results == ["прогрет"] and warmups == ["login"]
+                runner.idle_policy.release()
+                assert runner.warmup.join(2) and warmups == ["login", "login"]
+                assert runner.idle_policy.is_idle
+                results.clear()
+                runner.execute(runner.commands["login"], None)
+                assert results == ["прогрет"] and warmups == ["login", "login"]
+            finally:
+                runner.idle_policy.stop()
+                hotconsole.CommandHelpers.cache().close()
+
+    def test_isolated_commands_are_not_warmed(self):
+        runner = hotconsole.Runner.__new__(hotconsole.Runner)
+        runner.warmup = Warmup()
+        runner.commands = {
+            "report": hotconsole.Command("report", "Отчет", print, warmup=lambda: None, isolated=True),
+        }
+        runner.start_warmup()
+        assert runner.warmup.join(2) and runner.warmup.results == {}